@@ -0,0 +1,356 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Gradle マルチプロジェクト単位の抽出（search_java.py --gradle）
+
+ルートの settings.gradle（.kts）の include / includeFlat / project(...).projectDir からサブプロジェクトを求め、
+各プロジェクトの build.gradle（.kts）の sourceSets に記載された Java のソースディレクトリ
+（記載がなければ標準の src/main/java、src/test/java）から .java ファイルを集める。
+抽出はプロジェクト単位でワーカープロセスに渡し、結果CSVの先頭にプロジェクトのパス（:module-a）の列を付ける。
+ソースツリー（ファイルの相対パスと内容）が前回と同じプロジェクトは抽出せずに前回の結果を再利用する。
+
+ビルドスクリプトは実行せず字句の範囲で読むため、変数や関数で組み立てたディレクトリ（"$buildDir/gen" など）は対象にしない。
+"""
+
+import os
+import re
+import sys
+from functools import partial
+from typing import List, Optional, Tuple
+from pathlib import Path
+
+# 共通モジュール（python/search_common.py）を参照できるようにする
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / 'python'))
+
+from search_common import ExtractionError, read_source, mask_literals, match_braces  # noqa: E402
+from search_batch import BatchResult, SourceGroup, extract_group_files, run_groups  # noqa: E402
+from search_regex import DEFAULT_REGEX_BACKEND  # noqa: E402
+from search_java import CSV_HEADER as JAVA_CSV_HEADER, extract_file, to_csv_row  # noqa: E402
+
+
+# CSV出力の列（search_java.py の列の先頭にプロジェクトのパスを加える）
+CSV_HEADER = ['プロジェクト'] + JAVA_CSV_HEADER
+SETTINGS_FILES = ['settings.gradle', 'settings.gradle.kts']
+BUILD_FILES = ['build.gradle', 'build.gradle.kts']
+# sourceSets に記載がない場合のソースセット（ディレクトリは src/<ソースセット>/java）
+DEFAULT_SOURCE_SETS = ['main', 'test']
+
+# Groovy / Kotlin DSL のコメントと文字列リテラル（三重引用符を含む）
+LITERAL_PATTERN = re.compile(
+    r'//[^\n]*|/\*.*?\*/|"""(?:[^\\]|\\.)*?"""|\'\'\'(?:[^\\]|\\.)*?\'\'\''
+    r'|"(?:[^"\\\n]|\\.)*"|\'(?:[^\'\\\n]|\\.)*\'',
+    re.DOTALL
+)
+_STRING = r'''(?:"[^"\n]*"|'[^'\n]*')'''
+_STRING_VALUE = re.compile(r'"([^"\n]*)"|\'([^\'\n]*)\'')
+_INCLUDE = re.compile(r'\b(include|includeFlat)\b\s*\(?\s*(' + _STRING + r'(?:\s*,\s*' + _STRING + r')*)')
+_PROJECT_DIR = re.compile(
+    r'\bproject\s*\(\s*(' + _STRING + r')\s*\)\s*\.\s*projectDir\s*=\s*'
+    r'(?:file\s*\(|(?:new\s+)?File\s*\(\s*(?:settingsDir|rootDir|rootProject\.projectDir)\s*,)\s*(' + _STRING + r')'
+)
+# sourceSets { ... } と sourceSets.main { ... } / sourceSets["main"] { ... }
+_SOURCE_SETS_BLOCK = re.compile(r'\bsourceSets\s*\{')
+_SOURCE_SET_REF = r'''(?:\.\s*(\w+)|\[\s*(''' + _STRING + r''')\s*\]|\.\s*(?:getByName|named|maybeCreate)\s*\(\s*(''' + \
+    _STRING + r''')\s*\)(?:\s*\.\s*get\s*\(\s*\))?)'''
+_SOURCE_SET_DOTTED_BLOCK = re.compile(r'\bsourceSets\s*' + _SOURCE_SET_REF + r'\s*\{')
+_SOURCE_SET_DOTTED_JAVA = re.compile(r'\bsourceSets\s*' + _SOURCE_SET_REF + r'\s*\.\s*java\s*(\.|\{)')
+# sourceSets ブロックの中のソースセットのブロック（main { / getByName("main") { / val main by getting {）
+_SOURCE_SET_ENTRY = re.compile(
+    r'(?:\b(?:getByName|named|create|register|maybeCreate)\s*\(\s*(' + _STRING + r')\s*\)'
+    r'|\bval\s+(\w+)\s+by\s+(?:getting|creating)|(?<![.\w])(\w+))\s*\{'
+)
+# sourceSets ブロックの中の main.java.srcDirs = [...] / main.java { ... }
+_SOURCE_SET_MEMBER_JAVA = re.compile(r'(?<![.\w])(\w+)\s*\.\s*java\s*(\.|\{)')
+# ソースセットのブロックの中の java { ... } と java.srcDir(...)
+_JAVA_BLOCK = re.compile(r'(?<![.\w])java\s*\{')
+_JAVA_DOTTED = re.compile(r'(?<![.\w])java\s*\.\s*(?=(?:setSrcDirs|srcDirs|srcDir)\b)')
+_SRC_DIR_STATEMENT = re.compile(r'(?<!\w)(setSrcDirs|srcDirs|srcDir)\b(?:\s*(=)\s*|[ \t]*)')
+_CALL_PREFIX = re.compile(r'(?:files|file|listOf|setOf|arrayOf)\s*(?=\()')
+
+
+class GradleProjectError(ExtractionError):
+    """Gradle のプロジェクト（settings.gradle / build.gradle）が見つからない"""
+
+
+class GradleProject(SourceGroup):
+    """Gradle の1プロジェクトと Java のソースディレクトリ"""
+    
+    def __init__(self, path: str, project_dir: str):
+        super().__init__(path, project_dir)
+        # 存在するソースディレクトリ（ソースセットの順、重複なし）
+        self.source_dirs = []
+
+
+def _read_script(script_path: str) -> Tuple[str, str]:
+    """
+    ビルドスクリプトの (コメントを空白にした内容, 文字列リテラルも空白にした内容)
+    
+    どちらも元の内容と文字位置が一致する。記載の検出は前者で、括弧の対応付けは後者で行う。
+    """
+    content = read_source(script_path)
+    uncommented = LITERAL_PATTERN.sub(
+        lambda m: mask_literals(m.group(), LITERAL_PATTERN) if m.group().startswith('/') else m.group(), content
+    )
+    return uncommented, mask_literals(content, LITERAL_PATTERN)
+
+
+def _strings(text: str) -> List[str]:
+    """text の中の文字列リテラルの値（"$buildDir/gen" のように変数を含むものは除く）"""
+    values = [match.group(1) if match.group(1) is not None else match.group(2)
+              for match in _STRING_VALUE.finditer(text)]
+    return [value for value in values if '$' not in value]
+
+
+def _find_script(directory: str, names: List[str]) -> Optional[str]:
+    for name in names:
+        path = os.path.join(directory, name)
+        if os.path.isfile(path):
+            return path
+    return None
+
+
+def read_settings(root_dir: str) -> List[Tuple[str, str]]:
+    """
+    (プロジェクトのパス, プロジェクトのディレクトリ) のリスト（ルートの : と include の記載順）
+    
+    include 'app:core' の場合は Gradle と同じく親の :app も含める。
+    ディレクトリは project(':x').projectDir = file('...') の指定があればそのディレクトリにする。
+    """
+    projects = {':': root_dir}
+    settings_path = _find_script(root_dir, SETTINGS_FILES)
+    if settings_path is None:
+        return list(projects.items())
+    
+    text, _ = _read_script(settings_path)
+    for match in _INCLUDE.finditer(text):
+        flat = match.group(1) == 'includeFlat'
+        for name in _strings(match.group(2)):
+            parts = [part for part in name.split(':') if part]
+            if not parts:
+                continue
+            if flat:
+                projects.setdefault(':' + parts[-1], os.path.normpath(os.path.join(root_dir, '..', parts[-1])))
+                continue
+            for depth in range(1, len(parts) + 1):
+                projects.setdefault(':' + ':'.join(parts[:depth]), os.path.join(root_dir, *parts[:depth]))
+    for match in _PROJECT_DIR.finditer(text):
+        path = _strings(match.group(1))
+        directory = _strings(match.group(2))
+        if path and directory:
+            project_path = ':' + path[0].lstrip(':')
+            if project_path in projects:
+                projects[project_path] = os.path.normpath(os.path.join(root_dir, directory[0]))
+    return list(projects.items())
+
+
+def _bracket_end(masked: str, pos: int) -> int:
+    """pos の開き括弧（( または [）に対応する閉じ括弧の次の位置（対応しない場合は末尾）"""
+    depth = 0
+    for i in range(pos, len(masked)):
+        if masked[i] in '([':
+            depth += 1
+        elif masked[i] in ')]':
+            depth -= 1
+            if depth == 0:
+                return i + 1
+    return len(masked)
+
+
+def _src_dir_statement(text: str, masked: str, match, end: int) -> Tuple[Tuple[bool, List[str]], int]:
+    """_SRC_DIR_STATEMENT の一致から ((置き換えか, ディレクトリ), 記載の終わりの位置) を得る"""
+    replace = match.group(1) == 'setSrcDirs' or match.group(2) is not None
+    arg_start = match.end()
+    prefix = _CALL_PREFIX.match(text, arg_start)
+    if prefix is not None:
+        arg_start = prefix.end()
+    if arg_start < end and masked[arg_start] in '([':
+        arg_end = min(_bracket_end(masked, arg_start), end)
+    else:
+        # srcDir 'src' のような括弧のない呼び出しは行末まで
+        line_end = masked.find('\n', arg_start, end)
+        arg_end = line_end if line_end >= 0 else end
+    return (replace, _strings(text[arg_start:arg_end])), max(arg_end, match.end())
+
+
+def _src_dir_statements(text: str, masked: str, start: int, end: int) -> List[Tuple[int, Tuple[bool, List[str]]]]:
+    """start..end の srcDir / srcDirs / setSrcDirs の (位置, (置き換えか, ディレクトリ)) のリスト"""
+    statements = []
+    pos = start
+    while True:
+        match = _SRC_DIR_STATEMENT.search(text, pos, end)
+        if match is None:
+            return statements
+        statement, pos = _src_dir_statement(text, masked, match, end)
+        statements.append((match.start(), statement))
+
+
+def _java_statements(text: str, masked: str, braces: dict, start: int,
+                     end: int) -> List[Tuple[int, Tuple[bool, List[str]]]]:
+    """ソースセットのブロック（start..end）の java { ... } / java.srcDir(...) の記載（記載順）"""
+    found = []
+    for match in _JAVA_BLOCK.finditer(text, start, end):
+        found.extend(_src_dir_statements(text, masked, match.end(), braces.get(match.end() - 1, end)))
+    for match in _JAVA_DOTTED.finditer(text, start, end):
+        statement = _SRC_DIR_STATEMENT.match(text, match.end(), end)
+        found.append((match.start(), _src_dir_statement(text, masked, statement, end)[0]))
+    found.sort(key=lambda item: item[0])
+    return found
+
+
+def _member_statements(text: str, masked: str, braces: dict, match,
+                       end: int) -> Tuple[List[Tuple[int, Tuple[bool, List[str]]]], int]:
+    """main.java { ... } / main.java.srcDirs = [...] の (記載, 終わりの位置)"""
+    if match.group(match.lastindex) == '{':
+        block_end = braces.get(match.end() - 1, end)
+        return _src_dir_statements(text, masked, match.end(), block_end), block_end + 1
+    statement = _SRC_DIR_STATEMENT.match(text, match.end(), end)
+    if statement is None:
+        return [], match.end()
+    statement, statement_end = _src_dir_statement(text, masked, statement, end)
+    return [(match.start(), statement)], statement_end
+
+
+def _set_name(groups: tuple) -> str:
+    """_SOURCE_SET_REF / _SOURCE_SET_ENTRY の一致からソースセット名を得る"""
+    for group in groups:
+        if group is None:
+            continue
+        strings = _strings(group)
+        return strings[0] if strings else group
+    return ''
+
+
+def source_dirs(project_dir: str) -> List[str]:
+    """
+    プロジェクトの Java のソースディレクトリ（存在するもの、ソースセットの記載順）
+    
+    srcDirs = [...] / setSrcDirs(...) は標準のディレクトリを置き換え、srcDir / srcDirs(...) は追加する
+    （Gradle の SourceDirectorySet と同じ）。
+    """
+    source_sets = {name: [f'src/{name}/java'] for name in DEFAULT_SOURCE_SETS}
+    script_path = _find_script(project_dir, BUILD_FILES)
+    if script_path is not None:
+        text, masked = _read_script(script_path)
+        braces = match_braces(masked)
+        # (位置, ソースセット名, 記載)
+        found = []
+        
+        def add(name: str, statements: List[Tuple[int, Tuple[bool, List[str]]]]) -> None:
+            # 名前だけの宣言（integrationTest { }）も標準のディレクトリを持つソースセットになる
+            source_sets.setdefault(name, [f'src/{name}/java'])
+            found.extend((pos, name, statement) for pos, statement in statements)
+        
+        for block in _SOURCE_SETS_BLOCK.finditer(text):
+            block_end = braces.get(block.end() - 1, len(masked))
+            pos = block.end()
+            while True:
+                entry = _SOURCE_SET_ENTRY.search(text, pos, block_end)
+                member = _SOURCE_SET_MEMBER_JAVA.search(text, pos, block_end)
+                if member is not None and (entry is None or member.start() <= entry.start()):
+                    statements, pos = _member_statements(text, masked, braces, member, block_end)
+                    add(member.group(1), statements)
+                elif entry is not None:
+                    entry_end = braces.get(entry.end() - 1, block_end)
+                    add(_set_name(entry.groups()), _java_statements(text, masked, braces, entry.end(), entry_end))
+                    pos = entry_end + 1
+                else:
+                    break
+        for block in _SOURCE_SET_DOTTED_BLOCK.finditer(text):
+            block_end = braces.get(block.end() - 1, len(masked))
+            add(_set_name(block.groups()), _java_statements(text, masked, braces, block.end(), block_end))
+        for match in _SOURCE_SET_DOTTED_JAVA.finditer(text):
+            add(_set_name(match.groups()[:3]), _member_statements(text, masked, braces, match, len(masked))[0])
+        
+        found.sort(key=lambda item: item[0])
+        for _, name, (replace, dirs) in found:
+            if replace:
+                source_sets[name] = list(dirs)
+            else:
+                source_sets[name].extend(dirs)
+    
+    result = []
+    for dirs in source_sets.values():
+        for directory in dirs:
+            path = os.path.normpath(os.path.join(project_dir, directory))
+            if path not in result and os.path.isdir(path):
+                result.append(path)
+    return result
+
+
+def java_files(directories: List[str], skip_dirs: set) -> List[str]:
+    """ディレクトリの下の .java ファイル（ディレクトリの順、各ディレクトリの中は名前順、重複なし）"""
+    files = []
+    seen = set()
+    for directory in directories:
+        for dir_path, dir_names, file_names in os.walk(directory):
+            # 隠しディレクトリ・他のプロジェクト・ビルドの出力先は対象にしない
+            dir_names[:] = sorted(name for name in dir_names
+                                  if not name.startswith('.') and os.path.join(dir_path, name) not in skip_dirs)
+            for file_name in sorted(file_names):
+                if file_name.endswith('.java'):
+                    file_path = os.path.join(dir_path, file_name)
+                    if file_path not in seen:
+                        seen.add(file_path)
+                        files.append(file_path)
+    return files
+
+
+def read_projects(root: str) -> List[GradleProject]:
+    """ルートのディレクトリ（または settings.gradle）から各プロジェクトとその .java ファイルを求める"""
+    root_dir = os.path.abspath(root)
+    if os.path.isfile(root_dir):
+        root_dir = os.path.dirname(root_dir)
+    if not os.path.isdir(root_dir):
+        raise GradleProjectError(f"Gradle のプロジェクトが見つかりません: {root}", root)
+    if _find_script(root_dir, SETTINGS_FILES + BUILD_FILES) is None:
+        raise GradleProjectError(f"settings.gradle / build.gradle が見つかりません: {root}", root)
+    
+    projects = [GradleProject(path, project_dir) for path, project_dir in read_settings(root_dir)]
+    project_dirs = {project.base_dir for project in projects}
+    for project in projects:
+        project.source_dirs = source_dirs(project.base_dir)
+        skip_dirs = (project_dirs - {project.base_dir}) | {os.path.join(project.base_dir, 'build')}
+        project.file_paths = java_files(project.source_dirs, skip_dirs)
+    return projects
+
+
+def extract_project(project: GradleProject,
+                    regex_backend: str = DEFAULT_REGEX_BACKEND) -> Tuple[List[List], List[list]]:
+    """1プロジェクトの全ファイルを抽出し、(CSVの行, 警告・エラー) を返す（ワーカープロセスで実行）"""
+    return extract_group_files(project, partial(extract_file, regex_backend=regex_backend), to_csv_row)
+
+
+def default_project_cache_dir(output_file: str) -> str:
+    """結果CSVのパスからプロジェクトのキャッシュのディレクトリを決める（result.csv -> result_projects）"""
+    root, _ = os.path.splitext(output_file)
+    return root + '_projects'
+
+
+def process_gradle(root: str, output_file: str = None, workers: int = 1,
+                   cache_dir: Optional[str] = None, use_cache: bool = True, quiet: bool = False,
+                   error_log: str = None, regex_backend: str = DEFAULT_REGEX_BACKEND,
+                   executor_kind: str = 'auto') -> BatchResult:
+    """
+    Gradle のルートプロジェクトと全サブプロジェクトを処理し、結果をプロジェクトの記載順にCSVへ出力する
+    
+    ソースツリーがキャッシュと一致しないプロジェクトだけを抽出する。workers が2以上の場合は
+    プロジェクト単位でワーカーのプールに渡す（executor_kind は search_batch.make_executor() を参照）。
+    """
+    projects = read_projects(root)
+    if output_file is None:
+        output_file = projects[0].base_dir + '_result.csv'
+    if use_cache and cache_dir is None:
+        cache_dir = default_project_cache_dir(output_file)
+    for project in projects:
+        project.compute_hash(CSV_HEADER)
+    
+    if not quiet:
+        print(f"Gradle プロジェクト: {projects[0].base_dir}")
+        for project in projects:
+            if project.file_paths:
+                dirs = ', '.join(os.path.relpath(directory, project.base_dir) for directory in project.source_dirs)
+                print(f"  {project.name} ({dirs}): {len(project.file_paths)}ファイル")
+    return run_groups([project for project in projects if project.file_paths],
+                      partial(extract_project, regex_backend=regex_backend), CSV_HEADER, output_file,
+                      'メソッド', 'プロジェクト', workers=workers, cache_dir=cache_dir if use_cache else None,
+                      quiet=quiet, error_log_path=error_log, executor_kind=executor_kind)
@@ -4,129 +4,190 @@
 Javaファイルからメソッドの名称、引数、ファイル名、行番号を取得するスクリプト
 """
 
+import os
 import re
 import sys
-import csv
-from typing import List, Dict
+from functools import partial
+from typing import List, Dict, Optional, Tuple
 from pathlib import Path
 
+# 共通モジュール（python/search_common.py）を参照できるようにする
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / 'python'))
+
+from search_common import (  # noqa: E402
+    ExtractionError, UsageError, LineIndex, BodySpans, FINGERPRINT_MODES, C_COMMENTS, read_source, read_file_list, write_csv, write_json, split_params, pop_flag, pop_option
+)
+from search_batch import run_batch, parse_shard, parse_workers, resolve_executor
+from search_api import language_extensions
+from search_normalized import inflate_to_csv
+from search_index import run_index_command, default_index_path
+from search_regex import DEFAULT_REGEX_BACKEND, resolve_backend, compile_patterns, filter_patterns
+
+
+# Javaの予約語・キーワード（メソッド名として誤検出しないように）
+JAVA_KEYWORDS = frozenset({
+    'if', 'else', 'for', 'while', 'do', 'switch', 'case', 'default',
+    'try', 'catch', 'finally', 'throw', 'return', 'break', 'continue',
+    'class', 'interface', 'enum', 'extends', 'implements', 'super',
+    'this', 'new', 'instanceof', 'import', 'package', 'static',
+    'final', 'abstract', 'public', 'private', 'protected', 'void',
+    'int', 'long', 'double', 'float', 'boolean', 'char', 'byte',
+    'short', 'String', 'Object', 'null', 'true', 'false'
+})
+
+# 引数リスト（アノテーションの引数など1段階までの括弧の入れ子を含む）
+_PARAMS = r'([^()]*(?:\([^()]*\)[^()]*)*)'
+
+# メソッド定義パターン（モジュール読み込み時に一度だけコンパイルし、全ファイルで共有する）
+# パターンの順序を調整（コンストラクタとインターフェースメソッドを先に検出）
+METHOD_PATTERNS = [
+    # パターン2: コンストラクタ
+    # [修飾子] クラス名(引数) { ... }
+    (re.compile(
+        r'(?:(?:public|private|protected)\s+)?'
+        r'(\w+)\s*'  # クラス名（コンストラクタ名）
+        r'\(' + _PARAMS + r'\)\s*\{',  # 引数と開始波括弧
+        re.MULTILINE
+    ), 'constructor'),
+    # パターン3: インターフェースのメソッド（デフォルトメソッド、staticメソッド）
+    # default 戻り値の型 メソッド名(引数) { ... }
+    # static 戻り値の型 メソッド名(引数) { ... }
+    (re.compile(
+        r'(?:default|static)\s+'
+        r'(void|[\w<>\[\]\s,\.]+?)\s+'  # 戻り値の型
+        r'(\w+)\s*'  # メソッド名
+        r'\(' + _PARAMS + r'\)\s*\{',  # 引数と開始波括弧
+        re.MULTILINE
+    ), 'interface_method'),
+    # パターン1: 通常のメソッド定義
+    # [修飾子] 戻り値の型 メソッド名(引数) { ... }
+    # 修飾子は0個以上、戻り値の型は必須、メソッド名の後に(引数)が続く
+    (re.compile(
+        r'(?:(?:public|private|protected|static|final|abstract|synchronized|native|strictfp)\s+)*'
+        r'(void|[\w<>\[\]\s,\.]+?)\s+'  # 戻り値の型（void、ジェネリクス、配列対応）
+        r'(\w+)\s*'  # メソッド名
+        r'\(' + _PARAMS + r'\)\s*\{',  # 引数と開始波括弧
+        re.MULTILINE
+    ), 'method'),
+]
+
+# 各パターンのマッチに必ず含まれる文字列（search_regex.filter_patterns）
+# 含まれないパターンは実行せず、どのパターンも実行しないファイルは解析自体を省く
+PATTERN_ANCHORS = {
+    'constructor': ('(', '{'),
+    'interface_method': (('default', 'static'), '(', '{'),
+    'method': ('(', '{'),
+}
+
+MODIFIER_KEYWORDS = ['public', 'private', 'protected', 'static', 'final',
+                     'abstract', 'synchronized', 'native', 'strictfp', 'default']
+
+# 戻り値の型から修飾子を除去するパターン（単語境界で修飾子を除去）
+_MODIFIER_STRIP_PATTERNS = [re.compile(r'\b' + modifier + r'\s+') for modifier in MODIFIER_KEYWORDS]
+# 修飾子を抽出するパターン
+_MODIFIER_FIND_PATTERNS = [(modifier, re.compile(r'\b' + modifier + r'\b')) for modifier in MODIFIER_KEYWORDS]
+
+_CLASS_NAME = re.compile(r'class\s+(\w+)')
+_GENERIC_PREFIX = re.compile(r'^<[^>]+>\s+')
+_PRECEDED_BY_BRACE = re.compile(r'\}\s*$')
+_PRECEDED_BY_MEMBER_ACCESS = re.compile(r'[a-zA-Z_]\w*\.\s*$')
+
+# 文字列リテラル（テキストブロックを含む）・文字リテラルとコメント（メソッド本体の範囲の検出で除外する）
+LITERAL_PATTERN = re.compile(
+    C_COMMENTS + r'|"""[\s\S]*?"""|"[^"\\\n]*(?:\\[\s\S][^"\\\n]*)*"|\'[^\'\\\n]*(?:\\[\s\S][^\'\\\n]*)*\''
+)
+
+# CSV出力の列
+CSV_HEADER = ['ファイル', '行番号', '終了行', '行数', 'クラス', '型', '修飾子', '戻り値の型', 'メソッド名', '引数']
+# 正規化形式（--normalized）で辞書符号化する列（値の種類が少なく繰り返しの多い列）
+DICTIONARY_COLUMNS = ['クラス', '型', '修飾子', '戻り値の型']
+
+
+def to_csv_row(method: Dict[str, any]) -> List:
+    """メソッド情報をCSVの1行に変換"""
+    params_str = ', '.join(method['parameters']) if method['parameters'] else ''
+    return [
+        method['file'],
+        method['line'],
+        method['end_line'],
+        method['line_count'],
+        method['class_name'],
+        method['type'],
+        method['modifiers'],
+        method['return_type'],
+        method['name'],
+        params_str
+    ]
+
 
 class JavaMethodExtractor:
     """Javaファイルからメソッド情報を抽出するクラス"""
     
-    def __init__(self, file_path: str):
+    def __init__(self, file_path: str, content: Optional[str] = None,
+                 regex_backend: str = DEFAULT_REGEX_BACKEND, fingerprint: Optional[str] = None):
         self.file_path = Path(file_path)
-        self.content = ""
-        
-    def read_file(self, raise_on_error: bool = True) -> None:
-        """ファイルを読み込む"""
-        try:
-            with open(self.file_path, 'r', encoding='utf-8') as f:
-                self.content = f.read()
-        except FileNotFoundError:
-            error_msg = f"エラー: ファイル '{self.file_path}' が見つかりません。"
-            if raise_on_error:
-                print(error_msg)
-                sys.exit(1)
-            else:
-                raise FileNotFoundError(error_msg)
-        except Exception as e:
-            error_msg = f"エラー: ファイルの読み込みに失敗しました: {e}"
-            if raise_on_error:
-                print(error_msg)
-                sys.exit(1)
-            else:
-                raise
+        # content を指定した場合はファイルを読み込まずにその内容を解析する
+        self.content = content if content is not None else ""
+        self._loaded = content is not None
+        # メソッド定義パターンの正規表現エンジン（search_regex）
+        self.regex_backend = resolve_backend(regex_backend)
+        if fingerprint is not None and fingerprint not in FINGERPRINT_MODES:
+            raise UsageError(f"関数本体の指紋の種類は {' / '.join(FINGERPRINT_MODES)} のいずれかです: {fingerprint}")
+        # 関数本体の指紋（search_common.body_fingerprint）の種類。None の場合は求めない
+        self.fingerprint = fingerprint
+    
+    def read_file(self) -> None:
+        """ファイルを読み込む（失敗時は SourceNotFoundError / SourceReadError を送出）"""
+        self.content = read_source(self.file_path)
+        self._loaded = True
     
     def extract_methods(self) -> List[Dict[str, any]]:
         """メソッド定義を抽出"""
+        patterns = filter_patterns(compile_patterns(METHOD_PATTERNS, self.regex_backend), PATTERN_ANCHORS,
+                                   self.content)
+        if not patterns:
+            return []
         methods = []
         
-        # Javaの予約語・キーワード（メソッド名として誤検出しないように）
-        java_keywords = {
-            'if', 'else', 'for', 'while', 'do', 'switch', 'case', 'default',
-            'try', 'catch', 'finally', 'throw', 'return', 'break', 'continue',
-            'class', 'interface', 'enum', 'extends', 'implements', 'super',
-            'this', 'new', 'instanceof', 'import', 'package', 'static',
-            'final', 'abstract', 'public', 'private', 'protected', 'void',
-            'int', 'long', 'double', 'float', 'boolean', 'char', 'byte',
-            'short', 'String', 'Object', 'null', 'true', 'false'
-        }
-        
         # クラス名を抽出（メソッドのコンテキストとして使用）
-        class_match = re.search(r'class\s+(\w+)', self.content)
+        class_match = _CLASS_NAME.search(self.content)
         class_name = class_match.group(1) if class_match else None
         
-        # メソッド定義パターン
-        # パターン1: 通常のメソッド定義
-        # [修飾子] 戻り値の型 メソッド名(引数) { ... }
-        # 修飾子は0個以上、戻り値の型は必須、メソッド名の後に(引数)が続く
-        pattern1 = re.compile(
-            r'(?:(?:public|private|protected|static|final|abstract|synchronized|native|strictfp)\s+)*'
-            r'(void|[\w<>\[\]\s,\.]+?)\s+'  # 戻り値の型（void、ジェネリクス、配列対応）
-            r'(\w+)\s*'  # メソッド名
-            r'\(([^)]*)\)\s*\{',  # 引数と開始波括弧
-            re.MULTILINE
-        )
-        
-        # パターン2: コンストラクタ
-        # [修飾子] クラス名(引数) { ... }
-        pattern2 = re.compile(
-            r'(?:(?:public|private|protected)\s+)?'
-            r'(\w+)\s*'  # クラス名（コンストラクタ名）
-            r'\(([^)]*)\)\s*\{',  # 引数と開始波括弧
-            re.MULTILINE
-        )
-        
-        # パターン3: インターフェースのメソッド（デフォルトメソッド、staticメソッド）
-        # default 戻り値の型 メソッド名(引数) { ... }
-        # static 戻り値の型 メソッド名(引数) { ... }
-        pattern3 = re.compile(
-            r'(?:default|static)\s+'
-            r'(void|[\w<>\[\]\s,\.]+?)\s+'  # 戻り値の型
-            r'(\w+)\s*'  # メソッド名
-            r'\(([^)]*)\)\s*\{',  # 引数と開始波括弧
-            re.MULTILINE
-        )
-        
-        # パターンの順序を調整（コンストラクタとインターフェースメソッドを先に検出）
-        patterns = [
-            (pattern2, 'constructor'),  # コンストラクタを先に
-            (pattern3, 'interface_method'),  # インターフェースメソッドを次に
-            (pattern1, 'method')  # 通常のメソッドを最後に
-        ]
+        line_index = LineIndex(self.content)
+        spans = BodySpans(self.content, LITERAL_PATTERN, line_index, self.fingerprint, JAVA_KEYWORDS)
         
         for pattern, method_type in patterns:
             for match in pattern.finditer(self.content):
                 if method_type == 'constructor':
                     method_name = match.group(1)
+                    name_end = match.end(1)
                     params_str = match.group(2).strip()
                     return_type = None
                 elif method_type == 'interface_method':
                     return_type_raw = match.group(1).strip()
                     method_name = match.group(2)
+                    name_end = match.end(2)
                     params_str = match.group(3).strip()
                 else:  # method
                     return_type_raw = match.group(1).strip()
                     method_name = match.group(2)
+                    name_end = match.end(2)
                     params_str = match.group(3).strip()
                 
                 # 戻り値の型から修飾子を除去
                 if method_type != 'constructor':
                     # 修飾子を除去
                     return_type = return_type_raw
-                    for modifier in ['public', 'private', 'protected', 'static', 'final', 
-                                    'abstract', 'synchronized', 'native', 'strictfp', 'default']:
-                        # 単語境界で修飾子を除去
-                        return_type = re.sub(r'\b' + modifier + r'\s+', '', return_type)
+                    for modifier_pattern in _MODIFIER_STRIP_PATTERNS:
+                        return_type = modifier_pattern.sub('', return_type)
                     # ジェネリクス型パラメータを除去（<T> void -> void）
-                    return_type = re.sub(r'^<[^>]+>\s+', '', return_type)
+                    return_type = _GENERIC_PREFIX.sub('', return_type)
                     return_type = return_type.strip()
                 else:
                     return_type = None
                 
                 # キーワードチェック
-                if method_name in java_keywords:
+                if method_name in JAVA_KEYWORDS:
                     continue
                 
                 # コンストラクタの場合はクラス名と一致するか確認
@@ -140,11 +201,11 @@ class JavaMethodExtractor:
                     before_text = self.content[max(0, start_pos - 100):start_pos]
                     # メソッド定義の前には修飾子、型、または改行がある
                     # 波括弧の後にメソッド定義が来ることはない（メソッド呼び出しの可能性）
-                    if re.search(r'\}\s*$', before_text):
+                    if _PRECEDED_BY_BRACE.search(before_text):
                         continue
                     
                     # メソッド呼び出しの可能性をチェック（前が変数名やオブジェクト参照の場合）
-                    if re.search(r'[a-zA-Z_]\w*\.\s*$', before_text):
+                    if _PRECEDED_BY_MEMBER_ACCESS.search(before_text):
                         continue
                     
                     # コンストラクタの場合はクラス名と一致する必要がある
@@ -156,27 +217,8 @@ class JavaMethodExtractor:
                 params = []
                 if params_str:
                     # 引数リストを解析（型 変数名, 型 変数名, ...）
-                    # カンマで分割するが、ジェネリクス内のカンマは考慮しない簡易版
-                    param_list = []
-                    depth = 0
-                    current_param = ""
-                    
-                    for char in params_str:
-                        if char == '<':
-                            depth += 1
-                            current_param += char
-                        elif char == '>':
-                            depth -= 1
-                            current_param += char
-                        elif char == ',' and depth == 0:
-                            if current_param.strip():
-                                param_list.append(current_param.strip())
-                            current_param = ""
-                        else:
-                            current_param += char
-                    
-                    if current_param.strip():
-                        param_list.append(current_param.strip())
+                    # ジェネリクスやアノテーションの引数、文字列内のカンマでは分割しない
+                    param_list = split_params(params_str, quotes='"\'')
                     
                     for param in param_list:
                         if not param:
@@ -191,8 +233,9 @@ class JavaMethodExtractor:
                             # 型のみの場合（例: "String..."）
                             params.append(parts[0])
                 
-                # メソッド定義の行番号を取得
-                line_num = self.content[:match.start()].count('\n') + 1
+                # メソッド定義の行番号と、本体の終了行・行数を取得
+                line_num = line_index.line(match.start())
+                end_line, line_count = spans.span(name_end, line_num)
                 
                 # 修飾子を抽出
                 modifiers = []
@@ -201,10 +244,8 @@ class JavaMethodExtractor:
                 method_context_start = max(0, method_start - 200)
                 method_context = self.content[method_context_start:method_start]
                 
-                modifier_keywords = ['public', 'private', 'protected', 'static', 'final', 
-                                    'abstract', 'synchronized', 'native', 'strictfp', 'default']
-                for modifier in modifier_keywords:
-                    if re.search(r'\b' + modifier + r'\b', method_context):
+                for modifier, modifier_pattern in _MODIFIER_FIND_PATTERNS:
+                    if modifier_pattern.search(method_context):
                         modifiers.append(modifier)
                 
                 methods.append({
@@ -215,8 +256,12 @@ class JavaMethodExtractor:
                     'modifiers': ', '.join(modifiers) if modifiers else '',
                     'class_name': class_name or '',
                     'file': str(self.file_path),
-                    'line': line_num
+                    'line': line_num,
+                    'end_line': end_line,
+                    'line_count': line_count
                 })
+                if self.fingerprint:
+                    methods[-1]['body_hash'], methods[-1]['body_tokens'] = spans.fingerprint(name_end)
         
         # 重複を除去（同じメソッドが複数のパターンでマッチする場合）
         # コンストラクタとインターフェースメソッドを優先
@@ -239,9 +284,10 @@ class JavaMethodExtractor:
         
         return unique_methods
     
-    def extract(self, raise_on_error: bool = True) -> List[Dict[str, any]]:
+    def extract(self) -> List[Dict[str, any]]:
         """メソッド情報を抽出して返す"""
-        self.read_file(raise_on_error=raise_on_error)
+        if not self._loaded:
+            self.read_file()
         return self.extract_methods()
     
     def print_results(self, methods: List[Dict[str, any]]) -> None:
@@ -264,6 +310,8 @@ class JavaMethodExtractor:
             if method['modifiers']:
                 print(f"  修飾子: {method['modifiers']}")
             print(f"  行番号: {method['line']}")
+            if method['end_line'] is not None:
+                print(f"  終了行: {method['end_line']}（{method['line_count']}行）")
             
             if method['parameters']:
                 print(f"  引数: {', '.join(method['parameters'])}")
@@ -272,81 +320,31 @@ class JavaMethodExtractor:
             
             print()
     
-    def export_to_csv(self, methods: List[Dict[str, any]], output_file: str = None) -> None:
-        """結果をCSV形式で出力"""
+    def export_to_csv(self, methods: List[Dict[str, any]], output_file: str = None) -> Optional[str]:
+        """結果をCSV形式で出力し、出力先のパスを返す（メソッドがない場合は出力せず None）"""
         if output_file is None:
             output_file = str(self.file_path.with_suffix('.csv'))
         
         if not methods:
-            print("メソッドが見つかりませんでした。")
-            return
+            return None
         
-        try:
-            with open(output_file, 'w', newline='', encoding='utf-8-sig') as f:
-                writer = csv.writer(f)
-                # ヘッダー行
-                writer.writerow(['ファイル', '行番号', 'クラス', '型', '修飾子', '戻り値の型', 'メソッド名', '引数'])
-                
-                # データ行
-                for method in methods:
-                    params_str = ', '.join(method['parameters']) if method['parameters'] else ''
-                    writer.writerow([
-                        method['file'],
-                        method['line'],
-                        method['class_name'],
-                        method['type'],
-                        method['modifiers'],
-                        method['return_type'],
-                        method['name'],
-                        params_str
-                    ])
-            
-            print(f"CSVファイルを出力しました: {output_file}")
-        except Exception as e:
-            print(f"エラー: CSVファイルの出力に失敗しました: {e}")
-            sys.exit(1)
+        write_csv(output_file, CSV_HEADER, (to_csv_row(method) for method in methods))
+        return output_file
 
 
-def read_file_list(list_csv_path: str) -> List[str]:
-    """一覧CSVファイルからファイルパスのリストを読み込む（絶対パス対応）"""
-    file_paths = []
-    try:
-        with open(list_csv_path, 'r', encoding='utf-8-sig') as f:
-            reader = csv.reader(f)
-            first_row = True
-            for row in reader:
-                if not row or not row[0].strip():
-                    continue
-                
-                file_path = row[0].strip()
-                
-                # 最初の行がヘッダー行の可能性をチェック（"ファイル"、"ファイルパス"などのキーワード）
-                if first_row:
-                    header_keywords = ['ファイル', 'ファイルパス', 'file', 'filepath', 'path', 'ファイル名']
-                    if file_path.lower() in [kw.lower() for kw in header_keywords]:
-                        first_row = False
-                        continue
-                    first_row = False
-                
-                # 絶対パスの場合はそのまま使用
-                if Path(file_path).is_absolute():
-                    file_paths.append(file_path)
-                else:
-                    # 相対パスの場合は一覧CSVファイルのディレクトリ基準で解決
-                    base_dir = Path(list_csv_path).parent
-                    resolved_path = str(base_dir / file_path)
-                    file_paths.append(resolved_path)
-        
-        return file_paths
-    except FileNotFoundError:
-        print(f"エラー: 一覧CSVファイル '{list_csv_path}' が見つかりません。")
-        sys.exit(1)
-    except Exception as e:
-        print(f"エラー: 一覧CSVファイルの読み込みに失敗しました: {e}")
-        sys.exit(1)
+def extract_file(file_path: str, content: Optional[str] = None,
+                 regex_backend: str = DEFAULT_REGEX_BACKEND) -> List[Dict[str, any]]:
+    """1ファイルからメソッド情報を抽出（一括処理用。content を指定した場合はファイルを読み込まない）"""
+    return JavaMethodExtractor(file_path, content=content, regex_backend=regex_backend).extract()
 
 
-def process_multiple_files(list_csv_path: str, output_file: str = None) -> None:
+def process_multiple_files(list_csv_path: str, output_file: str = None,
+                           quiet: bool = False, error_log: str = None,
+                           dedup: bool = True, normalized_dir: str = None,
+                           regex_backend: str = DEFAULT_REGEX_BACKEND,
+                           shard: Optional[Tuple[int, int]] = None,
+                           resume: bool = False, journal: bool = True,
+                           workers: int = 1, executor_kind: str = 'auto', index: bool = False) -> None:
     """一覧CSVファイルに記載された複数ファイルを処理"""
     file_paths = read_file_list(list_csv_path)
     
@@ -354,110 +352,161 @@ def process_multiple_files(list_csv_path: str, output_file: str = None) -> None:
         print("一覧CSVファイルにファイルパスが記載されていません。")
         return
     
-    print(f"処理対象ファイル数: {len(file_paths)}")
-    
-    all_methods = []
-    processed_count = 0
-    error_count = 0
-    
-    for file_path in file_paths:
-        file_path_obj = Path(file_path)
-        if not file_path_obj.exists():
-            print(f"警告: ファイルが見つかりません: {file_path}")
-            error_count += 1
-            continue
-        
-        if not file_path_obj.is_file():
-            print(f"警告: ファイルではありません: {file_path}")
-            error_count += 1
-            continue
-        
-        try:
-            extractor = JavaMethodExtractor(file_path)
-            methods = extractor.extract(raise_on_error=False)
-            all_methods.extend(methods)
-            processed_count += 1
-            print(f"処理完了: {file_path} ({len(methods)}個のメソッドを検出)")
-        except Exception as e:
-            print(f"エラー: {file_path} の処理に失敗しました: {e}")
-            error_count += 1
-            continue
-    
-    print(f"\n処理完了: {processed_count}ファイル, エラー: {error_count}ファイル")
-    print(f"合計 {len(all_methods)}個のメソッドを検出しました。")
-    
     # 結果をCSVに出力
     if output_file is None:
         output_file = str(Path(list_csv_path).with_suffix('')) + '_result.csv'
     
-    try:
-        with open(output_file, 'w', newline='', encoding='utf-8-sig') as f:
-            writer = csv.writer(f)
-            # ヘッダー行
-            writer.writerow(['ファイル', '行番号', 'クラス', '型', '修飾子', '戻り値の型', 'メソッド名', '引数'])
-            
-            # データ行
-            for method in all_methods:
-                params_str = ', '.join(method['parameters']) if method['parameters'] else ''
-                writer.writerow([
-                    method['file'],
-                    method['line'],
-                    method['class_name'],
-                    method['type'],
-                    method['modifiers'],
-                    method['return_type'],
-                    method['name'],
-                    params_str
-                ])
-        
-        print(f"結果をCSVファイルに出力しました: {output_file}")
-    except Exception as e:
-        print(f"エラー: CSVファイルの出力に失敗しました: {e}")
-        sys.exit(1)
+    extract = partial(extract_file, regex_backend=regex_backend)
+    run_batch(file_paths, extract, CSV_HEADER, to_csv_row, output_file, 'メソッド',
+              quiet=quiet, error_log_path=error_log, dedup=dedup,
+              normalized_dir=normalized_dir, dictionary_columns=DICTIONARY_COLUMNS,
+              shard=shard, resume=resume, journal=journal, workers=workers, executor_kind=executor_kind,
+              index_path=default_index_path(output_file) if index else None,
+              archive_extensions=language_extensions('java'))
 
 
 def main():
     """メイン関数"""
     if len(sys.argv) < 2:
         print("使用方法:")
-        print("  単一ファイル: python search_java.py <javaファイルのパス> [--csv [出力ファイル名]] [--json]")
-        print("  一覧CSV: python search_java.py --list <一覧CSVファイルのパス> [出力ファイル名]")
+        print("  単一ファイル: python search_java.py <javaファイルのパス> [--csv [出力ファイル名]] [--json [出力ファイル名]]")
+        print("  一覧CSV: python search_java.py --list <一覧CSVファイルのパス> [出力ファイル名] [--quiet] [--error-log <ログファイル>] [--no-dedup] [--normalized <出力ディレクトリ>] [--shard i/N] [--resume] [--no-journal]")
+        print("           [--workers <ワーカー数>] [--executor auto|process|thread] [--index]")
+        print("  Gradle: python search_java.py --gradle <ルートプロジェクトのディレクトリ> [出力ファイル名] [--workers <ワーカー数>]")
+        print("          [--cache-dir <キャッシュディレクトリ>] [--no-cache] [--quiet] [--error-log <ログファイル>]")
+        print("          [--executor auto|process|thread]")
+        print("  共通オプション: [--regex-backend re|regex|re2|auto]")
+        print("  正規化形式の復元: python search_java.py --inflate <出力ディレクトリ> [出力ファイル名]")
+        print("  索引の作成: python search_java.py --build-index <結果CSV> [索引ファイル]")
+        print("  メソッド名の検索: python search_java.py --search <パターン> <索引ファイルまたは結果CSV> [--regex | --fuzzy] [--case-sensitive]")
+        print("                    [--type <型>] [--file-prefix <パス>] [--limit <件数>]")
         print("")
         print("例:")
         print("  python search_java.py src/App.java")
         print("  python search_java.py src/App.java --csv")
         print("  python search_java.py src/App.java --csv output.csv")
         print("  python search_java.py src/App.java --json")
+        print("  python search_java.py src/App.java --json result.json.gz")
         print("  python search_java.py --list file_list.csv")
         print("  python search_java.py --list file_list.csv result.csv")
+        print("  python search_java.py --list file_list.csv result.csv --quiet --error-log errors.jsonl")
+        print("  python search_java.py --list file_list.csv --normalized result_db")
+        print("  python search_java.py --inflate result_db result.csv")
+        print("  python search_java.py --list file_list.csv result.csv --index")
+        print("  python search_java.py --search Validate result.csv")
+        print("  python search_java.py --list app.ear result.csv --workers 4")
+        print("  python search_java.py 'util-sources.jar!/com/example/Util.java'")
+        print("  python search_java.py --gradle path/to/main-project result.csv --workers 4")
+        sys.exit(1)
+    
+    try:
+        run(sys.argv[1:])
+    except ExtractionError as e:
+        print(f"エラー: {e}")
         sys.exit(1)
+
+
+def run(args: List[str]) -> None:
+    """コマンドライン引数に従って処理を実行（エラーは ExtractionError で通知）"""
+    # --regex-backend: メソッド定義パターンの正規表現エンジン（結果はどのエンジンでも同じ）
+    regex_backend = resolve_backend(pop_option(args, '--regex-backend'))
+    extract_options = {'regex_backend': regex_backend}
+    if not args:
+        raise UsageError("Javaファイルのパスまたは --list <一覧CSVファイルのパス> を指定してください。")
+    
+    # 結果CSVの関数名/メソッド名の索引の作成と検索
+    if args[0] in ('--build-index', '--search'):
+        run_index_command(args)
+        return
+    
+    # 正規化形式の出力から結果CSVを復元
+    if args[0] == '--inflate':
+        if len(args) < 2:
+            raise UsageError("正規化形式の出力ディレクトリを指定してください（--inflate <ディレクトリ> [出力ファイル名]）。")
+        inflate_to_csv(args[1], args[2] if len(args) > 2 else None)
+        return
+    
+    # Gradle モード（settings.gradle のサブプロジェクトをプロジェクト単位で並列に処理する）
+    if args[0] == '--gradle':
+        from search_gradle import process_gradle
+        quiet = pop_flag(args, '--quiet')
+        error_log = pop_option(args, '--error-log')
+        # --workers: 抽出に使うワーカー数（省略時はCPU数、1の場合はこのプロセスで順に処理）
+        # --executor: ワーカーの種類（auto は GIL のない CPython ではスレッド、それ以外ではプロセス）
+        workers = parse_workers(pop_option(args, '--workers'), os.cpu_count() or 1)
+        executor_kind = pop_option(args, '--executor') or 'auto'
+        resolve_executor(executor_kind)
+        # --cache-dir: プロジェクトごとの結果のキャッシュ（省略時は <出力ファイル名>_projects）
+        # --no-cache: キャッシュを読み書きせず、全プロジェクトを抽出する
+        cache_dir = pop_option(args, '--cache-dir')
+        use_cache = not pop_flag(args, '--no-cache')
+        if len(args) < 2:
+            raise UsageError("Gradle のルートプロジェクトのディレクトリを指定してください（--gradle <パス>）。")
+        process_gradle(args[1], args[2] if len(args) > 2 else None, workers=workers, cache_dir=cache_dir,
+                       use_cache=use_cache, quiet=quiet, error_log=error_log, executor_kind=executor_kind,
+                       **extract_options)
+        return
     
     # 一覧CSVモード
-    if sys.argv[1] == '--list':
-        if len(sys.argv) < 3:
+    if args[0] == '--list':
+        # --quiet: 進捗と警告を表示せず最後の集計のみ表示
+        # --error-log: 警告・エラーの出力先（省略時は <出力ファイル名>_errors.jsonl）
+        quiet = pop_flag(args, '--quiet')
+        error_log = pop_option(args, '--error-log')
+        # --no-dedup: 内容が同一のファイルも個別に解析する
+        dedup = not pop_flag(args, '--no-dedup')
+        # --normalized: 結果CSVの代わりに正規化形式（files / names / symbols の表）でディレクトリに出力
+        normalized_dir = pop_option(args, '--normalized')
+        # --shard i/N: 一覧をサイズで N 分割したうちの i 番目だけを処理し、マニフェストを出力（複数のマシンでの分担用）
+        shard = pop_option(args, '--shard')
+        shard = parse_shard(shard) if shard is not None else None
+        # --resume: 中断した処理をジャーナルの記録の続きから再開する
+        # --no-journal: 途中経過（ジャーナルと途中の結果CSV）を記録しない
+        resume = pop_flag(args, '--resume')
+        journal = not pop_flag(args, '--no-journal')
+        # --index: 結果CSVの出力後に関数名/メソッド名の索引（<出力ファイル名>_index.bin）を出力する
+        index = pop_flag(args, '--index')
+        # --workers: 解析に使うワーカー数（省略時は1で、このプロセスで順に処理）
+        # --executor: ワーカーの種類（auto は GIL のない CPython ではスレッド、それ以外ではプロセス）
+        workers = parse_workers(pop_option(args, '--workers'), 1)
+        executor_kind = pop_option(args, '--executor') or 'auto'
+        resolve_executor(executor_kind)
+        if len(args) < 2:
             print("エラー: 一覧CSVファイルのパスを指定してください。")
             print("使用方法: python search_java.py --list <一覧CSVファイルのパス> [出力ファイル名]")
             sys.exit(1)
         
-        list_csv_path = sys.argv[2]
-        output_file = sys.argv[3] if len(sys.argv) > 3 else None
-        process_multiple_files(list_csv_path, output_file)
+        list_csv_path = args[1]
+        output_file = args[2] if len(args) > 2 else None
+        process_multiple_files(list_csv_path, output_file, quiet=quiet, error_log=error_log,
+                               dedup=dedup, normalized_dir=normalized_dir, shard=shard, resume=resume,
+                               journal=journal, workers=workers, executor_kind=executor_kind, index=index,
+                               **extract_options)
         return
     
     # 単一ファイルモード
-    file_path = sys.argv[1]
-    extractor = JavaMethodExtractor(file_path)
+    file_path = args[0]
+    extractor = JavaMethodExtractor(file_path, **extract_options)
     methods = extractor.extract()
     
     # CSV形式で出力する場合
-    if len(sys.argv) > 2 and sys.argv[2] == '--csv':
-        output_file = sys.argv[3] if len(sys.argv) > 3 else None
-        extractor.export_to_csv(methods, output_file)
+    if len(args) > 1 and args[1] == '--csv':
+        output_file = args[2] if len(args) > 2 else None
+        written = extractor.export_to_csv(methods, output_file)
+        if written:
+            print(f"CSVファイルを出力しました: {written}")
+        else:
+            print("メソッドが見つかりませんでした。")
     # JSON形式で出力する場合
-    elif len(sys.argv) > 2 and sys.argv[2] == '--json':
-        import json
-        print("\n=== JSON形式 ===")
-        print(json.dumps(methods, ensure_ascii=False, indent=2))
+    elif len(args) > 1 and args[1] == '--json':
+        if len(args) > 2:
+            # 出力ファイル名が .gz / .xz で終わる場合は圧縮する
+            write_json(args[2], methods)
+            print(f"JSONファイルを出力しました: {args[2]}")
+        else:
+            import json
+            print("\n=== JSON形式 ===")
+            print(json.dumps(methods, ensure_ascii=False, indent=2))
     # 通常の表示
     else:
         extractor.print_results(methods)
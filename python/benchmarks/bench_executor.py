@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+一括処理のワーカーの種類（search_batch.make_executor）のベンチマーク
+
+一覧CSVに記載されたファイル（search_all.py と同じく言語の混在可）を run_batch() で処理し、
+ワーカー数ごとに次の種類の処理時間を比較する。
+    プロセス   ProcessPoolExecutor（GIL のある CPython での既定）
+    スレッド   ThreadPoolExecutor（GIL のない CPython での既定。ファイルの内容と結果の行を pickle しない）
+GIL のある CPython ではスレッドは並列に動かないため、スレッドの時間はワーカー数によらずほぼ一定になる。
+どの種類・ワーカー数でも結果CSVが同じ内容になることも確かめる。
+
+使用方法:
+    python benchmarks/bench_executor.py <一覧CSVファイルのパス> [ワーカー数 ...]
+"""
+
+import io
+import os
+import sys
+import time
+import tempfile
+import contextlib
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from search_common import read_file_list  # noqa: E402
+from search_all import CSV_HEADER, extract_file, to_csv_row  # noqa: E402
+from search_batch import run_batch, gil_disabled  # noqa: E402
+
+
+def run(file_paths: list, output_file: str, workers: int, executor_kind: str) -> float:
+    """run_batch() の処理時間（秒）"""
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        run_batch(file_paths, extract_file, CSV_HEADER, to_csv_row, output_file, '関数/メソッド',
+                  quiet=True, error_log_path=os.devnull, workers=workers, journal=False,
+                  executor_kind=executor_kind)
+    return time.perf_counter() - start
+
+
+def main():
+    if len(sys.argv) < 2:
+        print(__doc__)
+        sys.exit(1)
+    worker_counts = [int(value) for value in sys.argv[2:]] or [1, 2, 4, 8]
+    file_paths = read_file_list(sys.argv[1])
+    print(f"ファイル数 {len(file_paths)}, CPU数 {os.cpu_count()}, "
+          f"{'GIL なし' if gil_disabled() else 'GIL あり'}（Python {sys.version.split()[0]}）")
+    print()
+    
+    with tempfile.TemporaryDirectory() as work_dir:
+        expected = None
+        print(f"{'ワーカー':>8}{'プロセス(秒)':>14}{'スレッド(秒)':>14}{'比':>8}")
+        for workers in worker_counts:
+            times = {}
+            for executor_kind in ('process', 'thread'):
+                output_file = os.path.join(work_dir, f"{executor_kind}_{workers}.csv")
+                times[executor_kind] = run(file_paths, output_file, workers, executor_kind)
+                with open(output_file, 'rb') as f:
+                    content = f.read()
+                if expected is None:
+                    expected = content
+                elif content != expected:
+                    print(f"警告: {executor_kind}（ワーカー {workers}）の結果が一致しません")
+            print(f"{workers:>8}{times['process']:>14.3f}{times['thread']:>14.3f}"
+                  f"{times['thread'] / times['process']:>8.2f}")
+
+
+if __name__ == '__main__':
+    main()
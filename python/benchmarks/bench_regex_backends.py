@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+正規表現のバックエンド（search_regex）ごとの抽出時間のベンチマーク
+
+一覧CSVに記載されたファイル（JavaScript / Java / Rust の混在可）を読み込んでおき、
+インストールされている各バックエンド（re / regex / re2）で同じファイルを抽出して言語ごとの時間を比較する。
+各バックエンドの抽出結果が re と一致するかも確認する。
+
+使用方法:
+    python benchmarks/bench_regex_backends.py <一覧CSVファイルのパス> [繰り返し回数]
+"""
+
+import sys
+import time
+from collections import defaultdict
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from search_common import ExtractionError, read_file_list, read_source  # noqa: E402
+from search_api import detect_language, extract_source  # noqa: E402
+from search_regex import available_backends, compile_patterns  # noqa: E402
+from search import FUNCTION_PATTERNS as JS_PATTERNS  # noqa: E402
+from search_rust import FUNCTION_PATTERNS as RUST_PATTERNS  # noqa: E402
+from search_java import METHOD_PATTERNS as JAVA_PATTERNS  # noqa: E402
+
+
+PATTERN_SETS = {'javascript': JS_PATTERNS, 'java': JAVA_PATTERNS, 'rust': RUST_PATTERNS}
+
+
+def load_sources(list_csv_path: str) -> dict:
+    """言語 -> [(ファイルパス, 内容)]（読み込めないファイル・対応していない拡張子は除く）"""
+    sources = defaultdict(list)
+    for file_path in read_file_list(list_csv_path):
+        try:
+            language = detect_language(file_path)
+            sources[language].append((file_path, read_source(file_path)))
+        except ExtractionError:
+            continue
+    return sources
+
+
+def run(sources: list, language: str, backend: str) -> tuple:
+    """全ファイルを抽出して (経過秒数, 抽出結果のリスト) を返す"""
+    start = time.perf_counter()
+    results = [extract_source(content, file_path, language, regex_backend=backend)
+               for file_path, content in sources]
+    return time.perf_counter() - start, results
+
+
+def main():
+    if len(sys.argv) < 2:
+        print(__doc__)
+        sys.exit(1)
+    repeat = int(sys.argv[2]) if len(sys.argv) > 2 else 3
+    sources = load_sources(sys.argv[1])
+    backends = available_backends()
+    
+    # パターンのコンパイル（\w などの文字クラスの生成を含む）は計測から除く
+    for backend in backends:
+        start = time.perf_counter()
+        fallbacks = 0
+        for patterns in PATTERN_SETS.values():
+            compiled = compile_patterns(patterns, backend)
+            fallbacks += sum(1 for (pattern, _), (original, _) in zip(compiled, patterns)
+                             if backend != 're' and isinstance(pattern, type(original)))
+        print(f"{backend}: コンパイル {time.perf_counter() - start:.2f}秒, re のまま使うパターン {fallbacks}個")
+    print()
+    
+    print(f"{'言語':<12}{'ファイル数':>10}{'MB':>8}" + ''.join(f"{backend + '(秒)':>12}" for backend in backends)
+          + "  結果")
+    for language, files in sorted(sources.items()):
+        size = sum(len(content.encode('utf-8')) for _, content in files) / (1024 * 1024)
+        timings = {}
+        outputs = {}
+        for backend in backends:
+            best = None
+            for _ in range(repeat):
+                elapsed, results = run(files, language, backend)
+                best = elapsed if best is None else min(best, elapsed)
+            timings[backend] = best
+            outputs[backend] = results
+        mismatched = [backend for backend in backends if outputs[backend] != outputs['re']]
+        print(f"{language:<12}{len(files):>10}{size:>8.2f}"
+              + ''.join(f"{timings[backend]:>12.3f}" for backend in backends)
+              + f"  {'一致' if not mismatched else '相違: ' + ', '.join(mismatched)}")
+
+
+if __name__ == '__main__':
+    main()
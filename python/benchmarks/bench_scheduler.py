@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+一括処理のワーカーへの割り振り（search_batch.plan_batches）のベンチマーク
+
+一覧CSVに記載されたファイルの実際の解析時間をこのプロセスで1ファイルずつ計測し、
+その時間を使って workers 個のワーカーでの処理時間（最後のワーカーが終わるまでの時間）を再現する。
+比較する割り振り:
+    1ファイルずつ   一覧の順に1ファイル1タスクで渡す（従来の方式）
+    コスト順バッチ   plan_batches() のバッチを順に渡す
+どちらも空いたワーカーが次のタスクを取り、1タスクごとにプロセス間通信の時間（実測）を加える。
+理想値は 解析時間の合計 / workers。一覧をサイズの昇順に並べ替えた場合（大きなファイルが最後に来る）も計測する。
+
+使用方法:
+    python benchmarks/bench_scheduler.py <一覧CSVファイルのパス> [ワーカー数 ...]
+"""
+
+import sys
+import time
+import heapq
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from search_common import ExtractionError, read_file_list, read_source  # noqa: E402
+from search_api import detect_language, extract_source, estimate_cost  # noqa: E402
+from search_batch import plan_batches  # noqa: E402
+
+
+def measure(file_paths: list) -> list:
+    """(ファイルパス, サイズ, 解析時間) のリスト（読み込めないファイル・対応していない拡張子は除く）"""
+    measured = []
+    for file_path in file_paths:
+        try:
+            language = detect_language(file_path)
+            content = read_source(file_path)
+        except ExtractionError:
+            continue
+        start = time.perf_counter()
+        extract_source(content, file_path, language)
+        measured.append((file_path, len(content.encode('utf-8')), time.perf_counter() - start))
+    return measured
+
+
+def _echo(value):
+    return len(value)
+
+
+def measure_task_overhead() -> float:
+    """プロセスプールの1タスクあたりの往復時間（秒）"""
+    with ProcessPoolExecutor(max_workers=1) as executor:
+        list(executor.map(_echo, [b''] * 50))
+        start = time.perf_counter()
+        for future in [executor.submit(_echo, b'x' * 4096) for _ in range(2000)]:
+            future.result()
+        return (time.perf_counter() - start) / 2000
+
+
+def makespan(tasks: list, workers: int, overhead: float) -> float:
+    """タスク（解析時間の合計）を順に空いたワーカーへ渡した場合の処理時間"""
+    free = [0.0] * workers
+    for duration in tasks:
+        heapq.heappush(free, heapq.heappop(free) + duration + overhead)
+    return max(free)
+
+
+def main():
+    if len(sys.argv) < 2:
+        print(__doc__)
+        sys.exit(1)
+    worker_counts = [int(value) for value in sys.argv[2:]] or [2, 4, 8, 16]
+    measured = measure(read_file_list(sys.argv[1]))
+    overhead = measure_task_overhead()
+    total = sum(duration for _, _, duration in measured)
+    print(f"ファイル数 {len(measured)}, 解析時間の合計 {total:.2f}秒, "
+          f"1タスクの往復 {overhead * 1e6:.0f}マイクロ秒")
+    predicted = sum(estimate_cost(file_path, size) for file_path, size, _ in measured)
+    print(f"見積もりの合計 {predicted:.2f}秒（実測との比 {predicted / total:.2f}）")
+    print()
+    
+    orders = [('一覧の順', measured), ('サイズの昇順', sorted(measured, key=lambda item: item[1]))]
+    print(f"{'一覧':<10}{'ワーカー':>8}{'理想(秒)':>10}{'1ファイルずつ':>14}{'コスト順バッチ':>14}{'バッチ数':>8}")
+    for order_name, files in orders:
+        durations = {index: duration for index, (_, _, duration) in enumerate(files)}
+        items = [(index, file_path, size) for index, (file_path, size, _) in enumerate(files)]
+        for workers in worker_counts:
+            ideal = total / workers
+            naive = makespan([duration for _, _, duration in files], workers, overhead)
+            batches = plan_batches(items, workers, estimate_cost)
+            planned = makespan([sum(durations[item[0]] for item in batch) for batch in batches], workers, overhead)
+            print(f"{order_name:<10}{workers:>8}{ideal:>10.3f}"
+                  f"{naive:>8.3f}({naive / ideal - 1:+4.0%})"
+                  f"{planned:>8.3f}({planned / ideal - 1:+4.0%}){len(batches):>8}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+引数分割（search_common.split_params）のマイクロベンチマーク
+
+従来の search_java.py / search_rust.py の実装（1文字ずつ current_param += char で連結し、
+< と > の深さのみを追跡する方式）と比較する。
+続けて、JavaScript の引数名の抽出（split_params + strip_default）が分割代入・既定値を正しく扱うかを確かめる。
+
+使用方法:
+    python benchmarks/bench_split_params.py [繰り返し回数]
+"""
+
+import sys
+import timeit
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from search_common import split_params, strip_default  # noqa: E402
+
+
+def legacy_split_params(params_str: str) -> list:
+    """従来の実装（比較用）"""
+    param_list = []
+    depth = 0
+    current_param = ""
+    
+    for char in params_str:
+        if char == '<':
+            depth += 1
+            current_param += char
+        elif char == '>':
+            depth -= 1
+            current_param += char
+        elif char == ',' and depth == 0:
+            if current_param.strip():
+                param_list.append(current_param.strip())
+            current_param = ""
+        else:
+            current_param += char
+    
+    if current_param.strip():
+        param_list.append(current_param.strip())
+    return param_list
+
+
+# 長いジェネリクスを含むシグネチャ
+CASES = {
+    'java_short': 'String name, int age',
+    'java_service': ', '.join(
+        f'final Map<String, List<CustomerOrderLineItem>> customerOrderLineItemsByRegion{i}' for i in range(12)
+    ),
+    'java_generics': ', '.join(
+        f'Map<String, List<Map<Integer, Set<Optional<Entry{i}<K, V>>>>>> arg{i}' for i in range(12)
+    ),
+    'rust_generics': ', '.join(
+        f'arg{i}: HashMap<String, Vec<Result<Option<Box<Item{i}<T, U>>>, Error>>>' for i in range(12)
+    ),
+    'rust_service': ', '.join(
+        f'repository_{i}: Arc<dyn CustomerOrderRepository<Error = RepositoryError> + Send + Sync>' for i in range(12)
+    ),
+    'rust_closures': ', '.join(
+        f'f{i}: impl Fn(HashMap<K, V>, Vec<(u8, u16)>) -> Result<(), E{i}>' for i in range(12)
+    ),
+}
+
+
+# JavaScript の引数リスト -> 期待する引数名（search.py と同じく既定値はトップレベルの = 以降のみ除く）
+JS_PARAM_CASES = [
+    ('{ a = 1, b } = {}, c = 2', ['{ a = 1, b }', 'c']),
+    ('{ name = "Unknown", age = 0 } = {}', ['{ name = "Unknown", age = 0 }']),
+    ('id, { options = {}, callback = null } = {}, ...additionalArgs',
+     ['id', '{ options = {}, callback = null }', '...additionalArgs']),
+    ('f = (x) => x === 1, [p = "=", q] = []', ['f', '[p = "=", q]']),
+    ('sep = ",", eq = a == b', ['sep', 'eq']),
+]
+
+
+def js_param_names(params_str: str) -> list:
+    return [strip_default(param, quotes='"\'`')
+            for param in split_params(params_str, angle_brackets=False, quotes='"\'`')]
+
+
+def main():
+    number = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    
+    print(f"{'ケース':<16}{'文字数':>8}{'従来(μs)':>12}{'split_params(μs)':>18}{'倍率':>8}  結果")
+    for name, params_str in CASES.items():
+        legacy = timeit.timeit(lambda: legacy_split_params(params_str), number=number)
+        current = timeit.timeit(lambda: split_params(params_str), number=number)
+        same = legacy_split_params(params_str) == split_params(params_str)
+        print(f"{name:<16}{len(params_str):>8}"
+              f"{legacy / number * 1e6:>12.2f}{current / number * 1e6:>18.2f}"
+              f"{legacy / current:>7.1f}x  {'一致' if same else '相違（従来の実装は誤分割）'}")
+    
+    print()
+    print("JavaScript の引数名")
+    for params_str, expected in JS_PARAM_CASES:
+        actual = js_param_names(params_str)
+        print(f"  {'OK' if actual == expected else 'NG'}  {params_str}  ->  {actual}")
+
+
+if __name__ == '__main__':
+    main()
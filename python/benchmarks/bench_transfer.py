@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+ワーカーから親プロセスへの抽出結果の受け渡し形式のベンチマーク
+
+一覧CSVに記載されたファイル（search_all.py と同じく言語の混在可）を抽出しておき、
+バッチ単位で次の形式を pickle して復元し、CSVの行を得るまでの時間と転送量を比較する。
+    辞書             抽出結果の辞書のリストを送り、親プロセスで to_csv_row() を呼ぶ（従来の方式）
+    CSVの行          ワーカーで to_csv_row() を呼び、行のリストを送る（search_batch.extract_rows）
+    値の表+配列      行の値を重複のない表にまとめ、各セルは表のID（array('I')）で送る
+親プロセスは1つのため、一括処理全体の処理時間には「親」の時間が効く。
+
+使用方法:
+    python benchmarks/bench_transfer.py <一覧CSVファイルのパス> [バッチあたりのファイル数 ...]
+"""
+
+import sys
+import time
+import pickle
+from array import array
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from search_common import ExtractionError, read_file_list  # noqa: E402
+from search_all import CSV_HEADER, extract_file, to_csv_row  # noqa: E402
+
+
+def pack_table(files: list) -> tuple:
+    """ファイルごとの行のリストを (値の表, セルの配列, ファイルごとの行数) にする"""
+    ids = {}
+    table = []
+    cells = array('I')
+    counts = []
+    for rows in files:
+        for row in rows:
+            for value in row:
+                key = (type(value), value)
+                value_id = ids.get(key)
+                if value_id is None:
+                    value_id = ids[key] = len(table)
+                    table.append(value)
+                cells.append(value_id)
+        counts.append(len(rows))
+    return table, cells, counts
+
+
+def unpack_table(packed: tuple) -> list:
+    table, cells, counts = packed
+    width = len(CSV_HEADER)
+    values = list(map(table.__getitem__, cells))
+    files = []
+    position = 0
+    for count in counts:
+        end = position + count * width
+        files.append([values[start:start + width] for start in range(position, end, width)])
+        position = end
+    return files
+
+
+FORMATS = {
+    '辞書': (lambda files: files,
+             lambda files: [[to_csv_row(record) for record in records] for records in files]),
+    'CSVの行': (lambda files: [[to_csv_row(record) for record in records] for records in files],
+                lambda files: files),
+    '値の表+配列': (lambda files: pack_table([[to_csv_row(record) for record in records] for records in files]),
+                   unpack_table),
+}
+
+
+def main():
+    if len(sys.argv) < 2:
+        print(__doc__)
+        sys.exit(1)
+    batch_sizes = [int(value) for value in sys.argv[2:]] or [10, 50, 200]
+    extracted = []
+    for file_path in read_file_list(sys.argv[1]):
+        try:
+            extracted.append(extract_file(file_path))
+        except ExtractionError:
+            continue
+    print(f"ファイル数 {len(extracted)}, 関数/メソッド {sum(map(len, extracted))}件")
+    print()
+    
+    print(f"{'ファイル/バッチ':<14}{'形式':<14}{'ワーカー(秒)':>12}{'親(秒)':>10}{'転送量(KB)':>12}")
+    for batch_size in batch_sizes:
+        batches = [extracted[start:start + batch_size] for start in range(0, len(extracted), batch_size)]
+        expected = None
+        for name, (encode, decode) in FORMATS.items():
+            start = time.perf_counter()
+            payloads = [pickle.dumps(encode(batch), pickle.HIGHEST_PROTOCOL) for batch in batches]
+            worker_time = time.perf_counter() - start
+            start = time.perf_counter()
+            rows = [row for payload in payloads for file_rows in decode(pickle.loads(payload)) for row in file_rows]
+            parent_time = time.perf_counter() - start
+            if expected is None:
+                expected = rows
+            elif rows != expected:
+                print(f"警告: {name} の結果が一致しません")
+            print(f"{batch_size:<14}{name:<14}{worker_time:>12.3f}{parent_time:>10.3f}"
+                  f"{sum(map(len, payloads)) / 1024:>12.0f}")
+
+
+if __name__ == '__main__':
+    main()
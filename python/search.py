@@ -6,180 +6,253 @@ JavaScriptファイルから関数の名称、引数、ファイル名、行番
 
 import re
 import sys
-import csv
-from typing import List, Dict
+from functools import partial
+from typing import List, Dict, Optional, Tuple
 from pathlib import Path
 
+from search_common import (
+    ExtractionError, UsageError, LineIndex, BodySpans, FINGERPRINT_MODES, C_COMMENTS, read_source, read_file_list, write_csv, write_json,
+    split_params, strip_default, pop_flag, pop_option
+)
+from search_batch import run_batch, parse_shard, parse_workers, resolve_executor
+from search_api import language_extensions
+from search_normalized import inflate_to_csv
+from search_index import run_index_command, default_index_path
+from search_regex import DEFAULT_REGEX_BACKEND, resolve_backend, compile_patterns, filter_patterns
+
+
+# JavaScriptの予約語・キーワード（関数名として誤検出しないように）
+JS_KEYWORDS = frozenset({
+    'if', 'else', 'for', 'while', 'do', 'switch', 'case', 'default',
+    'try', 'catch', 'finally', 'throw', 'return', 'break', 'continue',
+    'var', 'let', 'const', 'function', 'class', 'extends', 'super',
+    'this', 'new', 'typeof', 'instanceof', 'in', 'of', 'with',
+    'import', 'export', 'from', 'as', 'default', 'static', 'async',
+    'await', 'yield', 'constructor', 'get', 'set', 'delete', 'void'
+})
+
+# 関数定義パターン（モジュール読み込み時に一度だけコンパイルし、全ファイルで共有する）
+FUNCTION_PATTERNS = [
+    # 非同期関数宣言: async function name(...) { ... }
+    (re.compile(r'async\s+function\s+(\w+)\s*\(([^)]*)\)', re.MULTILINE), 'async_function'),
+    # ジェネレータ関数宣言: function* name(...) { ... }
+    (re.compile(r'function\s*\*\s*(\w+)\s*\(([^)]*)\)', re.MULTILINE), 'generator_function'),
+    # 関数宣言: function name(...) { ... }
+    (re.compile(r'function\s+(\w+)\s*\(([^)]*)\)', re.MULTILINE), 'function'),
+    # 非同期関数式: const/let/var name = async function(...) { ... }
+    (re.compile(r'(?:const|let|var)\s+(\w+)\s*=\s*async\s+function\s*\(([^)]*)\)', re.MULTILINE),
+     'async_function_expression'),
+    # ジェネレータ関数式: const/let/var name = function*(...) { ... }
+    (re.compile(r'(?:const|let|var)\s+(\w+)\s*=\s*function\s*\*\s*\(([^)]*)\)', re.MULTILINE),
+     'generator_function_expression'),
+    # 関数式: const/let/var name = function(...) { ... }
+    (re.compile(r'(?:const|let|var)\s+(\w+)\s*=\s*function\s*\(([^)]*)\)', re.MULTILINE),
+     'function_expression'),
+    # 非同期アロー関数: const/let/var name = async (...) => { ... }
+    (re.compile(r'(?:const|let|var)\s+(\w+)\s*=\s*async\s+\(([^)]*)\)\s*=>', re.MULTILINE),
+     'async_arrow_function'),
+    # アロー関数: const/let/var name = (...) => { ... }
+    (re.compile(r'(?:const|let|var)\s+(\w+)\s*=\s*\(([^)]*)\)\s*=>', re.MULTILINE), 'arrow_function'),
+    # メソッド定義: name(...) { ... } (ES6) - キーワードを除外
+    # オブジェクトリテラルやクラス内のメソッドを検出
+    # 先頭の \b は単語の途中からのマッチ試行を省くためのもの（結果は変わらない）
+    (re.compile(r'\b(\w+)\s*\(([^)]*)\)\s*\{', re.MULTILINE), 'method'),
+]
+
+# 各パターンのマッチに必ず含まれる文字列（search_regex.filter_patterns）
+# 含まれないパターンは実行せず、どのパターンも実行しないファイルは解析自体を省く
+# （function と * の間には空白を置けるため、function* ではなく別々に調べる）
+_DECLARATION_KEYWORDS = ('const', 'let', 'var')
+PATTERN_ANCHORS = {
+    'async_function': ('async', 'function'),
+    'generator_function': ('function', '*'),
+    'function': ('function',),
+    'async_function_expression': (_DECLARATION_KEYWORDS, 'async', 'function'),
+    'generator_function_expression': (_DECLARATION_KEYWORDS, 'function', '*'),
+    'function_expression': (_DECLARATION_KEYWORDS, 'function'),
+    'async_arrow_function': (_DECLARATION_KEYWORDS, 'async', '=>'),
+    'arrow_function': (_DECLARATION_KEYWORDS, '=>'),
+    'method': ('(', '{'),
+}
+
+# 文字列リテラルの引用符（デフォルト引数の文字列内のカンマで分割しないように）
+JS_QUOTES = '"\'`'
+
+# 文字列リテラル（テンプレートリテラルを含む）とコメント（関数本体の範囲の検出で除外する）
+# 正規表現リテラルは検出しない
+LITERAL_PATTERN = re.compile(
+    C_COMMENTS + r'|"[^"\\\n]*(?:\\[\s\S][^"\\\n]*)*"|\'[^\'\\\n]*(?:\\[\s\S][^\'\\\n]*)*\''
+    r'|`[^`\\]*(?:\\[\s\S][^`\\]*)*`'
+)
+
+# メソッドパターンの直前に来てよい文字（空白以外では、カンマ、セミコロン、波括弧、コロン）
+_METHOD_PRECEDING_CHARS = frozenset(',{;:')
+
+# minify（圧縮）されたファイルの判定基準
+# 先頭 MINIFIED_SAMPLE_SIZE 文字の平均行長と空白文字の割合で判定する
+MINIFIED_SAMPLE_SIZE = 64 * 1024
+MINIFIED_MIN_SIZE = 4 * 1024
+MINIFIED_LINE_LENGTH = 500
+MINIFIED_WHITESPACE_RATIO = 0.12
+
+# minifyされたファイルの扱い
+#   skip: 解析しない
+#   cap : 先頭 minified_cap 文字のみ解析する（既定）
+#   full: ファイル全体を解析する
+MINIFIED_POLICIES = ('skip', 'cap', 'full')
+DEFAULT_MINIFIED_POLICY = 'cap'
+DEFAULT_MINIFIED_CAP = 256 * 1024
+
+# CSV出力の列
+CSV_HEADER = ['ファイル', '行番号', '列', '終了行', '行数', '型', '関数名', '引数']
+# 正規化形式（--normalized）で辞書符号化する列（値の種類が少なく繰り返しの多い列）
+DICTIONARY_COLUMNS = ['型']
+
+
+def to_csv_row(func: Dict[str, any]) -> List:
+    """関数情報をCSVの1行に変換"""
+    params_str = ', '.join(func['parameters']) if func['parameters'] else ''
+    return [
+        func['file'],
+        func['line'],
+        func['column'],
+        func['end_line'],
+        func['line_count'],
+        func['type'],
+        func['name'],
+        params_str
+    ]
+
+
+def is_minified(content: str) -> bool:
+    """minify（圧縮）されたJavaScriptかどうかを平均行長と空白文字の割合で判定"""
+    if len(content) < MINIFIED_MIN_SIZE:
+        return False
+    sample = content[:MINIFIED_SAMPLE_SIZE]
+    average_line_length = len(sample) / (sample.count('\n') + 1)
+    if average_line_length < MINIFIED_LINE_LENGTH:
+        return False
+    whitespace = sample.count(' ') + sample.count('\t') + sample.count('\n') + sample.count('\r')
+    return whitespace / len(sample) < MINIFIED_WHITESPACE_RATIO
+
 
 class JavaScriptFunctionExtractor:
     """JavaScriptファイルから関数情報を抽出するクラス"""
     
-    def __init__(self, file_path: str):
+    def __init__(self, file_path: str, content: Optional[str] = None,
+                 minified_policy: str = DEFAULT_MINIFIED_POLICY,
+                 minified_cap: int = DEFAULT_MINIFIED_CAP,
+                 regex_backend: str = DEFAULT_REGEX_BACKEND,
+                 fingerprint: Optional[str] = None):
         self.file_path = Path(file_path)
-        self.content = ""
-        
-    def read_file(self, raise_on_error: bool = True) -> None:
-        """ファイルを読み込む"""
-        try:
-            with open(self.file_path, 'r', encoding='utf-8') as f:
-                self.content = f.read()
-        except FileNotFoundError:
-            error_msg = f"エラー: ファイル '{self.file_path}' が見つかりません。"
-            if raise_on_error:
-                print(error_msg)
-                sys.exit(1)
-            else:
-                raise FileNotFoundError(error_msg)
-        except Exception as e:
-            error_msg = f"エラー: ファイルの読み込みに失敗しました: {e}"
-            if raise_on_error:
-                print(error_msg)
-                sys.exit(1)
-            else:
-                raise
+        # content を指定した場合はファイルを読み込まずにその内容を解析する
+        self.content = content if content is not None else ""
+        self._loaded = content is not None
+        if minified_policy not in MINIFIED_POLICIES:
+            raise UsageError(f"minifyされたファイルの扱いは {', '.join(MINIFIED_POLICIES)} のいずれかです: {minified_policy}")
+        self.minified_policy = minified_policy
+        self.minified_cap = minified_cap
+        # 関数定義パターンの正規表現エンジン（search_regex）
+        self.regex_backend = resolve_backend(regex_backend)
+        if fingerprint is not None and fingerprint not in FINGERPRINT_MODES:
+            raise UsageError(f"関数本体の指紋の種類は {' / '.join(FINGERPRINT_MODES)} のいずれかです: {fingerprint}")
+        # 関数本体の指紋（search_common.body_fingerprint）の種類。None の場合は求めない
+        self.fingerprint = fingerprint
+        # 直近の extract_functions() でminifyされたファイルと判定したかどうか
+        self.minified = False
+    
+    def read_file(self) -> None:
+        """ファイルを読み込む（失敗時は SourceNotFoundError / SourceReadError を送出）"""
+        self.content = read_source(self.file_path)
+        self._loaded = True
     
     def extract_functions(self) -> List[Dict[str, any]]:
         """関数定義を抽出"""
-        functions = []
-        
-        # JavaScriptの予約語・キーワード（関数名として誤検出しないように）
-        js_keywords = {
-            'if', 'else', 'for', 'while', 'do', 'switch', 'case', 'default',
-            'try', 'catch', 'finally', 'throw', 'return', 'break', 'continue',
-            'var', 'let', 'const', 'function', 'class', 'extends', 'super',
-            'this', 'new', 'typeof', 'instanceof', 'in', 'of', 'with',
-            'import', 'export', 'from', 'as', 'default', 'static', 'async',
-            'await', 'yield', 'constructor', 'get', 'set', 'delete', 'void'
-        }
-        
-        # 関数宣言: function name(...) { ... }
-        pattern1 = re.compile(
-            r'function\s+(\w+)\s*\(([^)]*)\)',
-            re.MULTILINE
-        )
-        
-        # 非同期関数宣言: async function name(...) { ... }
-        pattern1_async = re.compile(
-            r'async\s+function\s+(\w+)\s*\(([^)]*)\)',
-            re.MULTILINE
-        )
-        
-        # ジェネレータ関数宣言: function* name(...) { ... }
-        pattern1_gen = re.compile(
-            r'function\s*\*\s*(\w+)\s*\(([^)]*)\)',
-            re.MULTILINE
-        )
+        self.minified = is_minified(self.content)
+        if not self.minified:
+            return self._scan(self.content)
         
-        # 関数式: const/let/var name = function(...) { ... }
-        pattern2 = re.compile(
-            r'(?:const|let|var)\s+(\w+)\s*=\s*function\s*\(([^)]*)\)',
-            re.MULTILINE
-        )
-        
-        # 非同期関数式: const/let/var name = async function(...) { ... }
-        pattern2_async = re.compile(
-            r'(?:const|let|var)\s+(\w+)\s*=\s*async\s+function\s*\(([^)]*)\)',
-            re.MULTILINE
-        )
-        
-        # ジェネレータ関数式: const/let/var name = function*(...) { ... }
-        pattern2_gen = re.compile(
-            r'(?:const|let|var)\s+(\w+)\s*=\s*function\s*\*\s*\(([^)]*)\)',
-            re.MULTILINE
-        )
-        
-        # アロー関数: const/let/var name = (...) => { ... }
-        pattern3 = re.compile(
-            r'(?:const|let|var)\s+(\w+)\s*=\s*\(([^)]*)\)\s*=>',
-            re.MULTILINE
-        )
-        
-        # 非同期アロー関数: const/let/var name = async (...) => { ... }
-        pattern3_async = re.compile(
-            r'(?:const|let|var)\s+(\w+)\s*=\s*async\s+\(([^)]*)\)\s*=>',
-            re.MULTILINE
-        )
-        
-        # メソッド定義: name(...) { ... } (ES6) - キーワードを除外
-        # オブジェクトリテラルやクラス内のメソッドを検出
-        pattern4 = re.compile(
-            r'(\w+)\s*\(([^)]*)\)\s*\{',
-            re.MULTILINE
-        )
+        # minifyされたファイル（1行に全コードが詰め込まれたバンドルなど）
+        # 行番号はほぼ常に1になるため、列番号で位置を示す
+        if self.minified_policy == 'skip':
+            return []
+        if self.minified_policy == 'cap':
+            return self._scan(self.content[:self.minified_cap], by_position=True)
+        return self._scan(self.content, by_position=True)
+    
+    def _scan(self, content: str, by_position: bool = False) -> List[Dict[str, any]]:
+        """
+        content から関数定義を検出
         
-        patterns = [
-            (pattern1_async, 'async_function'),
-            (pattern1_gen, 'generator_function'),
-            (pattern1, 'function'),
-            (pattern2_async, 'async_function_expression'),
-            (pattern2_gen, 'generator_function_expression'),
-            (pattern2, 'function_expression'),
-            (pattern3_async, 'async_arrow_function'),
-            (pattern3, 'arrow_function'),
-            (pattern4, 'method')
-        ]
+        by_position=True の場合、重複判定を (関数名, 行番号) ではなく (関数名, 関数名の位置) で行う。
+        minifyされたファイルはすべて1行目になるため、同名の別関数を区別するのに使用する。
+        """
+        patterns = filter_patterns(compile_patterns(FUNCTION_PATTERNS, self.regex_backend), PATTERN_ANCHORS, content)
+        if not patterns:
+            return []
+        functions = []
+        keys = []
+        line_index = LineIndex(content)
+        spans = BodySpans(content, LITERAL_PATTERN, line_index, self.fingerprint, JS_KEYWORDS)
+        file_name = str(self.file_path)
         
         for pattern, func_type in patterns:
-            for match in pattern.finditer(self.content):
+            for match in pattern.finditer(content):
                 func_name = match.group(1)
                 params_str = match.group(2).strip()
+                start_pos = match.start()
                 
                 # メソッドパターンの場合、キーワードを除外
                 if func_type == 'method':
-                    if func_name in js_keywords:
+                    if func_name in JS_KEYWORDS:
                         continue
-                    # 前の文字を確認して、オブジェクトやクラスのメソッドかどうかを判定
-                    start_pos = match.start()
+                    # 直前の文字を確認して、オブジェクトやクラスのメソッドかどうかを判定
+                    # （空白、カンマ、セミコロン、波括弧、コロンの後のみメソッドとみなす）
                     if start_pos > 0:
-                        before_text = self.content[max(0, start_pos - 20):start_pos]
-                        # オブジェクトリテラルやクラス内のメソッドのパターンを確認
-                        # 前が空白、カンマ、セミコロン、波括弧、コロン、改行など
-                        if not re.search(r'[,\s{;:\n]\s*$', before_text):
+                        before_char = content[start_pos - 1]
+                        if not before_char.isspace() and before_char not in _METHOD_PRECEDING_CHARS:
                             continue
                 
                 # 引数を解析
                 params = []
                 if params_str:
                     # デフォルト引数や分割代入を考慮して解析
-                    param_list = [p.strip() for p in params_str.split(',')]
-                    for param in param_list:
-                        if not param:
-                            continue
-                        # デフォルト引数から変数名を抽出
-                        param_name = param.split('=')[0].strip()
-                        # 分割代入から変数名を抽出（簡易版）
-                        if '{' in param_name or '[' in param_name:
-                            # 分割代入の場合はそのまま保持
-                            params.append(param_name)
-                        else:
-                            # 通常の引数
-                            params.append(param_name)
-                
-                # 関数定義の行番号を取得
-                line_num = self.content[:match.start()].count('\n') + 1
+                    # （{a, b} や [c, d]、文字列リテラル内のカンマでは分割しない）
+                    for param in split_params(params_str, angle_brackets=False, quotes=JS_QUOTES):
+                        # デフォルト引数から変数名を抽出（トップレベルの = 以降を除く）
+                        # 分割代入の場合は内側の既定値を含めてそのまま保持（簡易版）
+                        params.append(strip_default(param, quotes=JS_QUOTES))
                 
+                line_num = line_index.line(start_pos)
+                end_line, line_count = spans.span(match.end(1), line_num)
                 functions.append({
                     'name': func_name,
                     'type': func_type,
                     'parameters': params,
-                    'file': str(self.file_path),
-                    'line': line_num
+                    'file': file_name,
+                    'line': line_num,
+                    'column': line_index.column(start_pos),
+                    'end_line': end_line,
+                    'line_count': line_count
                 })
+                if self.fingerprint:
+                    functions[-1]['body_hash'], functions[-1]['body_tokens'] = spans.fingerprint(match.end(1))
+                keys.append((func_name, match.start(1) if by_position else line_num))
         
         # 重複を除去（同じ関数が複数のパターンでマッチする場合）
         seen = set()
         unique_functions = []
-        for func in functions:
-            key = (func['name'], func['line'])
+        for func, key in zip(functions, keys):
             if key not in seen:
                 seen.add(key)
                 unique_functions.append(func)
         
         return unique_functions
     
-    def extract(self, raise_on_error: bool = True) -> List[Dict[str, any]]:
+    def extract(self) -> List[Dict[str, any]]:
         """関数情報を抽出して返す"""
-        self.read_file(raise_on_error=raise_on_error)
+        if not self._loaded:
+            self.read_file()
         return self.extract_functions()
     
     def print_results(self, functions: List[Dict[str, any]]) -> None:
@@ -196,6 +269,10 @@ class JavaScriptFunctionExtractor:
             print(f"  名称: {func['name']}")
             print(f"  型: {func['type']}")
             print(f"  行番号: {func['line']}")
+            if func['end_line'] is not None:
+                print(f"  終了行: {func['end_line']}（{func['line_count']}行）")
+            if self.minified:
+                print(f"  列: {func['column']}")
             
             if func['parameters']:
                 print(f"  引数: {', '.join(func['parameters'])}")
@@ -204,63 +281,36 @@ class JavaScriptFunctionExtractor:
             
             print()
     
-    def export_to_csv(self, functions: List[Dict[str, any]], output_file: str = None) -> None:
-        """結果をCSV形式で出力"""
+    def export_to_csv(self, functions: List[Dict[str, any]], output_file: str = None) -> Optional[str]:
+        """結果をCSV形式で出力し、出力先のパスを返す（関数がない場合は出力せず None）"""
         if output_file is None:
             output_file = str(self.file_path.with_suffix('.csv'))
         
         if not functions:
-            print("関数が見つかりませんでした。")
-            return
+            return None
         
-        try:
-            with open(output_file, 'w', newline='', encoding='utf-8-sig') as f:
-                writer = csv.writer(f)
-                # ヘッダー行
-                writer.writerow(['ファイル', '行番号', '型', '関数名', '引数'])
-                
-                # データ行
-                for func in functions:
-                    params_str = ', '.join(func['parameters']) if func['parameters'] else ''
-                    writer.writerow([
-                        func['file'],
-                        func['line'],
-                        func['type'],
-                        func['name'],
-                        params_str
-                    ])
-            
-            print(f"CSVファイルを出力しました: {output_file}")
-        except Exception as e:
-            print(f"エラー: CSVファイルの出力に失敗しました: {e}")
-            sys.exit(1)
+        write_csv(output_file, CSV_HEADER, (to_csv_row(func) for func in functions))
+        return output_file
 
 
-def read_file_list(list_csv_path: str) -> List[str]:
-    """一覧CSVファイルからファイルパスのリストを読み込む"""
-    file_paths = []
-    try:
-        with open(list_csv_path, 'r', encoding='utf-8-sig') as f:
-            reader = csv.reader(f)
-            for row in reader:
-                if row and row[0].strip():  # 1列目が空でない場合
-                    file_path = row[0].strip()
-                    # 絶対パスに変換
-                    if not Path(file_path).is_absolute():
-                        # 相対パスの場合は一覧CSVファイルのディレクトリ基準で解決
-                        base_dir = Path(list_csv_path).parent
-                        file_path = str(base_dir / file_path)
-                    file_paths.append(file_path)
-        return file_paths
-    except FileNotFoundError:
-        print(f"エラー: 一覧CSVファイル '{list_csv_path}' が見つかりません。")
-        sys.exit(1)
-    except Exception as e:
-        print(f"エラー: 一覧CSVファイルの読み込みに失敗しました: {e}")
-        sys.exit(1)
+def extract_file(file_path: str, content: Optional[str] = None,
+                 minified_policy: str = DEFAULT_MINIFIED_POLICY,
+                 minified_cap: int = DEFAULT_MINIFIED_CAP,
+                 regex_backend: str = DEFAULT_REGEX_BACKEND) -> List[Dict[str, any]]:
+    """1ファイルから関数情報を抽出（一括処理用。content を指定した場合はファイルを読み込まない）"""
+    return JavaScriptFunctionExtractor(file_path, content=content, minified_policy=minified_policy,
+                                       minified_cap=minified_cap, regex_backend=regex_backend).extract()
 
 
-def process_multiple_files(list_csv_path: str, output_file: str = None) -> None:
+def process_multiple_files(list_csv_path: str, output_file: str = None,
+                           quiet: bool = False, error_log: str = None,
+                           dedup: bool = True, normalized_dir: str = None,
+                           minified_policy: str = DEFAULT_MINIFIED_POLICY,
+                           minified_cap: int = DEFAULT_MINIFIED_CAP,
+                           regex_backend: str = DEFAULT_REGEX_BACKEND,
+                           shard: Optional[Tuple[int, int]] = None,
+                           resume: bool = False, journal: bool = True,
+                           workers: int = 1, executor_kind: str = 'auto', index: bool = False) -> None:
     """一覧CSVファイルに記載された複数ファイルを処理"""
     file_paths = read_file_list(list_csv_path)
     
@@ -268,107 +318,146 @@ def process_multiple_files(list_csv_path: str, output_file: str = None) -> None:
         print("一覧CSVファイルにファイルパスが記載されていません。")
         return
     
-    print(f"処理対象ファイル数: {len(file_paths)}")
-    
-    all_functions = []
-    processed_count = 0
-    error_count = 0
-    
-    for file_path in file_paths:
-        file_path_obj = Path(file_path)
-        if not file_path_obj.exists():
-            print(f"警告: ファイルが見つかりません: {file_path}")
-            error_count += 1
-            continue
-        
-        if not file_path_obj.is_file():
-            print(f"警告: ファイルではありません: {file_path}")
-            error_count += 1
-            continue
-        
-        try:
-            extractor = JavaScriptFunctionExtractor(file_path)
-            functions = extractor.extract(raise_on_error=False)
-            all_functions.extend(functions)
-            processed_count += 1
-            print(f"処理完了: {file_path} ({len(functions)}個の関数を検出)")
-        except Exception as e:
-            print(f"エラー: {file_path} の処理に失敗しました: {e}")
-            error_count += 1
-            continue
-    
-    print(f"\n処理完了: {processed_count}ファイル, エラー: {error_count}ファイル")
-    print(f"合計 {len(all_functions)}個の関数を検出しました。")
-    
     # 結果をCSVに出力
     if output_file is None:
         output_file = str(Path(list_csv_path).with_suffix('')) + '_result.csv'
     
-    try:
-        with open(output_file, 'w', newline='', encoding='utf-8-sig') as f:
-            writer = csv.writer(f)
-            # ヘッダー行
-            writer.writerow(['ファイル', '行番号', '型', '関数名', '引数'])
-            
-            # データ行
-            for func in all_functions:
-                params_str = ', '.join(func['parameters']) if func['parameters'] else ''
-                writer.writerow([
-                    func['file'],
-                    func['line'],
-                    func['type'],
-                    func['name'],
-                    params_str
-                ])
-        
-        print(f"結果をCSVファイルに出力しました: {output_file}")
-    except Exception as e:
-        print(f"エラー: CSVファイルの出力に失敗しました: {e}")
-        sys.exit(1)
+    extract = partial(extract_file, minified_policy=minified_policy, minified_cap=minified_cap,
+                      regex_backend=regex_backend)
+    run_batch(file_paths, extract, CSV_HEADER, to_csv_row, output_file, '関数',
+              quiet=quiet, error_log_path=error_log, dedup=dedup,
+              normalized_dir=normalized_dir, dictionary_columns=DICTIONARY_COLUMNS,
+              shard=shard, resume=resume, journal=journal, workers=workers, executor_kind=executor_kind,
+              index_path=default_index_path(output_file) if index else None,
+              archive_extensions=language_extensions('javascript'))
 
 
 def main():
     """メイン関数"""
     if len(sys.argv) < 2:
         print("使用方法:")
-        print("  単一ファイル: python search.py <jsファイルのパス> [--csv [出力ファイル名]] [--json]")
-        print("  一覧CSV: python search.py --list <一覧CSVファイルのパス> [出力ファイル名]")
+        print("  単一ファイル: python search.py <jsファイルのパス> [--csv [出力ファイル名]] [--json [出力ファイル名]]")
+        print("  共通オプション: [--minified skip|cap|full] [--minified-cap <文字数>] [--regex-backend re|regex|re2|auto]")
+        print("  一覧CSV: python search.py --list <一覧CSVファイルのパス> [出力ファイル名] [--quiet] [--error-log <ログファイル>] [--no-dedup] [--normalized <出力ディレクトリ>] [--shard i/N] [--resume] [--no-journal]")
+        print("           [--workers <ワーカー数>] [--executor auto|process|thread] [--index]")
+        print("  正規化形式の復元: python search.py --inflate <出力ディレクトリ> [出力ファイル名]")
+        print("  索引の作成: python search.py --build-index <結果CSV> [索引ファイル]")
+        print("  関数名の検索: python search.py --search <パターン> <索引ファイルまたは結果CSV> [--regex | --fuzzy] [--case-sensitive]")
+        print("                [--type <型>] [--file-prefix <パス>] [--limit <件数>]")
         print("")
         print("例:")
         print("  python search.py src/app.js")
         print("  python search.py src/app.js --csv")
         print("  python search.py src/app.js --csv output.csv")
         print("  python search.py src/app.js --json")
+        print("  python search.py src/app.js --json result.json.gz")
         print("  python search.py --list file_list.csv")
         print("  python search.py --list file_list.csv result.csv")
+        print("  python search.py --list file_list.csv result.csv --quiet --error-log errors.jsonl")
+        print("  python search.py --list file_list.csv --normalized result_db")
+        print("  python search.py --inflate result_db result.csv")
+        print("  python search.py --list file_list.csv result.csv --index")
+        print("  python search.py --search Validate result.csv")
+        print("  python search.py --list app.war result.csv")
+        print("  python search.py dist/bundle.min.js --minified full")
         sys.exit(1)
     
+    try:
+        run(sys.argv[1:])
+    except ExtractionError as e:
+        print(f"エラー: {e}")
+        sys.exit(1)
+
+
+def run(args: List[str]) -> None:
+    """コマンドライン引数に従って処理を実行（エラーは ExtractionError で通知）"""
+    # --minified: minifyされたファイルの扱い（skip / cap / full）
+    # --minified-cap: cap の場合に解析する先頭の文字数
+    minified_policy = pop_option(args, '--minified') or DEFAULT_MINIFIED_POLICY
+    minified_cap = pop_option(args, '--minified-cap')
+    try:
+        minified_cap = int(minified_cap) if minified_cap is not None else DEFAULT_MINIFIED_CAP
+    except ValueError:
+        raise UsageError(f"--minified-cap には文字数を指定してください: {minified_cap}") from None
+    # --regex-backend: 関数定義パターンの正規表現エンジン（結果はどのエンジンでも同じ）
+    regex_backend = resolve_backend(pop_option(args, '--regex-backend'))
+    extract_options = {'minified_policy': minified_policy, 'minified_cap': minified_cap,
+                       'regex_backend': regex_backend}
+    if not args:
+        raise UsageError("JavaScriptファイルのパスまたは --list <一覧CSVファイルのパス> を指定してください。")
+    
+    # 結果CSVの関数名/メソッド名の索引の作成と検索
+    if args[0] in ('--build-index', '--search'):
+        run_index_command(args)
+        return
+    
+    # 正規化形式の出力から結果CSVを復元
+    if args[0] == '--inflate':
+        if len(args) < 2:
+            raise UsageError("正規化形式の出力ディレクトリを指定してください（--inflate <ディレクトリ> [出力ファイル名]）。")
+        inflate_to_csv(args[1], args[2] if len(args) > 2 else None)
+        return
+    
     # 一覧CSVモード
-    if sys.argv[1] == '--list':
-        if len(sys.argv) < 3:
+    if args[0] == '--list':
+        # --quiet: 進捗と警告を表示せず最後の集計のみ表示
+        # --error-log: 警告・エラーの出力先（省略時は <出力ファイル名>_errors.jsonl）
+        quiet = pop_flag(args, '--quiet')
+        error_log = pop_option(args, '--error-log')
+        # --no-dedup: 内容が同一のファイルも個別に解析する
+        dedup = not pop_flag(args, '--no-dedup')
+        # --normalized: 結果CSVの代わりに正規化形式（files / names / symbols の表）でディレクトリに出力
+        normalized_dir = pop_option(args, '--normalized')
+        # --shard i/N: 一覧をサイズで N 分割したうちの i 番目だけを処理し、マニフェストを出力（複数のマシンでの分担用）
+        shard = pop_option(args, '--shard')
+        shard = parse_shard(shard) if shard is not None else None
+        # --resume: 中断した処理をジャーナルの記録の続きから再開する
+        # --no-journal: 途中経過（ジャーナルと途中の結果CSV）を記録しない
+        resume = pop_flag(args, '--resume')
+        journal = not pop_flag(args, '--no-journal')
+        # --index: 結果CSVの出力後に関数名/メソッド名の索引（<出力ファイル名>_index.bin）を出力する
+        index = pop_flag(args, '--index')
+        # --workers: 解析に使うワーカー数（省略時は1で、このプロセスで順に処理）
+        # --executor: ワーカーの種類（auto は GIL のない CPython ではスレッド、それ以外ではプロセス）
+        workers = parse_workers(pop_option(args, '--workers'), 1)
+        executor_kind = pop_option(args, '--executor') or 'auto'
+        resolve_executor(executor_kind)
+        if len(args) < 2:
             print("エラー: 一覧CSVファイルのパスを指定してください。")
             print("使用方法: python search.py --list <一覧CSVファイルのパス> [出力ファイル名]")
             sys.exit(1)
         
-        list_csv_path = sys.argv[2]
-        output_file = sys.argv[3] if len(sys.argv) > 3 else None
-        process_multiple_files(list_csv_path, output_file)
+        list_csv_path = args[1]
+        output_file = args[2] if len(args) > 2 else None
+        process_multiple_files(list_csv_path, output_file, quiet=quiet, error_log=error_log,
+                               dedup=dedup, normalized_dir=normalized_dir, shard=shard, resume=resume,
+                               journal=journal, workers=workers, executor_kind=executor_kind, index=index,
+                               **extract_options)
         return
     
     # 単一ファイルモード
-    file_path = sys.argv[1]
-    extractor = JavaScriptFunctionExtractor(file_path)
+    file_path = args[0]
+    extractor = JavaScriptFunctionExtractor(file_path, **extract_options)
     functions = extractor.extract()
     
     # CSV形式で出力する場合
-    if len(sys.argv) > 2 and sys.argv[2] == '--csv':
-        output_file = sys.argv[3] if len(sys.argv) > 3 else None
-        extractor.export_to_csv(functions, output_file)
+    if len(args) > 1 and args[1] == '--csv':
+        output_file = args[2] if len(args) > 2 else None
+        written = extractor.export_to_csv(functions, output_file)
+        if written:
+            print(f"CSVファイルを出力しました: {written}")
+        else:
+            print("関数が見つかりませんでした。")
     # JSON形式で出力する場合
-    elif len(sys.argv) > 2 and sys.argv[2] == '--json':
-        import json
-        print("\n=== JSON形式 ===")
-        print(json.dumps(functions, ensure_ascii=False, indent=2))
+    elif len(args) > 1 and args[1] == '--json':
+        if len(args) > 2:
+            # 出力ファイル名が .gz / .xz で終わる場合は圧縮する
+            write_json(args[2], functions)
+            print(f"JSONファイルを出力しました: {args[2]}")
+        else:
+            import json
+            print("\n=== JSON形式 ===")
+            print(json.dumps(functions, ensure_ascii=False, indent=2))
     # 通常の表示
     else:
         extractor.print_results(functions)
@@ -376,4 +465,3 @@ def main():
 
 if __name__ == '__main__':
     main()
-
@@ -0,0 +1,215 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+JavaScript / Java / Rust が混在するファイル一覧から関数・メソッドを一括で抽出するスクリプト
+
+各ファイルは拡張子から search_api の言語プラグイン（JavaScriptFunctionExtractor /
+JavaMethodExtractor / RustFunctionExtractor）に振り分ける。全言語で1つのワーカープールと
+1つの結果CSVを共有し、結果CSVには言語列を付ける。
+"""
+
+import os
+import sys
+from functools import partial
+from typing import List, Dict, Optional, Tuple
+from pathlib import Path
+
+from search_common import (
+    ExtractionError, UsageError, read_source, read_file_list, pop_flag, pop_option
+)
+from search_batch import run_batch, merge_to_csv, parse_shard, parse_workers, resolve_executor
+from search_normalized import inflate_to_csv
+from search_index import run_index_command, default_index_path
+from search_api import detect_language, extract_source
+from search import MINIFIED_POLICIES, DEFAULT_MINIFIED_POLICY, DEFAULT_MINIFIED_CAP
+from search_regex import resolve_backend
+
+
+# 言語ごとの列（クラス/構造体、修飾子/可視性など）は共通の列にまとめ、該当しない言語では空欄にする
+CSV_HEADER = ['言語', 'ファイル', '行番号', '列', '終了行', '行数', 'クラス/構造体/トレイト', '型',
+              '修飾子/可視性', '戻り値の型', '関数名', '引数']
+# 正規化形式（--normalized）で辞書符号化する列（値の種類が少なく繰り返しの多い列）
+DICTIONARY_COLUMNS = ['言語', 'クラス/構造体/トレイト', '型', '修飾子/可視性', '戻り値の型']
+
+
+def to_csv_row(record: Dict[str, any]) -> List:
+    """関数/メソッド情報を共通形式のCSVの1行に変換"""
+    params_str = ', '.join(record['parameters']) if record['parameters'] else ''
+    return [
+        record['language'],
+        record['file'],
+        record['line'],
+        record.get('column', ''),
+        record['end_line'],
+        record['line_count'],
+        record.get('class_name') or record.get('struct_or_trait', ''),
+        record['type'],
+        record.get('modifiers') or record.get('visibility', ''),
+        record.get('return_type', ''),
+        record['name'],
+        params_str
+    ]
+
+
+def extract_file(file_path: str, content: Optional[str] = None,
+                 language_options: Optional[Dict[str, Dict[str, any]]] = None) -> List[Dict[str, any]]:
+    """
+    1ファイルから関数/メソッド情報を抽出し、各要素に language を付ける（一括処理用）
+    
+    language_options は言語名 -> 抽出クラスのコンストラクタに渡すオプション。
+    """
+    language = detect_language(file_path)
+    options = language_options.get(language, {}) if language_options else {}
+    if content is None:
+        content = read_source(file_path)
+    records = extract_source(content, file_path, language, **options)
+    for record in records:
+        record['language'] = language
+    return records
+
+
+def process_multiple_files(list_csv_path: str, output_file: str = None,
+                           quiet: bool = False, error_log: str = None,
+                           dedup: bool = True, workers: int = 1, normalized_dir: str = None,
+                           language_options: Optional[Dict[str, Dict[str, any]]] = None,
+                           sort_rows: bool = False, shard_dir: str = None,
+                           shard: Optional[Tuple[int, int]] = None,
+                           resume: bool = False, journal: bool = True, executor_kind: str = 'auto',
+                           index: bool = False) -> None:
+    """一覧CSVファイルに記載された複数言語のファイルを1つのワーカープールで処理"""
+    file_paths = read_file_list(list_csv_path)
+    
+    if not file_paths:
+        print("一覧CSVファイルにファイルパスが記載されていません。")
+        return
+    
+    # 結果をCSVに出力
+    if output_file is None:
+        output_file = str(Path(list_csv_path).with_suffix('')) + '_result.csv'
+    
+    extract = partial(extract_file, language_options=language_options)
+    run_batch(file_paths, extract, CSV_HEADER, to_csv_row, output_file, '関数/メソッド',
+              quiet=quiet, error_log_path=error_log, dedup=dedup, workers=workers,
+              normalized_dir=normalized_dir, dictionary_columns=DICTIONARY_COLUMNS,
+              sort_rows=sort_rows, shard_dir=shard_dir, shard=shard, resume=resume, journal=journal,
+              executor_kind=executor_kind, index_path=default_index_path(output_file) if index else None)
+
+
+def main():
+    """メイン関数"""
+    if len(sys.argv) < 3 or sys.argv[1] not in ('--list', '--inflate', '--merge', '--build-index', '--search'):
+        print("使用方法:")
+        print("  python search_all.py --list <一覧CSVファイルのパス> [出力ファイル名] [--workers <ワーカー数>]")
+        print("                       [--quiet] [--error-log <ログファイル>] [--no-dedup]")
+        print("                       [--minified skip|cap|full] [--minified-cap <文字数>] [--normalized <出力ディレクトリ>]")
+        print("                       [--regex-backend re|regex|re2|auto] [--sorted] [--shards <出力ディレクトリ>] [--shard i/N]")
+        print("                       [--resume] [--no-journal] [--executor auto|process|thread] [--index]")
+        print("  python search_all.py --inflate <出力ディレクトリ> [出力ファイル名]")
+        print("  python search_all.py --merge <シャードのディレクトリ/ファイル/マニフェスト>... [--output <出力ファイル名>]")
+        print("  python search_all.py --build-index <結果CSV> [索引ファイル]")
+        print("  python search_all.py --search <パターン> <索引ファイルまたは結果CSV> [--regex | --fuzzy] [--case-sensitive]")
+        print("                       [--language <言語>] [--type <型>] [--file-prefix <パス>] [--limit <件数>]")
+        print("")
+        print("対応する拡張子: .js .mjs .cjs（JavaScript）, .java（Java）, .rs（Rust）")
+        print("")
+        print("例:")
+        print("  python search_all.py --list file_list.csv")
+        print("  python search_all.py --list file_list.csv result.csv --workers 8")
+        print("  python search_all.py --list file_list.csv result.csv --quiet --error-log errors.jsonl")
+        print("  python search_all.py --list file_list.csv --normalized result_db")
+        print("  python search_all.py --list file_list.csv --workers 4 --shards result_shards")
+        print("  python search_all.py --merge result_shards --output result.csv")
+        print("  python search_all.py --list file_list.csv result.csv --shard 2/4")
+        print("  python search_all.py --merge result_shard-*_manifest.json --output result.csv")
+        print("  python search_all.py --list file_list.csv result.csv --workers 8 --resume")
+        print("  python search_all.py --list file_list.csv result.csv --workers 8 --executor thread")
+        print("  python search_all.py --list file_list.csv result.csv --index")
+        print("  python search_all.py --search ValidateOrder result.csv --language java --file-prefix src/main/")
+        print("  python search_all.py --search 'get*Id$' result_index.bin")
+        print("  python search_all.py --list app.war result.csv --workers 4")
+        sys.exit(1)
+    
+    try:
+        run(sys.argv[1:])
+    except ExtractionError as e:
+        print(f"エラー: {e}")
+        sys.exit(1)
+
+
+def run(args: List[str]) -> None:
+    """コマンドライン引数に従って処理を実行（エラーは ExtractionError で通知）"""
+    # 正規化形式の出力から結果CSVを復元
+    if args and args[0] == '--inflate':
+        if len(args) < 2:
+            raise UsageError("正規化形式の出力ディレクトリを指定してください（--inflate <ディレクトリ> [出力ファイル名]）。")
+        inflate_to_csv(args[1], args[2] if len(args) > 2 else None)
+        return
+    
+    # シャードを (ファイル, 行番号) 順に併合
+    if args and args[0] == '--merge':
+        output_file = pop_option(args, '--output')
+        if len(args) < 2:
+            raise UsageError("併合するシャードを指定してください（--merge <ディレクトリまたはファイル>...）。")
+        merge_to_csv(args[1:], output_file)
+        return
+    
+    # 結果CSVの関数名/メソッド名の索引の作成と検索
+    if args and args[0] in ('--build-index', '--search'):
+        run_index_command(args)
+        return
+    
+    # --workers: 解析に使うワーカー数（省略時はCPU数、1の場合はこのプロセスで順に処理）
+    workers = parse_workers(pop_option(args, '--workers'), os.cpu_count() or 1)
+    # --executor: ワーカーの種類（auto は GIL のない CPython ではスレッド、それ以外ではプロセス）
+    executor_kind = pop_option(args, '--executor') or 'auto'
+    resolve_executor(executor_kind)
+    
+    # JavaScript 用のオプション（search.py と同じ）
+    minified_policy = pop_option(args, '--minified') or DEFAULT_MINIFIED_POLICY
+    if minified_policy not in MINIFIED_POLICIES:
+        raise UsageError(f"--minified には {' / '.join(MINIFIED_POLICIES)} のいずれかを指定してください: {minified_policy}")
+    minified_cap = pop_option(args, '--minified-cap')
+    try:
+        minified_cap = int(minified_cap) if minified_cap is not None else DEFAULT_MINIFIED_CAP
+    except ValueError:
+        raise UsageError(f"--minified-cap には文字数を指定してください: {minified_cap}") from None
+    # 全言語の定義パターンの正規表現エンジン
+    regex_backend = resolve_backend(pop_option(args, '--regex-backend'))
+    language_options = {
+        'javascript': {'minified_policy': minified_policy, 'minified_cap': minified_cap,
+                       'regex_backend': regex_backend},
+        'java': {'regex_backend': regex_backend},
+        'rust': {'regex_backend': regex_backend},
+    }
+    
+    quiet = pop_flag(args, '--quiet')
+    error_log = pop_option(args, '--error-log')
+    dedup = not pop_flag(args, '--no-dedup')
+    normalized_dir = pop_option(args, '--normalized')
+    # --sorted: 結果を (ファイル, 行番号) 順に出力
+    # --shards: 結果CSVの代わりに、各ワーカーが (ファイル, 行番号) 順のシャードをディレクトリに出力
+    #           （--merge で併合すると --sorted の結果CSVと同じ内容になる）
+    sort_rows = pop_flag(args, '--sorted')
+    shard_dir = pop_option(args, '--shards')
+    # --shard i/N: 一覧をサイズで N 分割したうちの i 番目だけを処理し、マニフェストを出力（複数のマシンでの分担用）
+    shard = pop_option(args, '--shard')
+    shard = parse_shard(shard) if shard is not None else None
+    # --resume: 中断した処理をジャーナルの記録の続きから再開する
+    # --no-journal: 途中経過（ジャーナルと途中の結果CSV）を記録しない
+    resume = pop_flag(args, '--resume')
+    journal = not pop_flag(args, '--no-journal')
+    # --index: 結果CSVの出力後に関数名/メソッド名の索引（<出力ファイル名>_index.bin）を出力する
+    index = pop_flag(args, '--index')
+    if len(args) < 2 or args[0] != '--list':
+        raise UsageError("一覧CSVファイルのパスを指定してください（--list <一覧CSVファイルのパス>）。")
+    
+    list_csv_path = args[1]
+    output_file = args[2] if len(args) > 2 else None
+    process_multiple_files(list_csv_path, output_file, quiet=quiet, error_log=error_log,
+                           dedup=dedup, workers=workers, normalized_dir=normalized_dir,
+                           language_options=language_options, sort_rows=sort_rows, shard_dir=shard_dir,
+                           shard=shard, resume=resume, journal=journal, executor_kind=executor_kind, index=index)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,224 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+アーカイブ（WAR / EAR / JAR / -sources.jar / ZIP）内のソースファイルの読み込み
+
+アーカイブを展開せず、zipfile でエントリーを直接メモリに読み込んで抽出に渡す。
+アーカイブ内のファイルは「アーカイブのパス!/エントリーのパス」で表す（java.net.JarURLConnection と同じ表記）。
+アーカイブ内のアーカイブ（EAR 内の WAR、WAR の WEB-INF/lib/ 内の JAR など）は区切りを重ねて表す。
+
+    app.ear!/web.war!/WEB-INF/lib/util-sources.jar!/com/example/Util.java
+
+内側のアーカイブはファイルに書き出さず、外側のアーカイブから読み込んだバイト列を開く。
+"""
+
+import io
+import os
+import zlib
+import zipfile
+from collections import OrderedDict
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from search_common import ExtractionError, SourceNotFoundError, SourceReadError
+
+
+# アーカイブとして扱う拡張子
+ARCHIVE_EXTENSIONS = ('.jar', '.war', '.ear', '.zip')
+# アーカイブのパスとエントリーのパスの区切り
+ENTRY_SEPARATOR = '!/'
+# 開いたままにするアーカイブの数の上限（古いものから閉じる）
+MAX_OPEN_ARCHIVES = 64
+# メモリに保持する内側のアーカイブの合計サイズの上限（バイト）
+MAX_CACHED_BYTES = 256 * 1024 * 1024
+# アーカイブの読み込みで発生する例外（壊れたアーカイブ、未対応の圧縮方式・暗号化など）
+ARCHIVE_ERRORS = (OSError, EOFError, zipfile.BadZipFile, zlib.error, NotImplementedError, RuntimeError)
+
+
+def is_archive(path) -> bool:
+    """拡張子がアーカイブのものか（アーカイブ内のアーカイブのパスも含む）"""
+    return os.path.splitext(str(path))[1].lower() in ARCHIVE_EXTENSIONS
+
+
+def split_entry_path(path) -> Optional[Tuple[str, List[str]]]:
+    """
+    アーカイブ内のファイルのパスを (アーカイブのパス, [エントリーのパス, ...]) に分ける
+    
+    'app.war!/WEB-INF/lib/a.jar!/com/A.java' -> ('app.war', ['WEB-INF/lib/a.jar', 'com/A.java'])。
+    アーカイブ内のファイルでない場合（区切りの前がアーカイブの拡張子でない場合を含む）は None。
+    """
+    path = str(path)
+    if os.sep != '/':
+        # Path で正規化されたパス（Windows では / が \ になる）も受け付ける
+        path = path.replace(os.sep, '/')
+    parts = path.split(ENTRY_SEPARATOR)
+    if len(parts) < 2 or not all(is_archive(part) for part in parts[:-1]) or not parts[-1]:
+        return None
+    return parts[0], parts[1:]
+
+
+def is_entry_path(path) -> bool:
+    """アーカイブ内のファイルのパスか"""
+    return split_entry_path(path) is not None
+
+
+class ArchiveReader:
+    """
+    アーカイブ内のファイルの読み込み
+    
+    開いたアーカイブ（内側のアーカイブはそのバイト列）を保持し、同じアーカイブのエントリーを
+    続けて読み込む場合に開き直さない。保持する数・サイズが上限を超えた場合は古いものから閉じる。
+    スレッドセーフではない（一括処理ではメインのプロセス・スレッドだけが読み込む）。
+    """
+    
+    def __init__(self):
+        # アーカイブのパス（内側のアーカイブは区切りを含むパス） -> (ZipFile, 保持しているバイト数)
+        self._archives = OrderedDict()
+        self._cached_bytes = 0
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+    
+    def close(self) -> None:
+        for archive, _ in self._archives.values():
+            archive.close()
+        self._archives.clear()
+        self._cached_bytes = 0
+    
+    def _open(self, archive_path: str, entries: List[str]) -> zipfile.ZipFile:
+        """archive_path の中の entries を順にたどった先のアーカイブを開く"""
+        key = archive_path
+        archive = self._cached(key)
+        if archive is None:
+            archive = self._store(key, zipfile.ZipFile(archive_path), 0)
+        for entry in entries:
+            key += ENTRY_SEPARATOR + entry
+            inner = self._cached(key)
+            if inner is None:
+                data = archive.read(entry)
+                inner = self._store(key, zipfile.ZipFile(io.BytesIO(data)), len(data))
+            archive = inner
+        return archive
+    
+    def _cached(self, key: str) -> Optional[zipfile.ZipFile]:
+        entry = self._archives.get(key)
+        if entry is None:
+            return None
+        self._archives.move_to_end(key)
+        return entry[0]
+    
+    def _store(self, key: str, archive: zipfile.ZipFile, size: int) -> zipfile.ZipFile:
+        self._archives[key] = (archive, size)
+        self._cached_bytes += size
+        # 今開いたもの（最後）は残す
+        while len(self._archives) > 1 and (len(self._archives) > MAX_OPEN_ARCHIVES
+                                           or self._cached_bytes > MAX_CACHED_BYTES):
+            _, (oldest, oldest_size) = self._archives.popitem(last=False)
+            oldest.close()
+            self._cached_bytes -= oldest_size
+        return archive
+    
+    def _locate(self, path) -> Tuple[zipfile.ZipFile, str]:
+        """アーカイブ内のファイルのパスから (そのファイルを含むアーカイブ, エントリーのパス)"""
+        parts = split_entry_path(path)
+        if parts is None:
+            raise SourceReadError(f"アーカイブ内のファイルのパスではありません: {path}", path)
+        archive_path, entries = parts
+        try:
+            return self._open(archive_path, entries[:-1]), entries[-1]
+        except FileNotFoundError:
+            raise SourceNotFoundError(f"アーカイブ '{archive_path}' が見つかりません。", path) from None
+        except KeyError:
+            raise SourceNotFoundError(f"アーカイブ内のファイル '{path}' が見つかりません。", path) from None
+        except ARCHIVE_ERRORS as e:
+            raise SourceReadError(f"アーカイブの読み込みに失敗しました: {path}: {e}", path) from e
+    
+    def entry_size(self, path) -> int:
+        """アーカイブ内のファイルの（展開後の）サイズ"""
+        archive, entry = self._locate(path)
+        try:
+            return archive.getinfo(entry).file_size
+        except KeyError:
+            raise SourceNotFoundError(f"アーカイブ内のファイル '{path}' が見つかりません。", path) from None
+    
+    def read(self, path) -> bytes:
+        """アーカイブ内のファイルの内容を読み込む"""
+        archive, entry = self._locate(path)
+        try:
+            return archive.read(entry)
+        except KeyError:
+            raise SourceNotFoundError(f"アーカイブ内のファイル '{path}' が見つかりません。", path) from None
+        except ARCHIVE_ERRORS as e:
+            raise SourceReadError(f"アーカイブの読み込みに失敗しました: {path}: {e}", path) from e
+    
+    def list_sources(self, path, extensions: Iterable[str]) -> Tuple[List[str], Dict[str, ExtractionError]]:
+        """
+        アーカイブ内の extensions の拡張子のファイルのパスを、内側のアーカイブもたどって列挙する
+        
+        (パスのリスト（アーカイブ内の順）, 読み込めなかった内側のアーカイブのパス -> エラー) を返す。
+        読み込めなかった内側のアーカイブのパスもリストに含める（一括処理で警告として記録するため）。
+        path 自体を読み込めない場合は例外を送出する。
+        """
+        extensions = tuple(extension.lower() for extension in extensions)
+        parts = split_entry_path(path)
+        try:
+            archive = self._open(*parts) if parts is not None else self._open(str(path), [])
+        except FileNotFoundError:
+            raise SourceNotFoundError(f"アーカイブ '{path}' が見つかりません。", path) from None
+        except (KeyError, *ARCHIVE_ERRORS) as e:
+            raise SourceReadError(f"アーカイブの読み込みに失敗しました: {path}: {e}", path) from e
+        file_paths = []
+        failures = {}
+        for info in archive.infolist():
+            if info.is_dir():
+                continue
+            entry_path = f"{path}{ENTRY_SEPARATOR}{info.filename}"
+            suffix = os.path.splitext(info.filename)[1].lower()
+            if suffix in extensions:
+                file_paths.append(entry_path)
+            elif suffix in ARCHIVE_EXTENSIONS:
+                try:
+                    inner_paths, inner_failures = self.list_sources(entry_path, extensions)
+                except ExtractionError as e:
+                    file_paths.append(entry_path)
+                    failures[entry_path] = e
+                else:
+                    file_paths.extend(inner_paths)
+                    failures.update(inner_failures)
+        return file_paths, failures
+
+
+def expand_archives(file_paths: List[str], extensions: Iterable[str],
+                    reader: ArchiveReader) -> Tuple[List[str], Dict[str, ExtractionError]]:
+    """
+    ファイルパスのリストのアーカイブを、その中の extensions の拡張子のファイルのパスに置き換える
+    
+    (置き換えたリスト, 読み込めなかったアーカイブのパス -> エラー) を返す。
+    読み込めなかったアーカイブはパスをそのまま残す（見つからないアーカイブは通常のファイルと同じく扱う）。
+    """
+    extensions = tuple(extensions)
+    expanded = []
+    failures = {}
+    for file_path in file_paths:
+        if not is_archive(file_path):
+            expanded.append(file_path)
+            continue
+        try:
+            inner_paths, inner_failures = reader.list_sources(file_path, extensions)
+        except SourceNotFoundError:
+            expanded.append(file_path)
+        except ExtractionError as e:
+            expanded.append(file_path)
+            failures[file_path] = e
+        else:
+            expanded.extend(inner_paths)
+            failures.update(inner_failures)
+    return expanded, failures
+
+
+def read_entry(path) -> bytes:
+    """アーカイブ内のファイルの内容を読み込む（1ファイルだけ読み込む場合）"""
+    with ArchiveReader() as reader:
+        return reader.read(path)
@@ -0,0 +1,1442 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+一覧CSVモード（--list）の一括処理
+
+search.py / search_rust.py / search_java.py の process_multiple_files() から呼び出される。
+ファイルごとの処理完了メッセージは出力せず、進捗は間引いて標準エラー出力に表示する。
+警告・エラーは機械可読なエラーログ（JSON Lines）に記録する。
+workers に2以上を指定した場合、解析はプロセスプールで並列に行い、結果は入力順に出力する。
+sort_rows=True の場合は結果を (ファイル, 行番号) 順に並べ替え、shard_dir を指定した場合は
+ワーカーごとの並べ替え済みのシャードに分けて出力する（シャードは merge_shards() で1つのCSVに併合する）。
+shard=(i, N) を指定した場合は一覧のうち i 番目のシャードに割り当てたファイルだけを処理し、
+併合の前に全シャードの完了を確認できるようマニフェストを出力する（複数のマシンでの分担用）。
+run_groups() は Cargo のクレート・Gradle のサブプロジェクトのようなファイルのグループ単位で抽出し、
+グループの内容が変わっていなければ前回の結果を再利用する。
+"""
+
+import io
+import os
+import re
+import csv
+import sys
+import json
+import heapq
+import hashlib
+import stat
+import time
+from concurrent.futures import (
+    FIRST_COMPLETED, Executor, Future, ProcessPoolExecutor, ThreadPoolExecutor, as_completed, wait
+)
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple
+
+from search_common import (
+    ExtractionError, OutputError, UsageError, FileListError, DECOMPRESSION_ERRORS, content_key, decode_source,
+    open_text, split_compression, write_csv
+)
+from search_normalized import write_normalized
+from search_index import build_index, print_index_summary
+from search_api import EXTENSIONS, estimate_cost
+from search_archive import ArchiveReader, expand_archives, is_entry_path
+
+
+class ProgressReporter:
+    """処理件数・スループット・残り時間を一定間隔で標準エラー出力に表示するクラス"""
+    
+    # 表示間隔（秒）。端末では同じ行を上書きし、CIのログなど端末以外では行を追加する
+    TTY_INTERVAL = 0.25
+    PIPE_INTERVAL = 5.0
+    
+    def __init__(self, total: int, quiet: bool = False, stream=None, unit: str = 'ファイル'):
+        self.total = total
+        self.unit = unit
+        self.quiet = quiet
+        self.stream = stream if stream is not None else sys.stderr
+        self.is_tty = hasattr(self.stream, 'isatty') and self.stream.isatty()
+        self.interval = self.TTY_INTERVAL if self.is_tty else self.PIPE_INTERVAL
+        self.done = 0
+        self.errors = 0
+        self.bytes_done = 0
+        self.start_time = time.monotonic()
+        self._last_report = self.start_time
+        self._line_width = 0
+    
+    def advance(self, nbytes: int = 0, error: bool = False) -> None:
+        """1ファイル分の処理完了を記録し、前回の表示から一定時間経過していれば進捗を表示"""
+        self.done += 1
+        self.bytes_done += nbytes
+        if error:
+            self.errors += 1
+        if self.quiet:
+            return
+        now = time.monotonic()
+        if now - self._last_report >= self.interval:
+            self._last_report = now
+            self._write(self.format_status(now))
+    
+    def message(self, text: str) -> None:
+        """進捗行を乱さずにメッセージを表示（quiet の場合は表示しない）"""
+        if self.quiet:
+            return
+        self._clear()
+        print(text, file=self.stream)
+    
+    def finish(self) -> None:
+        """進捗行を消去する"""
+        if not self.quiet:
+            self._clear()
+    
+    def elapsed(self) -> float:
+        return time.monotonic() - self.start_time
+    
+    def format_status(self, now: Optional[float] = None) -> str:
+        """現在の進捗を1行の文字列にする"""
+        if now is None:
+            now = time.monotonic()
+        elapsed = max(now - self.start_time, 1e-9)
+        files_per_sec = self.done / elapsed
+        mb_per_sec = self.bytes_done / elapsed / (1024 * 1024)
+        percent = self.done * 100.0 / self.total if self.total else 100.0
+        if files_per_sec > 0 and self.done < self.total:
+            eta = format_duration((self.total - self.done) / files_per_sec)
+        else:
+            eta = '--:--:--'
+        return (f"[進捗] {self.done}/{self.total} {self.unit} ({percent:.1f}%) "
+                f"{files_per_sec:.1f} {self.unit}/秒 {mb_per_sec:.2f} MB/秒 "
+                f"残り {eta} エラー {self.errors}")
+    
+    def _write(self, line: str) -> None:
+        if self.is_tty:
+            padding = ' ' * max(0, self._line_width - len(line))
+            self.stream.write('\r' + line + padding)
+            self._line_width = len(line)
+        else:
+            self.stream.write(line + '\n')
+        self.stream.flush()
+    
+    def _clear(self) -> None:
+        if self.is_tty and self._line_width:
+            self.stream.write('\r' + ' ' * self._line_width + '\r')
+            self.stream.flush()
+            self._line_width = 0
+
+
+class ErrorLog:
+    """警告・エラーを JSON Lines 形式で記録するクラス（最初の記録時にファイルを作成。.gz / .xz は圧縮する）"""
+    
+    def __init__(self, path: Optional[str], append: bool = False):
+        self.path = path
+        self.count = 0
+        # True の場合は既存のログに追記する（--resume）
+        self.append = append
+        self._file = None
+    
+    def record(self, level: str, file_path: str, message: str, error_type: str = '') -> None:
+        """1件の警告（level='warning'）またはエラー（level='error'）を記録"""
+        self.count += 1
+        if self.path is None:
+            return
+        if self._file is None:
+            self._file = open_text(self.path, 'a' if self.append else 'w', encoding='utf-8')
+        entry = {
+            'time': datetime.now().isoformat(timespec='seconds'),
+            'level': level,
+            'file': file_path,
+            'error_type': error_type,
+            'message': message,
+        }
+        self._file.write(json.dumps(entry, ensure_ascii=False) + '\n')
+    
+    def close(self) -> None:
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+
+class BatchResult:
+    """一括処理の集計結果"""
+    
+    def __init__(self):
+        self.processed_count = 0
+        self.error_count = 0
+        self.record_count = 0
+        self.bytes_processed = 0
+        self.elapsed = 0.0
+        # 内容が同一のファイルとして解析を省略した件数
+        self.dedup_hits = 0
+        # --resume で前回までに処理済みだったファイル数（processed_count / error_count に含む）
+        self.resumed_count = 0
+
+
+class Journal:
+    """
+    一覧CSVモードの途中経過を記録し、中断した処理を再開できるようにするクラス
+    
+    処理を終えたファイルの結果の行を完了した順に途中の結果CSV（partial_output_path()）に追記し、
+    続けてジャーナル（JSON Lines）に入力順・状態・件数と追記後の書き込み位置を1行ずつ記録する。
+    どちらもファイルごとに flush し、fsync は JOURNAL_SYNC_INTERVAL 秒ごとにまとめて行う
+    （途中の結果CSV、ジャーナルの順）。再開時は、書き込み位置が途中の結果CSVのサイズ以下の記録までを
+    有効とし、途中の結果CSVをその位置で切り詰めてから追記する（書き込み途中の行は捨てて解析し直す）。
+    finish() で記録を入力順（または (ファイル, 行番号) 順）に並べた結果CSVを出力し、
+    ジャーナルと途中の結果CSVを削除する。
+    """
+    
+    def __init__(self, output_file: str, csv_header: List[str], source: Dict[str, any]):
+        self.path = default_journal_path(output_file)
+        self.partial_path = partial_output_path(output_file)
+        self.csv_header = csv_header
+        # 再開時に一致を確認する情報（一覧のハッシュ・ファイル数・シャード・CSVのヘッダー）
+        # （JSON に書き出して読み直した場合と同じ形にしておく）
+        self.source = json.loads(json.dumps(dict(source, format=JOURNAL_FORMAT, csv_header=csv_header)))
+        # 入力順 -> 記録（前回までの分を含む）。記録した順に並ぶ
+        self.entries = {}
+        self.offset = 0
+        self._journal = None
+        self._partial = None
+        self._last_sync = time.monotonic()
+    
+    def start(self, resume: bool) -> Dict[int, Dict[str, any]]:
+        """ジャーナルを開き、前回までに処理済みのファイル（入力順 -> 記録）を返す（resume=False の場合は空）"""
+        try:
+            if resume:
+                self._load()
+            else:
+                self._create()
+            self._journal = open(self.path, 'a', encoding='utf-8')
+            self._partial = open(self.partial_path, 'ab')
+        except OSError as e:
+            raise OutputError(f"ジャーナルを作成できません: {e}", self.path) from e
+        return dict(self.entries)
+    
+    def _create(self) -> None:
+        with open(self.partial_path, 'wb') as f:
+            f.write(self._encode_rows([self.csv_header], 'utf-8-sig'))
+            self.offset = f.tell()
+        with open(self.path, 'w', encoding='utf-8') as f:
+            f.write(json.dumps(dict(self.source, start=self.offset), ensure_ascii=False) + '\n')
+    
+    def _load(self) -> None:
+        if not os.path.exists(self.path) or not os.path.exists(self.partial_path):
+            raise UsageError(f"再開できる途中経過がありません（ジャーナル: {self.path}）。--resume を付けずに実行してください。")
+        with open(self.path, 'r', encoding='utf-8') as f:
+            lines = f.read().split('\n')
+        try:
+            source = json.loads(lines[0])
+        except ValueError:
+            raise UsageError(f"ジャーナルの形式が不正です: {self.path}") from None
+        start = source.pop('start', None)
+        if source != self.source or not isinstance(start, int):
+            raise UsageError("ジャーナルの記録と一覧CSV・出力の形式が一致しないため再開できません"
+                             "（--resume を付けずに実行すると最初から処理します）。")
+        size = os.path.getsize(self.partial_path)
+        self.offset = start
+        for line in lines[1:]:
+            try:
+                entry = json.loads(line)
+            except ValueError:
+                # 書き込み途中で中断した行
+                break
+            if entry['end'] > size:
+                # fsync する前に中断し、途中の結果CSVに書き込まれなかった行
+                break
+            self.entries[entry['index']] = entry
+            self.offset = entry['end']
+        # 有効な記録までに切り詰める（ジャーナルは書き直して置き換える）
+        with open(self.partial_path, 'r+b') as f:
+            f.truncate(self.offset)
+        temp_path = self.path + '.tmp'
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            f.write(json.dumps(dict(self.source, start=start), ensure_ascii=False) + '\n')
+            for entry in self.entries.values():
+                f.write(json.dumps(entry, ensure_ascii=False) + '\n')
+        os.replace(temp_path, self.path)
+    
+    @staticmethod
+    def _encode_rows(rows: List[List], encoding: str = 'utf-8') -> bytes:
+        buffer = io.StringIO()
+        csv.writer(buffer).writerows(rows)
+        return buffer.getvalue().encode(encoding)
+    
+    def append(self, index: int, entry: Dict[str, any], rows: List[List]) -> None:
+        """1ファイル分の結果の行と記録を追記する"""
+        try:
+            if rows:
+                data = self._encode_rows(rows)
+                self._partial.write(data)
+                self._partial.flush()
+                self.offset += len(data)
+            entry = dict(entry, index=index, end=self.offset)
+            self._journal.write(json.dumps(entry, ensure_ascii=False) + '\n')
+            self._journal.flush()
+            self.entries[index] = entry
+            if time.monotonic() - self._last_sync >= JOURNAL_SYNC_INTERVAL:
+                self.sync()
+        except OSError as e:
+            raise OutputError(f"途中経過の記録に失敗しました: {e}", self.path) from e
+    
+    def sync(self) -> None:
+        """途中の結果CSV、ジャーナルの順にディスクへ書き出す"""
+        for f in (self._partial, self._journal):
+            if f is not None:
+                f.flush()
+                os.fsync(f.fileno())
+        self._last_sync = time.monotonic()
+    
+    def close(self) -> None:
+        try:
+            self.sync()
+        finally:
+            for f in (self._partial, self._journal):
+                if f is not None:
+                    f.close()
+            self._partial = self._journal = None
+    
+    def finish(self, output_file: str, sort_rows: bool = False) -> None:
+        """記録を入力順（sort_rows=True の場合は (ファイル, 行番号) 順）に並べて結果CSVに出力し、途中経過を削除する"""
+        self.close()
+        indexes = list(self.entries)
+        if sort_rows:
+            with open(self.partial_path, 'r', newline='', encoding='utf-8-sig') as f:
+                reader = csv.reader(f)
+                next(reader, None)
+                rows = sorted(reader, key=row_sort_key(self.csv_header))
+            write_csv(output_file, self.csv_header, rows)
+        elif indexes == sorted(indexes) and not split_compression(output_file)[1]:
+            # 入力順に完了した場合（ワーカー1つなど）はそのまま結果CSVにする
+            try:
+                os.replace(self.partial_path, output_file)
+            except OSError as e:
+                raise OutputError(f"CSVファイルの出力に失敗しました: {e}", output_file) from e
+        else:
+            self._write_in_order(output_file)
+        for path in (self.path, self.partial_path):
+            if os.path.exists(path):
+                os.remove(path)
+    
+    def _write_in_order(self, output_file: str) -> None:
+        # 途中の結果CSVでの各ファイルの行の範囲（記録した順に、前の記録の終わりから始まる）
+        spans = {}
+        with open(self.path, 'r', encoding='utf-8') as f:
+            start = json.loads(f.readline())['start']
+        for index, entry in self.entries.items():
+            spans[index] = (start, entry['end'])
+            start = entry['end']
+        try:
+            with open(self.partial_path, 'rb') as source, \
+                    open_text(output_file, 'w', newline='', encoding='utf-8-sig') as f:
+                csv.writer(f).writerow(self.csv_header)
+                for index in sorted(spans):
+                    start, end = spans[index]
+                    if end > start:
+                        source.seek(start)
+                        f.write(source.read(end - start).decode('utf-8'))
+        except OSError as e:
+            raise OutputError(f"CSVファイルの出力に失敗しました: {e}", output_file) from e
+
+
+def default_error_log_path(output_file: str) -> str:
+    """結果CSVのパスからエラーログのパスを決める（result.csv / result.csv.gz -> result_errors.jsonl）"""
+    root, _ = os.path.splitext(split_compression(output_file)[0])
+    return root + '_errors.jsonl'
+
+
+def shard_path(shard_dir: str, index: int, count: int) -> str:
+    """シャードのファイルパス（shard-0001-of-0004.csv。名前順がシャードの番号順になる）"""
+    return os.path.join(shard_dir, f'shard-{index + 1:04d}-of-{count:04d}.csv')
+
+
+# ワーカーへの割り振り（plan_batches）: バッチの目安は残りのコストの合計 / (ワーカー数 * BATCH_SPLIT)
+BATCH_SPLIT = 2
+# バッチのコストの下限・上限（秒）。1タスクあたりのプロセス間通信（数百マイクロ秒）が解析時間の数%に収まるようにする
+MIN_BATCH_COST = 0.01
+MAX_BATCH_COST = 0.5
+
+# マニフェスト（--shard i/N の完了記録）の形式の版
+MANIFEST_FORMAT = 1
+# ジャーナル（--resume 用の途中経過）の形式の版と、fsync をまとめて行う間隔（秒）
+JOURNAL_FORMAT = 1
+JOURNAL_SYNC_INTERVAL = 5.0
+# グループ単位の結果のキャッシュ（run_groups）の形式
+GROUP_CACHE_FORMAT = 1
+# ワーカーの種類（--executor。auto は GIL のない CPython ではスレッド、それ以外ではプロセス）
+EXECUTOR_KINDS = ('auto', 'process', 'thread')
+
+
+def parse_shard(value: str) -> Tuple[int, int]:
+    """--shard の値（i/N、i は1から N）を (0から始まるシャードの番号, シャード数) にする"""
+    try:
+        number, count = (int(part) for part in value.split('/'))
+    except ValueError:
+        raise UsageError(f"--shard には i/N の形式で指定してください（例: 2/4）: {value}") from None
+    if count < 1 or not 1 <= number <= count:
+        raise UsageError(f"--shard の i は1から N の範囲で指定してください: {value}")
+    return number - 1, count
+
+
+def parse_workers(value: Optional[str], default: int) -> int:
+    """--workers の値（省略時は default）を1以上の整数にする"""
+    if value is None:
+        return default
+    try:
+        workers = int(value)
+    except ValueError:
+        raise UsageError(f"--workers にはワーカー数を指定してください: {value}") from None
+    if workers < 1:
+        raise UsageError(f"--workers には1以上を指定してください: {value}")
+    return workers
+
+
+def gil_disabled() -> bool:
+    """GIL のない（フリースレッド版の）CPython で、実行時にも GIL が無効になっているか"""
+    is_gil_enabled = getattr(sys, '_is_gil_enabled', None)
+    return is_gil_enabled is not None and not is_gil_enabled()
+
+
+def resolve_executor(kind: Optional[str]) -> str:
+    """--executor の値（省略時は auto）を 'thread' か 'process' に決める"""
+    kind = kind or 'auto'
+    if kind not in EXECUTOR_KINDS:
+        raise UsageError(f"--executor は {' / '.join(EXECUTOR_KINDS)} のいずれかです: {kind}")
+    if kind == 'auto':
+        return 'thread' if gil_disabled() else 'process'
+    return kind
+
+
+def make_executor(workers: int, kind: Optional[str] = 'auto') -> Optional[Executor]:
+    """
+    workers 個のワーカーのプール（workers が1の場合は None）
+    
+    スレッドのプールでは、抽出に渡すファイルの内容や結果の行を pickle せず、コンパイル済みの
+    パターン（search_regex のキャッシュ）も全スレッドで共有する。集計と出力は呼び出し側の
+    スレッドだけで行うため、ワーカーが共有の状態を書き換えることはない。
+    GIL のある CPython ではスレッドは並列に動かないため、auto ではプロセスのプールにする。
+    """
+    kind = resolve_executor(kind)
+    if workers <= 1:
+        return None
+    if kind == 'thread':
+        return ThreadPoolExecutor(max_workers=workers, thread_name_prefix='search-worker')
+    return ProcessPoolExecutor(max_workers=workers)
+
+
+def describe_executor(executor: Executor, workers: int) -> str:
+    """処理開始時に表示するワーカーの説明"""
+    if isinstance(executor, ThreadPoolExecutor):
+        return f"ワーカースレッド数: {workers}（{'GIL なし' if gil_disabled() else 'GIL あり'}）"
+    return f"ワーカープロセス数: {workers}"
+
+
+def assign_shards(file_paths: List[str], count: int, archives: Optional[ArchiveReader] = None) -> List[int]:
+    """
+    各ファイルのシャードの番号を、シャードごとの合計サイズがなるべく均等になるように決める
+    
+    サイズの大きい順（同じサイズはパスの順）に、その時点で合計サイズが最も小さいシャード
+    （同じ場合は番号の小さいシャード）に割り当てる。同じ一覧・同じファイルからは、
+    どのマシンでも同じ割り当てになる（見つからないファイルはサイズ0として割り当てる）。
+    アーカイブ内のファイルのサイズは archives で読み込む（展開後のサイズ）。
+    """
+    reader = archives if archives is not None else ArchiveReader()
+    sizes = []
+    for file_path in file_paths:
+        try:
+            if is_entry_path(file_path):
+                sizes.append(reader.entry_size(file_path))
+            else:
+                sizes.append(os.stat(file_path).st_size)
+        except (OSError, ExtractionError):
+            sizes.append(0)
+    if archives is None:
+        reader.close()
+    shards = [0] * len(file_paths)
+    loads = [(0, number) for number in range(count)]
+    for index in sorted(range(len(file_paths)), key=lambda index: (-sizes[index], file_paths[index])):
+        load, number = heapq.heappop(loads)
+        shards[index] = number
+        heapq.heappush(loads, (load + sizes[index], number))
+    return shards
+
+
+def list_hash(file_paths: List[str]) -> str:
+    """一覧のファイルパスの並びのハッシュ（全シャードが同じ一覧から作られたかの確認用）"""
+    return hashlib.blake2b('\n'.join(file_paths).encode('utf-8'), digest_size=16).hexdigest()
+
+
+def shard_output_path(output_file: str, index: int, count: int) -> str:
+    """シャードの結果CSVのパス（result.csv -> result_shard-0001-of-0004.csv。圧縮の拡張子は残す）"""
+    base, compression = split_compression(output_file)
+    root, ext = os.path.splitext(base)
+    return f'{root}_shard-{index + 1:04d}-of-{count:04d}{ext or ".csv"}{compression}'
+
+
+def default_manifest_path(output_file: str) -> str:
+    """結果CSVのパスからマニフェストのパスを決める（result.csv / result.csv.gz -> result_manifest.json）"""
+    root, _ = os.path.splitext(split_compression(output_file)[0])
+    return root + '_manifest.json'
+
+
+def default_journal_path(output_file: str) -> str:
+    """結果CSVのパスからジャーナルのパスを決める（result.csv -> result_journal.jsonl）"""
+    root, _ = os.path.splitext(split_compression(output_file)[0])
+    return root + '_journal.jsonl'
+
+
+def partial_output_path(output_file: str) -> str:
+    """結果CSVのパスから途中の結果CSVのパスを決める（result.csv -> result_partial.csv。圧縮しない）"""
+    root, _ = os.path.splitext(split_compression(output_file)[0])
+    return root + '_partial.csv'
+
+
+def row_sort_key(header: List[str]) -> Callable[[List], tuple]:
+    """
+    CSVの行を (ファイル, 行番号) 順に並べるためのキー関数を返す
+    
+    行番号は数値として比較する（ファイルから読み込んだ文字列の行にも使える）。
+    """
+    file_column = header_column(header, 'ファイル')
+    line_column = header_column(header, '行番号')
+    return lambda row: (row[file_column], int(row[line_column]))
+
+
+def header_column(header: List[str], name: str) -> int:
+    """CSVのヘッダーでの列の位置（列がない場合は UsageError）"""
+    try:
+        return header.index(name)
+    except ValueError:
+        raise UsageError(f"CSVのヘッダーに「{name}」の列がありません: {','.join(header)}") from None
+
+
+def format_duration(seconds: float) -> str:
+    """秒数を HH:MM:SS 形式にする"""
+    seconds = int(seconds)
+    return f"{seconds // 3600:02d}:{seconds % 3600 // 60:02d}:{seconds % 60:02d}"
+
+
+def run_batch(file_paths: List[str],
+              extract_file: Callable[[str, str], List[Dict[str, any]]],
+              csv_header: List[str],
+              to_csv_row: Callable[[Dict[str, any]], List],
+              output_file: str,
+              label: str,
+              quiet: bool = False,
+              error_log_path: Optional[str] = None,
+              dedup: bool = True,
+              workers: int = 1,
+              normalized_dir: Optional[str] = None,
+              dictionary_columns: List[str] = (),
+              sort_rows: bool = False,
+              shard_dir: Optional[str] = None,
+              shard: Optional[Tuple[int, int]] = None,
+              cost_model: Optional[Callable[[str, int], float]] = None,
+              journal: bool = True,
+              resume: bool = False,
+              executor_kind: Optional[str] = 'auto',
+              index_path: Optional[str] = None,
+              archive_extensions: Optional[Tuple[str, ...]] = None) -> BatchResult:
+    """
+    ファイルパスのリストを処理し、全ファイルの抽出結果を1つのCSVファイルに出力する
+    
+    extract_file はファイルパスと復号済みの内容を受け取り抽出結果のリストを返す関数。
+    label は集計メッセージに使う名称（'関数' / 'メソッド'）。
+    quiet=True の場合、進捗と警告は表示せず最後の集計のみ表示する。
+    dedup=True の場合、内容が同一のファイル（vendoringされたライブラリのコピーなど）は
+    一度だけ解析し、結果の file 列だけを差し替えて再利用する。
+    workers が2以上の場合、ファイルの読み込みと重複判定はこのプロセスで行い、
+    解析と to_csv_row によるCSVの行への変換をワーカープロセスに渡す（extract_file と to_csv_row は
+    モジュールレベルの関数か functools.partial など、pickle できるものであること）。
+    ワーカーからは抽出結果の辞書ではなくCSVの行（列数が一定のリスト）を受け取る。
+    normalized_dir を指定した場合、結果CSVの代わりに正規化形式（search_normalized）で出力し、
+    dictionary_columns の列を辞書符号化する。
+    sort_rows=True の場合、結果の行を (ファイル, 行番号) 順に並べ替えて出力する（同じキーの行は入力順）。
+    shard_dir を指定した場合、結果CSVの代わりに workers 個のシャード（入力の i 番目のファイルは
+    i % workers 番目のシャード）をディレクトリに出力する。各シャードはワーカーが1つずつ担当し、
+    そのファイルを読み込んで抽出した結果を (ファイル, 行番号) 順に並べて直接出力する（write_shard()。
+    結果の行はこのプロセスに集めない。内容が同一のファイルの再利用はシャードの中でのみ行う）。
+    merge_shards() で併合すると sort_rows=True で1つのCSVに出力した場合と同じ内容になる。
+    shard=(i, N) を指定した場合、assign_shards() で i 番目のシャードに割り当てたファイルだけを処理し、
+    (ファイル, 行番号) 順の結果を shard_output_path() のCSVに出力する。続けてファイルごとの
+    サイズ・ハッシュ・件数を記録したマニフェスト（default_manifest_path()）を出力する。
+    cost_model は (ファイルパス, サイズ) から解析時間の見積もり（秒）を返す関数（省略時は
+    search_api.estimate_cost）。workers が2以上の場合の割り振り（plan_batches()）に使う。
+    journal=True の場合（結果CSVに出力する場合のみ）、結果の行を途中の結果CSVに追記しながら
+    ジャーナル（Journal）に途中経過を記録し、最後に結果CSVを出力してから削除する。
+    resume=True の場合はジャーナルに記録済みのファイルを処理せず、前回の続きから処理する
+    （結果CSVは中断せずに処理した場合と同じ内容になる）。
+    executor_kind は workers が2以上の場合のワーカーの種類（make_executor()。'thread' の場合は
+    extract_file と to_csv_row を pickle しない）。
+    index_path を指定した場合、結果CSVの出力後にその関数名/メソッド名のトライグラム索引
+    （search_index.build_index()）を出力する。
+    file_paths のアーカイブ（search_archive.ARCHIVE_EXTENSIONS）は、その中（内側のアーカイブを含む）の
+    archive_extensions の拡張子（省略時は search_api.EXTENSIONS の全て）のファイルに置き換えて処理する。
+    アーカイブ内のファイルはこのプロセスで読み込み、結果のファイル列は「アーカイブ!/エントリー」になる。
+    """
+    if index_path is not None and (normalized_dir is not None or shard_dir is not None or shard is not None):
+        raise UsageError("--index は結果CSVに出力する場合のみ指定できます（--normalized / --shards / --shard では使えません）。")
+    if resume and (normalized_dir is not None or shard_dir is not None):
+        raise UsageError("--resume は結果CSVに出力する場合のみ指定できます（--normalized / --shards では使えません）。")
+    if resume and not journal:
+        raise UsageError("--resume と --no-journal は同時に指定できません。")
+    if (shard_dir is not None or shard is not None) and normalized_dir is not None:
+        raise UsageError("シャードへの出力と正規化形式の出力は同時に指定できません。")
+    if shard_dir is not None and shard is not None:
+        raise UsageError("--shards と --shard は同時に指定できません。")
+    # アーカイブはその中のファイルに置き換える（読み込めなかったアーカイブは警告として記録する）
+    archives = ArchiveReader()
+    file_paths, archive_errors = expand_archives(
+        file_paths, archive_extensions if archive_extensions is not None else tuple(EXTENSIONS), archives)
+    manifest = None
+    source = {'list_files': len(file_paths), 'list_hash': list_hash(file_paths), 'shard': None}
+    if shard is not None:
+        index, count = shard
+        manifest = {
+            'format': MANIFEST_FORMAT,
+            'shard': index + 1,
+            'shards': count,
+            'list_files': source['list_files'],
+            'list_hash': source['list_hash'],
+            'files': [],
+        }
+        source['shard'] = [index + 1, count]
+        shards = assign_shards(file_paths, count, archives)
+        file_paths = [file_path for file_path, number in zip(file_paths, shards) if number == index]
+        output_file = shard_output_path(output_file, index, count)
+        sort_rows = True
+    if error_log_path is None:
+        error_log_path = default_error_log_path(output_file)
+    
+    result = BatchResult()
+    # 途中経過の記録（正規化形式・シャードへの出力では使わない）
+    if journal and normalized_dir is None and shard_dir is None:
+        journal = Journal(output_file, csv_header, dict(source, sort_rows=sort_rows))
+        if not resume and os.path.exists(journal.path) and not quiet:
+            print(f"前回の途中経過を破棄して最初から処理します（続きから処理する場合は --resume）: {journal.path}")
+        done = journal.start(resume)
+    else:
+        journal = None
+        done = {}
+    result.resumed_count = len(done)
+    reporter = ProgressReporter(len(file_paths) - len(done), quiet=quiet)
+    error_log = ErrorLog(error_log_path, append=resume)
+    if cost_model is None:
+        cost_model = estimate_cost
+    # 内容が同一のファイルの結果を再利用する場合に置き換える列
+    file_column = header_column(csv_header, 'ファイル')
+    # 入力順 -> CSVの行（ワーカーでは完了した順に届くため、最後に入力順に並べる）
+    collected = {}
+    # ファイル内容のキー -> 解析結果の Future（file 列は最初に解析したファイルのもの）
+    parsed_contents = {}
+    # 正規化形式の files.csv に出力するファイル（入力順, ファイルパス, サイズ, ハッシュ）
+    files = []
+    # マニフェストに記録するファイル（入力順, 記録）
+    notes = []
+    executor = make_executor(workers, executor_kind)
+    # シャードに出力したデータ行数（shard_dir を指定した場合）
+    shard_records = 0
+    
+    if not quiet:
+        print(f"処理対象ファイル数: {len(file_paths)}")
+        if done:
+            print(f"前回までに処理済みのファイル数: {len(done)}（続きから処理します）")
+        if executor is not None:
+            print(describe_executor(executor, workers))
+    
+    def note(index: int, file_path: str, size: int, key: Optional[tuple], rows: List[List], status: str) -> None:
+        """マニフェスト・ジャーナルにファイルの処理結果を記録する（status は ok / error / missing）"""
+        if manifest is None and journal is None:
+            return
+        entry = {'path': file_path, 'size': size, 'hash': key[1].hex() if key else '',
+                 'records': len(rows), 'status': status}
+        if journal is not None:
+            journal.append(index, entry, rows)
+        else:
+            notes.append((index, entry))
+    
+    def collect(file_path: str, size: int, key: Optional[tuple], future: Future, reused: bool,
+                index: int) -> None:
+        """解析結果（CSVの行）を受け取って集計する"""
+        try:
+            rows = future.result()
+        except Exception as e:
+            message = f"{file_path} の処理に失敗しました: {e}"
+            reporter.message(f"エラー: {message}")
+            error_log.record('error', file_path, message, type(e).__name__)
+            reporter.advance(size, error=True)
+            note(index, file_path, size, key, (), 'error')
+            return
+        if reused:
+            # 抽出クラスと同じ表記（Path で正規化したパス）にする
+            file_name = str(Path(file_path))
+            rows = [row[:file_column] + [file_name] + row[file_column + 1:] for row in rows]
+            result.dedup_hits += 1
+        if normalized_dir is not None:
+            # 結果のファイル列と同じ表記で登録する
+            files.append((index, rows[0][file_column] if rows else file_path, size, key[1].hex()))
+        if journal is None:
+            collected[index] = rows
+        reporter.advance(size)
+        note(index, file_path, size, key, rows, 'ok')
+    
+    def stat_file(index: int, file_path: str) -> Optional[int]:
+        """ファイルのサイズを返す（見つからない・通常のファイルでない場合は警告を記録して None）"""
+        error = archive_errors.get(file_path)
+        if error is None and is_entry_path(file_path):
+            try:
+                return archives.entry_size(file_path)
+            except ExtractionError as e:
+                error = e
+        if error is not None:
+            message = str(error)
+            error_type = type(error).__name__
+        else:
+            try:
+                st = os.stat(file_path)
+            except OSError:
+                message = f"ファイルが見つかりません: {file_path}"
+                error_type = 'SourceNotFoundError'
+            else:
+                if stat.S_ISREG(st.st_mode):
+                    return st.st_size
+                message = f"ファイルではありません: {file_path}"
+                error_type = 'NotAFileError'
+        reporter.message(f"警告: {message}")
+        error_log.record('warning', file_path, message, error_type)
+        reporter.advance(error=True)
+        note(index, file_path, 0, None, (), 'missing')
+        return None
+    
+    def read_file(index: int, file_path: str, size: int) -> Optional[bytes]:
+        """ファイルを読み込む（失敗した場合はエラーを記録して None）"""
+        try:
+            if is_entry_path(file_path):
+                return archives.read(file_path)
+            with open(file_path, 'rb') as f:
+                return f.read()
+        except (OSError, ExtractionError) as e:
+            message = str(e) if isinstance(e, ExtractionError) else f"{file_path} の処理に失敗しました: {e}"
+            reporter.message(f"エラー: {message}")
+            error_log.record('error', file_path, message, type(e).__name__)
+            reporter.advance(size, error=True)
+            note(index, file_path, size, None, (), 'error')
+            return None
+    
+    def lookup(data: bytes) -> tuple:
+        """(内容のキー, 同じ内容のファイルの解析結果の Future（なければ None）)"""
+        key = content_key(data) if dedup or normalized_dir is not None or manifest is not None or journal is not None \
+            else None
+        return key, parsed_contents.get(key) if dedup else None
+    
+    try:
+        if shard_dir is not None:
+            # ファイルの確認だけをこのプロセスで行い、読み込みと抽出・シャードの出力はワーカーに任せる
+            shard_items = [[] for _ in range(workers)]
+            for index, file_path in enumerate(file_paths):
+                size = stat_file(index, file_path)
+                if size is not None:
+                    shard_items[index % workers].append((file_path, size))
+            try:
+                os.makedirs(shard_dir, exist_ok=True)
+            except OSError as e:
+                raise OutputError(f"シャードの出力先ディレクトリを作成できません: {e}", shard_dir) from e
+            tasks = [(shard_path(shard_dir, number, workers), items, extract_file, to_csv_row, csv_header, dedup)
+                     for number, items in enumerate(shard_items)]
+            if executor is None:
+                outcomes = (write_shard(*task) for task in tasks)
+            else:
+                outcomes = (future.result()
+                            for future in as_completed([executor.submit(write_shard, *task) for task in tasks]))
+            for shard_outcomes in outcomes:
+                for file_path, size, count, reused, error in shard_outcomes:
+                    if error is not None:
+                        reporter.message(f"エラー: {error[0]}")
+                        error_log.record('error', file_path, error[0], error[1])
+                        reporter.advance(size, error=True)
+                        continue
+                    shard_records += count
+                    result.dedup_hits += reused
+                    reporter.advance(size)
+        elif executor is None:
+            for index, file_path in enumerate(file_paths):
+                if index in done:
+                    continue
+                size = stat_file(index, file_path)
+                if size is None:
+                    continue
+                data = read_file(index, file_path, size)
+                if data is None:
+                    continue
+                key, future = lookup(data)
+                reused = future is not None
+                if not reused:
+                    future = Future()
+                    try:
+                        future.set_result(extract_rows(extract_file, to_csv_row, file_path, data))
+                    except Exception as e:
+                        future.set_exception(e)
+                    if dedup:
+                        parsed_contents[key] = future
+                collect(file_path, size, key, future, reused, index)
+        else:
+            items = []
+            for index, file_path in enumerate(file_paths):
+                if index in done:
+                    continue
+                size = stat_file(index, file_path)
+                if size is not None:
+                    items.append((index, file_path, size))
+            run_scheduled(executor, workers, plan_batches(items, workers, cost_model), extract_file, to_csv_row,
+                          read_file, lookup, parsed_contents, dedup, collect)
+    except BaseException:
+        if journal is not None:
+            # --quiet でも表示する
+            reporter.finish()
+            print(f"中断しました。--resume を付けて同じコマンドを実行すると続きから処理します"
+                  f"（途中経過: {journal.path}）", file=sys.stderr)
+        raise
+    finally:
+        if executor is not None:
+            executor.shutdown(wait=True, cancel_futures=True)
+        archives.close()
+        if journal is not None:
+            journal.close()
+        reporter.finish()
+        error_log.close()
+    
+    # 結果は入力順に出力する（ワーカー数・完了順によらず同じ結果になる）
+    all_rows = []
+    for index in sorted(collected):
+        all_rows.extend(collected.pop(index))
+    files = [entry[1:] for entry in sorted(files)]
+    if journal is not None:
+        # 前回までに処理済みのファイルを含めて集計する
+        notes = [(index, {name: value for name, value in entry.items() if name not in ('index', 'end')})
+                 for index, entry in journal.entries.items()]
+        result.processed_count = sum(1 for _, entry in notes if entry['status'] == 'ok')
+        result.error_count = len(notes) - result.processed_count
+        result.record_count = sum(entry['records'] for _, entry in notes)
+    else:
+        result.processed_count = reporter.done - reporter.errors
+        result.error_count = reporter.errors
+        result.record_count = len(all_rows) + shard_records
+    if manifest is not None:
+        manifest['files'] = [entry for _, entry in sorted(notes, key=lambda note: note[0])]
+    result.bytes_processed = reporter.bytes_done
+    result.elapsed = reporter.elapsed()
+    
+    if journal is not None:
+        journal.finish(output_file, sort_rows=sort_rows)
+    elif shard_dir is None:
+        if sort_rows:
+            all_rows.sort(key=row_sort_key(csv_header))
+        if normalized_dir is not None:
+            write_normalized(normalized_dir, csv_header, all_rows, files, dictionary_columns=dictionary_columns)
+        else:
+            write_csv(output_file, csv_header, all_rows)
+    
+    if manifest is not None:
+        write_manifest(default_manifest_path(output_file), manifest, output_file, result)
+    
+    print_summary(result, label, output_file, error_log if error_log.count else None,
+                  normalized_dir=normalized_dir, shard_dir=shard_dir)
+    if manifest is not None:
+        print(f"マニフェストを出力しました: {default_manifest_path(output_file)} "
+              f"(シャード {manifest['shard']}/{manifest['shards']}, {len(file_paths)}ファイル)")
+    if index_path is not None:
+        start = time.monotonic()
+        counts = build_index(output_file, index_path)
+        print_index_summary(index_path, counts, time.monotonic() - start)
+    return result
+
+
+def write_manifest(manifest_path: str, manifest: Dict[str, any], output_file: str, result: BatchResult) -> None:
+    """
+    シャードのマニフェストを出力する（結果CSVの出力後に呼び、マニフェストの存在をシャードの完了とみなす）
+    
+    結果CSVはマニフェストと同じディレクトリにあるものとしてファイル名のみ記録する。
+    """
+    manifest = dict(manifest, output=os.path.basename(output_file), records=result.record_count,
+                    errors=result.error_count, completed=datetime.now().isoformat(timespec='seconds'))
+    temp_path = manifest_path + '.tmp'
+    try:
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            json.dump(manifest, f, ensure_ascii=False, indent=1)
+        os.replace(temp_path, manifest_path)
+    except OSError as e:
+        raise OutputError(f"マニフェストの出力に失敗しました: {e}", manifest_path) from e
+
+
+def verify_manifests(manifest_paths: List[str]) -> List[str]:
+    """
+    全シャードのマニフェストを確認し、シャードの番号順の結果CSVのパスを返す
+    
+    同じ一覧から作られたこと、1から N までのシャードがそろっていること、
+    一覧の全ファイルがちょうど1回ずつ処理されたこと、結果CSVが存在することを確認する。
+    """
+    manifests = {}
+    reference = None
+    for path in manifest_paths:
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                manifest = json.load(f)
+        except (OSError, ValueError) as e:
+            raise FileListError(f"マニフェスト '{path}' を読み込めません: {e}", path) from e
+        if manifest.get('format') != MANIFEST_FORMAT:
+            raise FileListError(f"マニフェスト '{path}' の形式に対応していません。", path)
+        if reference is None:
+            reference = manifest
+        elif (manifest['list_hash'], manifest['shards']) != (reference['list_hash'], reference['shards']):
+            raise FileListError(f"マニフェスト '{path}' は他のシャードと異なる一覧またはシャード数のものです。", path)
+        if manifest['shard'] in manifests:
+            raise FileListError(f"シャード {manifest['shard']} のマニフェストが重複しています: {path}", path)
+        manifests[manifest['shard']] = (path, manifest)
+    
+    missing = [str(number) for number in range(1, reference['shards'] + 1) if number not in manifests]
+    if missing:
+        raise FileListError(f"完了していないシャードがあります: {', '.join(missing)}"
+                            f"（全 {reference['shards']} シャード）")
+    seen = set()
+    for path, manifest in manifests.values():
+        for entry in manifest['files']:
+            if entry['path'] in seen:
+                raise FileListError(f"ファイル '{entry['path']}' が複数のシャードで処理されています。", path)
+            seen.add(entry['path'])
+    if len(seen) != reference['list_files']:
+        raise FileListError(f"処理されたファイル数が一覧と一致しません: {len(seen)} / {reference['list_files']}")
+    
+    outputs = []
+    for number in sorted(manifests):
+        path, manifest = manifests[number]
+        output = os.path.join(os.path.dirname(path), manifest['output'])
+        if not os.path.isfile(output):
+            raise FileListError(f"シャード {number} の結果CSVが見つかりません: {output}", output)
+        outputs.append(output)
+    return outputs
+
+
+def write_shard(shard_file: str, items: List[Tuple[str, int]],
+                extract_file: Callable[[str, str], List[Dict[str, any]]],
+                to_csv_row: Callable[[Dict[str, any]], List], csv_header: List[str],
+                dedup: bool = True) -> List[tuple]:
+    """
+    1つのシャードのファイル (ファイルパス, サイズ) を読み込んで抽出し、(ファイル, 行番号) 順に並べて
+    shard_file に出力する（ワーカーで実行される。結果の行は親プロセスに返さない）
+    
+    各ファイルの (ファイルパス, サイズ, データ行数, 結果を再利用したか, エラー) のリストを返す。
+    エラーは成功した場合は None、失敗した場合は (メッセージ, エラーの種類)。
+    dedup=True の場合、シャードの中で内容が同一のファイルは一度だけ解析し、file 列だけを差し替える。
+    """
+    file_column = header_column(csv_header, 'ファイル')
+    # ファイル内容のキー -> CSVの行（file 列は最初に解析したファイルのもの）
+    parsed_contents = {}
+    rows = []
+    outcomes = []
+    with ArchiveReader() as archives:
+        for file_path, size in items:
+            try:
+                if is_entry_path(file_path):
+                    data = archives.read(file_path)
+                else:
+                    with open(file_path, 'rb') as f:
+                        data = f.read()
+            except (OSError, ExtractionError) as e:
+                message = str(e) if isinstance(e, ExtractionError) else f"{file_path} の処理に失敗しました: {e}"
+                outcomes.append((file_path, size, 0, False, (message, type(e).__name__)))
+                continue
+            key = content_key(data) if dedup else None
+            file_rows = parsed_contents.get(key) if dedup else None
+            reused = file_rows is not None
+            if reused:
+                # 抽出クラスと同じ表記（Path で正規化したパス）にする
+                file_name = str(Path(file_path))
+                file_rows = [row[:file_column] + [file_name] + row[file_column + 1:] for row in file_rows]
+            else:
+                try:
+                    file_rows = extract_rows(extract_file, to_csv_row, file_path, data)
+                except Exception as e:
+                    outcomes.append((file_path, size, 0, False,
+                                     (f"{file_path} の処理に失敗しました: {e}", type(e).__name__)))
+                    continue
+                if dedup:
+                    parsed_contents[key] = file_rows
+            rows.extend(file_rows)
+            outcomes.append((file_path, size, len(file_rows), reused, None))
+    rows.sort(key=row_sort_key(csv_header))
+    write_csv(shard_file, csv_header, rows)
+    return outcomes
+
+
+def merge_shards(shard_paths: List[str], output_file: str) -> int:
+    """
+    (ファイル, 行番号) 順のシャードを1つのCSVに併合し、データ行数を返す
+    
+    各シャードから1行ずつ読みながら k-way マージ（heapq.merge）するため、メモリ使用量は
+    行数によらずシャード数に比例する。同じキーの行はシャードの指定順に並べる。
+    ヘッダーは全シャードで同じである必要があり、出力には1回だけ書き出す。
+    .gz / .xz のシャードは展開しながら読み、output_file が .gz / .xz の場合は圧縮しながら書き出す。
+    """
+    if not shard_paths:
+        raise UsageError("併合するシャードを指定してください。")
+    files = []
+    try:
+        readers = []
+        header = None
+        for path in shard_paths:
+            try:
+                f = open_text(path, 'r', newline='', encoding='utf-8-sig')
+            except OSError as e:
+                raise ExtractionError(f"シャード '{path}' を開けません: {e}", path) from e
+            files.append(f)
+            reader = csv.reader(f)
+            try:
+                shard_header = next(reader, None)
+            except (OSError, UnicodeDecodeError) + DECOMPRESSION_ERRORS as e:
+                raise ExtractionError(f"シャード '{path}' を読み込めません: {e}", path) from e
+            if shard_header is None:
+                raise ExtractionError(f"シャード '{path}' にヘッダー行がありません。", path)
+            if header is None:
+                header = shard_header
+            elif shard_header != header:
+                raise ExtractionError(f"シャード '{path}' のヘッダーが他のシャードと異なります。", path)
+            readers.append(reader)
+        
+        count = 0
+        
+        def counted(rows):
+            nonlocal count
+            try:
+                for row in rows:
+                    count += 1
+                    yield row
+            except (OSError, UnicodeDecodeError) + DECOMPRESSION_ERRORS as e:
+                # 出力の失敗（OutputError）と区別する
+                raise ExtractionError(f"シャードの読み込みに失敗しました: {e}", output_file) from e
+        
+        try:
+            write_csv(output_file, header, counted(heapq.merge(*readers, key=row_sort_key(header))))
+        except (csv.Error, ValueError, IndexError) as e:
+            raise ExtractionError(f"シャードの読み込みに失敗しました（(ファイル, 行番号) 順のシャードではありません）: {e}",
+                                  output_file) from e
+        return count
+    finally:
+        for f in files:
+            f.close()
+
+
+def merge_to_csv(paths: List[str], output_file: Optional[str] = None) -> None:
+    """
+    --merge の処理: シャードを併合して結果を表示（省略時は <最初のディレクトリ名>.csv に出力）
+    
+    マニフェスト（*_manifest.json）を指定した場合は verify_manifests() で全シャードの完了を確認してから
+    併合し、併合した行数がマニフェストの件数の合計と一致することも確認する。
+    """
+    if output_file is None:
+        if not paths or not os.path.isdir(paths[0]):
+            raise UsageError("シャードのファイルを指定する場合は出力ファイル名（--output）を指定してください。")
+        output_file = os.path.normpath(paths[0]) + '.csv'
+    expected = None
+    if paths and all(path.endswith('.json') for path in paths):
+        shard_paths = verify_manifests(paths)
+        expected = 0
+        for path in paths:
+            with open(path, 'r', encoding='utf-8') as f:
+                expected += json.load(f)['records']
+    else:
+        shard_paths = find_shards(paths)
+    count = merge_shards(shard_paths, output_file)
+    if expected is not None and count != expected:
+        raise ExtractionError(f"併合した行数がマニフェストの件数と一致しません: {count} / {expected}", output_file)
+    print(f"{len(shard_paths)}個のシャードを併合しました: {output_file} ({count}行)")
+
+
+def find_shards(paths: List[str]) -> List[str]:
+    """
+    シャードのファイルパスのリストを返す
+    
+    ディレクトリを指定した場合はその中の shard-*.csv（.csv.gz / .csv.xz を含む）を名前順に返す。
+    """
+    shard_paths = []
+    for path in paths:
+        if os.path.isdir(path):
+            shard_paths.extend(sorted(os.path.join(path, name) for name in os.listdir(path)
+                                      if name.startswith('shard-') and split_compression(name)[0].endswith('.csv')))
+        else:
+            shard_paths.append(path)
+    return shard_paths
+
+
+def plan_batches(items: List[Tuple[int, str, int]], workers: int,
+                 cost_model: Callable[[str, int], float]) -> List[List[Tuple[int, str, int]]]:
+    """
+    (入力順, ファイルパス, サイズ) のリストを、ワーカーに渡す順に並べたバッチのリストに分ける
+    
+    見積もったコストの大きい順に並べ、先頭から「残りのコストの合計 / (workers * BATCH_SPLIT)」を
+    目安にバッチにまとめる（guided self-scheduling）。大きなファイルは最初に少数ずつ渡り、
+    小さなファイルは合計のコストが同程度のバッチにまとめて渡る。残りが少なくなるほどバッチは
+    小さくなるため、最後に1つのワーカーだけが長く動き続けることがない。
+    バッチの目安は MIN_BATCH_COST 以上（1タスクあたりのプロセス間通信の負担を抑える）、
+    MAX_BATCH_COST 以下（同時に読み込んでおくファイルの量を抑える）とする。
+    """
+    costs = {index: cost_model(file_path, size) for index, file_path, size in items}
+    remaining = sum(costs.values())
+    batches = []
+    batch = []
+    batch_cost = target = 0.0
+    for item in sorted(items, key=lambda item: (-costs[item[0]], item[0])):
+        if not batch:
+            target = min(max(remaining / (workers * BATCH_SPLIT), MIN_BATCH_COST), MAX_BATCH_COST)
+        cost = costs[item[0]]
+        batch.append(item)
+        batch_cost += cost
+        remaining -= cost
+        if batch_cost >= target:
+            batches.append(batch)
+            batch = []
+            batch_cost = 0.0
+    if batch:
+        batches.append(batch)
+    return batches
+
+
+def run_scheduled(executor: ProcessPoolExecutor, workers: int, batches: List[List[Tuple[int, str, int]]],
+                  extract_file: Callable[[str, str], List[Dict[str, any]]],
+                  to_csv_row: Callable[[Dict[str, any]], List],
+                  read_file: Callable, lookup: Callable, parsed_contents: Dict[tuple, Future],
+                  dedup: bool, collect: Callable) -> None:
+    """
+    plan_batches() のバッチを順にワーカーに渡し、完了したバッチのファイルから collect() に渡す
+    
+    ファイルはバッチを渡す直前に読み込み、同時に渡しておくバッチは workers * 2 個までとする。
+    各ワーカーは空いた時点で共有のキューから次のバッチを取るため、先に終わったワーカーが
+    残りのバッチを引き受ける。内容が同一のファイルは最初のファイルの結果を待って再利用する。
+    """
+    # 解析中のバッチの Future -> そのバッチのファイルごとの Future
+    in_flight = {}
+    # ファイルごとの Future -> その結果を待っているファイル（collect() の引数）
+    waiting = {}
+    
+    def submit(batch: List[Tuple[int, str, int]]) -> None:
+        payload = []
+        futures = []
+        for index, file_path, size in batch:
+            data = read_file(index, file_path, size)
+            if data is None:
+                continue
+            key, future = lookup(data)
+            reused = future is not None
+            if not reused:
+                future = Future()
+                payload.append((file_path, data))
+                futures.append(future)
+                if dedup:
+                    parsed_contents[key] = future
+            waiting.setdefault(future, []).append((file_path, size, key, future, reused, index))
+        if payload:
+            in_flight[executor.submit(extract_batch, extract_file, to_csv_row, payload)] = futures
+        # 同じバッチの中で再利用するファイルなど、既に結果のあるものはここで集計する
+        for future in [future for future in waiting if future.done()]:
+            for entry in waiting.pop(future):
+                collect(*entry)
+    
+    next_batch = 0
+    while next_batch < len(batches) or in_flight:
+        while next_batch < len(batches) and len(in_flight) < workers * 2:
+            submit(batches[next_batch])
+            next_batch += 1
+        if not in_flight:
+            continue
+        done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+        for batch_future in done:
+            futures = in_flight.pop(batch_future)
+            try:
+                results = batch_future.result()
+            except Exception as e:
+                results = [e] * len(futures)
+            for future, outcome in zip(futures, results):
+                if isinstance(outcome, Exception):
+                    future.set_exception(outcome)
+                else:
+                    future.set_result(outcome)
+                for entry in waiting.pop(future, ()):
+                    collect(*entry)
+
+
+def extract_batch(extract_file: Callable[[str, str], List[Dict[str, any]]],
+                  to_csv_row: Callable[[Dict[str, any]], List],
+                  payload: List[Tuple[str, bytes]]) -> List:
+    """バッチのファイルを順に抽出し、ファイルごとのCSVの行（失敗した場合は例外）のリストを返す（ワーカーで実行）"""
+    results = []
+    for file_path, data in payload:
+        try:
+            results.append(extract_rows(extract_file, to_csv_row, file_path, data))
+        except Exception as e:
+            results.append(e)
+    return results
+
+
+def extract_rows(extract_file: Callable[[str, str], List[Dict[str, any]]],
+                 to_csv_row: Callable[[Dict[str, any]], List],
+                 file_path: str, data: bytes) -> List[List]:
+    """
+    読み込んだバイト列を復号して抽出し、CSVの行のリストを返す（ワーカープロセスで実行される）
+    
+    抽出結果の辞書はキーの文字列と値を1件ずつ pickle することになるため、ワーカーの中で
+    列数が一定の行に変換してから親プロセスに返す（親プロセスでの復元と変換の時間も省ける）。
+    """
+    return [to_csv_row(record) for record in extract_file(file_path, decode_source(data, file_path))]
+
+
+class SourceGroup:
+    """
+    まとめて抽出し、結果をまとめてキャッシュする単位（Cargo のクレート、Gradle のサブプロジェクト）
+    
+    ワーカープロセスには SourceGroup ごと渡すため、属性は pickle できる値にする。
+    """
+    
+    def __init__(self, name: str, base_dir: str):
+        self.name = name
+        self.base_dir = base_dir
+        # 構成ファイル（重複なし）
+        self.file_paths = []
+        # 構成ファイルの相対パス・内容から求めたハッシュ（キャッシュのキー）と合計サイズ
+        self.hash = ''
+        self.size = 0
+    
+    def file_details(self) -> List:
+        """ハッシュに加えるファイルごとの情報（抽出結果が内容以外にも依存する場合にサブクラスで返す）"""
+        return [None] * len(self.file_paths)
+    
+    def compute_hash(self, csv_header: List[str]) -> None:
+        """hash と size を求める（読み込めないファイルはパスのみをハッシュに含める）"""
+        digest = hashlib.blake2b(digest_size=16)
+        digest.update(json.dumps([GROUP_CACHE_FORMAT, self.name, csv_header], ensure_ascii=False).encode('utf-8'))
+        self.size = 0
+        for file_path, detail in zip(self.file_paths, self.file_details()):
+            try:
+                with open(file_path, 'rb') as f:
+                    data = f.read()
+            except OSError:
+                key = ''
+            else:
+                key = content_key(data)[1].hex()
+                self.size += len(data)
+            entry = [os.path.relpath(file_path, self.base_dir), detail, key]
+            digest.update(json.dumps(entry, ensure_ascii=False).encode('utf-8') + b'\n')
+        self.hash = digest.hexdigest()
+
+
+def extract_group_files(group: SourceGroup, extract_file: Callable[[str, str], List[Dict[str, any]]],
+                        to_csv_row: Callable[[Dict[str, any]], List]) -> Tuple[List[List], List[list]]:
+    """
+    グループの全ファイルを抽出し、(先頭にグループ名を付けたCSVの行, 警告・エラー) を返す
+    
+    警告・エラーは [レベル, ファイルパス, メッセージ, エラーの種類] のリスト（ErrorLog.record の引数の順）。
+    """
+    rows = []
+    errors = []
+    for file_path in group.file_paths:
+        try:
+            with open(file_path, 'rb') as f:
+                data = f.read()
+        except FileNotFoundError:
+            errors.append(['warning', file_path, f"ファイルが見つかりません: {file_path}", 'SourceNotFoundError'])
+            continue
+        except OSError as e:
+            errors.append(['error', file_path, f"{file_path} の処理に失敗しました: {e}", type(e).__name__])
+            continue
+        try:
+            records = extract_file(file_path, decode_source(data, file_path))
+        except Exception as e:
+            errors.append(['error', file_path, f"{file_path} の処理に失敗しました: {e}", type(e).__name__])
+            continue
+        rows.extend([group.name] + to_csv_row(record) for record in records)
+    return rows, errors
+
+
+class GroupResultCache:
+    """
+    グループごとの抽出結果のキャッシュ（ディレクトリ）
+    
+    index.json にグループ名ごとのハッシュ・ディレクトリ・警告とエラーを、<グループ名>.csv に結果の行を保存する。
+    save() では今回処理したグループのみを index.json に残す。
+    """
+    
+    def __init__(self, cache_dir: Optional[str], file_column: int):
+        self.cache_dir = cache_dir
+        self.file_column = file_column
+        self.entries = {}
+        self.used = {}
+        self.hits = 0
+        if cache_dir is not None:
+            self.entries = self._load(os.path.join(cache_dir, 'index.json'))
+    
+    @staticmethod
+    def _load(path: str) -> dict:
+        """索引を読み込む（ない・壊れている・形式が違う場合は空のキャッシュ）"""
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return {}
+        if not isinstance(data, dict) or data.get('format') != GROUP_CACHE_FORMAT:
+            return {}
+        groups = data.get('groups')
+        return groups if isinstance(groups, dict) else {}
+    
+    def _rows_path(self, name: str) -> str:
+        # Gradle のプロジェクトパス（:app:core）などはファイル名に使えない文字を置き換える
+        return os.path.join(self.cache_dir, re.sub(r'[^\w.-]', '_', name) + '.csv')
+    
+    def get(self, group: SourceGroup) -> Optional[Tuple[List[List], List[list]]]:
+        """ハッシュが一致するグループの (CSVの行, 警告・エラー)。ない場合は None"""
+        entry = self.entries.get(group.name)
+        if self.cache_dir is None or entry is None or entry.get('hash') != group.hash:
+            return None
+        try:
+            with open(self._rows_path(group.name), 'r', encoding='utf-8', newline='') as f:
+                rows = list(csv.reader(f))
+        except (OSError, ValueError):
+            return None
+        if len(rows) != entry.get('records'):
+            return None
+        errors = entry.get('errors', [])
+        cached_dir = entry.get('dir')
+        if cached_dir and cached_dir != group.base_dir:
+            # 別の場所のチェックアウトで作ったキャッシュは、ファイルのパスを今回の場所に置き換える
+            rows, errors = self._relocate(rows, errors, cached_dir, group.base_dir)
+            entry = dict(entry, dir=group.base_dir)
+        self.hits += 1
+        self.used[group.name] = entry
+        return rows, errors
+    
+    def put(self, group: SourceGroup, rows: List[List], errors: List[list]) -> None:
+        if self.cache_dir is None:
+            return
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            with open(self._rows_path(group.name), 'w', encoding='utf-8', newline='') as f:
+                csv.writer(f).writerows(rows)
+        except OSError as e:
+            raise OutputError(f"結果のキャッシュを出力できません: {e}", self.cache_dir) from e
+        self.used[group.name] = {'hash': group.hash, 'dir': group.base_dir, 'records': len(rows), 'errors': errors}
+    
+    def _relocate(self, rows: List[List], errors: List[list], old_dir: str,
+                  new_dir: str) -> Tuple[List[List], List[list]]:
+        """行のファイル列と警告・エラーのパスを old_dir の下から new_dir の下に置き換える"""
+        
+        def move(path: str) -> str:
+            return str(Path(new_dir, os.path.relpath(path, old_dir)))
+        
+        for row in rows:
+            row[self.file_column] = move(row[self.file_column])
+        errors = [[level, move(file_path), message.replace(file_path, move(file_path)), error_type]
+                  for level, file_path, message, error_type in errors]
+        return rows, errors
+    
+    def save(self) -> None:
+        if self.cache_dir is None:
+            return
+        index_path = os.path.join(self.cache_dir, 'index.json')
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            with open(index_path + '.tmp', 'w', encoding='utf-8') as f:
+                json.dump({'format': GROUP_CACHE_FORMAT, 'groups': self.used}, f, ensure_ascii=False)
+            os.replace(index_path + '.tmp', index_path)
+        except OSError as e:
+            raise OutputError(f"結果のキャッシュを出力できません: {e}", index_path) from e
+
+
+def run_groups(groups: List[SourceGroup],
+               extract_group: Callable[[SourceGroup], Tuple[List[List], List[list]]],
+               csv_header: List[str], output_file: str, label: str, unit: str,
+               workers: int = 1, cache_dir: Optional[str] = None, quiet: bool = False,
+               error_log_path: Optional[str] = None, executor_kind: Optional[str] = 'auto') -> BatchResult:
+    """
+    グループ単位で抽出し、結果をグループの順に1つのCSVへ出力する（search_cargo / search_gradle から呼び出す）
+    
+    各グループの hash は呼び出し側で求めておく。cache_dir を指定した場合はハッシュが一致するグループを
+    抽出せずにキャッシュの結果を使う。workers が2以上の場合は残りのグループをプロセスプールに渡す
+    （大きいグループから順に渡し、最後に大きなグループだけが残らないようにする）。
+    extract_group はワーカーで呼び出すため、モジュールの関数（または その partial）にする
+    （executor_kind が 'thread' の場合はスレッドで呼び出す。make_executor()）。
+    unit はグループの呼び方（クレート、プロジェクト）。
+    """
+    cache = GroupResultCache(cache_dir, header_column(csv_header, 'ファイル'))
+    results = {group.name: cache.get(group) for group in groups}
+    pending = sorted((group for group in groups if results[group.name] is None),
+                     key=lambda group: group.size, reverse=True)
+    if not quiet:
+        print(f"{len(groups)}{unit}, {sum(len(group.file_paths) for group in groups)}ファイル"
+              f"（キャッシュを再利用: {cache.hits}{unit}, 抽出: {len(pending)}{unit}）")
+    
+    if error_log_path is None:
+        error_log_path = default_error_log_path(output_file)
+    error_log = ErrorLog(error_log_path)
+    reporter = ProgressReporter(len(groups), quiet=quiet, unit=unit)
+    result = BatchResult()
+    for group in groups:
+        if results[group.name] is not None:
+            reporter.advance(group.size)
+    workers = max(1, min(workers, len(pending)))
+    executor = make_executor(workers, executor_kind)
+    try:
+        if executor is not None:
+            futures = [(group, executor.submit(extract_group, group)) for group in pending]
+            extracted = ((group, future.result()) for group, future in futures)
+        else:
+            extracted = ((group, extract_group(group)) for group in pending)
+        for group, (rows, errors) in extracted:
+            cache.put(group, rows, errors)
+            results[group.name] = (rows, errors)
+            reporter.advance(group.size, error=bool(errors))
+    finally:
+        if executor is not None:
+            executor.shutdown(wait=True, cancel_futures=True)
+        reporter.finish()
+    cache.save()
+    
+    all_rows = []
+    try:
+        for group in groups:
+            rows, errors = results[group.name]
+            for level, file_path, message, error_type in errors:
+                if not quiet:
+                    print(f"{'警告' if level == 'warning' else 'エラー'}: {message}")
+                error_log.record(level, file_path, message, error_type)
+            all_rows.extend(rows)
+            # 警告・エラーはファイル単位で数える（グループ自体の警告はファイル数に含めない）
+            failed = len({file_path for _, file_path, _, _ in errors} & set(group.file_paths))
+            result.error_count += failed
+            result.processed_count += len(group.file_paths) - failed
+            result.bytes_processed += group.size
+    finally:
+        error_log.close()
+    result.record_count = len(all_rows)
+    write_csv(output_file, csv_header, all_rows)
+    result.elapsed = reporter.elapsed()
+    print_summary(result, label, output_file, error_log if error_log.count else None)
+    return result
+
+
+def print_summary(result: BatchResult, label: str, output_file: str,
+                  error_log: Optional[ErrorLog] = None,
+                  normalized_dir: Optional[str] = None,
+                  shard_dir: Optional[str] = None) -> None:
+    """一括処理の集計を表示（quiet モードでも表示する）"""
+    elapsed = max(result.elapsed, 1e-9)
+    print(f"\n処理完了: {result.processed_count}ファイル, エラー: {result.error_count}ファイル")
+    if result.resumed_count:
+        print(f"（うち前回までに処理済み: {result.resumed_count}ファイル）")
+    print(f"合計 {result.record_count}個の{label}を検出しました。")
+    if result.dedup_hits:
+        print(f"内容が同一のファイル: {result.dedup_hits}件（解析を省略し結果を再利用）")
+    print(f"処理時間: {format_duration(elapsed)} "
+          f"({(result.processed_count + result.error_count - result.resumed_count) / elapsed:.1f} ファイル/秒, "
+          f"{result.bytes_processed / elapsed / (1024 * 1024):.2f} MB/秒)")
+    if shard_dir is not None:
+        print(f"結果をシャードに出力しました: {shard_dir}")
+    elif normalized_dir is not None:
+        print(f"結果を正規化形式で出力しました: {normalized_dir}")
+    else:
+        print(f"結果をCSVファイルに出力しました: {output_file}")
+    if error_log is not None and error_log.path:
+        print(f"警告・エラーをログに出力しました: {error_log.path} ({error_log.count}件)")
@@ -0,0 +1,532 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+関数/メソッドの呼び出し関係（コールグラフ）を抽出するスクリプト
+
+既存の抽出クラス（search_api の言語プラグイン）で関数定義を抽出した後、
+各関数の本体から呼び出し箇所を検出し、呼び出し先を同じファイル内 → 全ファイルの順に解決する。
+結果は辺のリスト（呼び出し元 → 呼び出し先、ファイル、行番号）としてCSVに出力する。
+
+大量のファイルを処理できるよう、関数名・ファイル名・クラス名は SymbolTable で整数IDに置き換え、
+関数・呼び出し箇所・辺は array の整数列として保持する。
+呼び出し先の解決は名前のみで行う（型推論は行わないため、同名の関数が複数ある場合は
+候補ごとの辺を ambiguous として出力する。候補が多すぎる場合は呼び出し先を空欄にした1本にまとめる）。
+"""
+
+import re
+import sys
+import time
+import importlib
+from array import array
+from collections import deque
+from concurrent.futures import Future
+from typing import List, Dict, Optional, Tuple
+from pathlib import Path
+
+from search_common import (
+    ExtractionError, UsageError, UnsupportedLanguageError, LineIndex, read_file_list, write_csv, decode_source, content_key,
+    mask_literals, match_braces, find_body, pop_flag, pop_option
+)
+from search_batch import (
+    ProgressReporter, ErrorLog, default_error_log_path, format_duration, make_executor, parse_workers, resolve_executor
+)
+from search_api import LANGUAGES, detect_language, extract_source
+
+
+# 呼び出し箇所: 識別子の直後の (（Rustのターボフィッシュ ::<T> とJavaの明示的な型引数に対応）
+_CALL_SITE = re.compile(r'(?<![\w$])([A-Za-z_$][\w$]*)\s*(?:::\s*<[^(){};]*>\s*)?\(')
+
+# 呼び出し形式（直前の文字で判定）
+CALL_KINDS = ('direct', 'member', 'path')
+_KIND_DIRECT, _KIND_MEMBER, _KIND_PATH = range(3)
+
+# 解決範囲
+SCOPES = ('file', 'global', 'ambiguous', 'unresolved')
+_SCOPE_FILE, _SCOPE_GLOBAL, _SCOPE_AMBIGUOUS, _SCOPE_UNRESOLVED = range(4)
+
+# 候補が複数ある場合に候補ごとの辺を出力する上限（new / fmt / toString など
+# 多くのファイルで定義される名前で辺の数が候補数に比例して増えないように）
+DEFAULT_MAX_CANDIDATES = 8
+
+# 言語名 -> 言語モジュールのキーワード集合の名前
+_KEYWORD_SETS = {
+    'javascript': 'JS_KEYWORDS',
+    'java': 'JAVA_KEYWORDS',
+    'rust': 'RUST_KEYWORDS',
+}
+
+# 制御構文など、言語のキーワード集合に含まれないが呼び出しではないもの
+_NON_CALL_WORDS = frozenset({
+    'function', 'typeof', 'sizeof', 'assert', 'synchronized', 'fn', 'where', 'as', 'in',
+    'unsafe', 'dyn', 'impl', 'throws', 'yield', 'await', 'async',
+})
+
+# 定義の先頭（修飾子・アノテーションなど）から関数名を探す範囲の文字数
+_NAME_SEARCH_LIMIT = 2000
+
+# 読み込み済みの言語ごとの (文字列リテラル・コメントのパターン, 呼び出しとみなさない語の集合)
+_syntax_cache = {}
+
+CSV_HEADER = ['呼び出し元ファイル', '呼び出し元行番号', '呼び出し元', '呼び出し行番号', '呼び出し形式',
+              '呼び出し先', '呼び出し先ファイル', '呼び出し先行番号', '解決範囲', '候補数']
+
+
+class SymbolTable:
+    """文字列と整数IDを相互に変換するテーブル（同じ文字列は1つのIDを共有する）"""
+    
+    def __init__(self):
+        self._ids = {}
+        self._strings = []
+    
+    def intern(self, text: str) -> int:
+        """文字列のIDを返す（未登録の場合は登録する）"""
+        symbol_id = self._ids.get(text)
+        if symbol_id is None:
+            symbol_id = len(self._strings)
+            self._ids[text] = symbol_id
+            self._strings.append(text)
+        return symbol_id
+    
+    def lookup(self, text: str) -> Optional[int]:
+        """文字列のIDを返す（未登録の場合は None）"""
+        return self._ids.get(text)
+    
+    def __getitem__(self, symbol_id: int) -> str:
+        return self._strings[symbol_id]
+    
+    def __len__(self) -> int:
+        return len(self._strings)
+
+
+class CallGraph:
+    """
+    関数定義・呼び出し箇所・辺を整数IDの配列で保持するクラス
+    
+    関数は追加順の番号（関数ID）で参照し、名前・ファイル・クラス名は SymbolTable のIDで保持する。
+    呼び出し先はファイルごとに add_file() の時点で同じファイル内の定義に解決し、
+    解決できなかったものは resolve() で全ファイルの定義に対して解決する。
+    """
+    
+    def __init__(self, max_candidates: int = DEFAULT_MAX_CANDIDATES):
+        self.symbols = SymbolTable()
+        self.max_candidates = max_candidates
+        # 関数ID -> ファイル / 関数名 / クラス名 / 言語（SymbolTable のID）、行番号
+        self.func_file = array('i')
+        self.func_name = array('i')
+        self.func_container = array('i')
+        self.func_language = array('i')
+        self.func_line = array('i')
+        # (言語のID, 関数名のID) -> 関数IDのリスト（全ファイル。他の言語の同名の関数には解決しない）
+        self._definitions = {}
+        # 辺: 呼び出し元の関数ID, 呼び出し先の関数ID（未解決・候補が多すぎる場合は -1）,
+        # 呼び出し先の名前のID, 呼び出し行番号, 呼び出し形式, 解決範囲, 候補数
+        self.edge_caller = array('i')
+        self.edge_callee = array('i')
+        self.edge_name = array('i')
+        self.edge_line = array('i')
+        self.edge_kind = array('b')
+        self.edge_scope = array('b')
+        self.edge_candidates = array('i')
+        # 同じファイル内で解決できなかった呼び出し（resolve() で解決する）
+        self._pending_caller = array('i')
+        self._pending_name = array('i')
+        self._pending_line = array('i')
+        self._pending_kind = array('b')
+        self.call_count = 0
+    
+    def function_count(self) -> int:
+        return len(self.func_name)
+    
+    def add_file(self, file_path: str, language: str, functions: List[Tuple[str, int, str]],
+                 calls: List[Tuple[int, str, int, int]]) -> None:
+        """
+        1ファイル分の関数定義と呼び出し箇所を追加し、同じファイル内の定義に解決する
+        
+        functions は (関数名, 行番号, クラス名) のリスト、
+        calls は (呼び出し元の functions 内の番号, 呼び出し先の名前, 行番号, 呼び出し形式) のリスト。
+        """
+        intern = self.symbols.intern
+        file_id = intern(file_path)
+        language_id = intern(language)
+        first_id = len(self.func_name)
+        local_definitions = {}
+        for offset, (name, line, container) in enumerate(functions):
+            func_id = first_id + offset
+            name_id = intern(name)
+            self.func_file.append(file_id)
+            self.func_name.append(name_id)
+            self.func_container.append(intern(container))
+            self.func_language.append(language_id)
+            self.func_line.append(line)
+            local_definitions.setdefault(name_id, []).append(func_id)
+            self._definitions.setdefault((language_id, name_id), []).append(func_id)
+        
+        self.call_count += len(calls)
+        for caller_offset, name, line, kind in calls:
+            caller = first_id + caller_offset
+            name_id = intern(name)
+            candidates = local_definitions.get(name_id)
+            if candidates is None:
+                self._pending_caller.append(caller)
+                self._pending_name.append(name_id)
+                self._pending_line.append(line)
+                self._pending_kind.append(kind)
+                continue
+            if len(candidates) > 1:
+                # 呼び出し元と同じクラスの定義を優先する
+                container = self.func_container[caller]
+                same_container = [c for c in candidates if self.func_container[c] == container]
+                if same_container:
+                    candidates = same_container
+            self._add_edges(caller, candidates, name_id, line, kind,
+                            _SCOPE_FILE if len(candidates) == 1 else _SCOPE_AMBIGUOUS)
+    
+    def resolve(self, include_unresolved: bool = False) -> None:
+        """同じファイル内で解決できなかった呼び出しを全ファイルの定義に対して解決する"""
+        for caller, name_id, line, kind in zip(self._pending_caller, self._pending_name,
+                                               self._pending_line, self._pending_kind):
+            candidates = self._definitions.get((self.func_language[caller], name_id))
+            if candidates is None:
+                if include_unresolved:
+                    self._add_edges(caller, (), name_id, line, kind, _SCOPE_UNRESOLVED)
+                continue
+            self._add_edges(caller, candidates, name_id, line, kind,
+                            _SCOPE_GLOBAL if len(candidates) == 1 else _SCOPE_AMBIGUOUS)
+        self._pending_caller = array('i')
+        self._pending_name = array('i')
+        self._pending_line = array('i')
+        self._pending_kind = array('b')
+    
+    def _add_edges(self, caller: int, candidates, name_id: int, line: int, kind: int, scope: int) -> None:
+        """候補ごとに辺を追加（候補がない・多すぎる場合は呼び出し先なしの1本）"""
+        count = len(candidates)
+        if count == 0 or count > self.max_candidates:
+            candidates = (-1,)
+        for callee in candidates:
+            self.edge_caller.append(caller)
+            self.edge_callee.append(callee)
+            self.edge_name.append(name_id)
+            self.edge_line.append(line)
+            self.edge_kind.append(kind)
+            self.edge_scope.append(scope)
+            self.edge_candidates.append(count)
+    
+    def edge_count(self) -> int:
+        return len(self.edge_caller)
+    
+    def scope_counts(self) -> Dict[str, int]:
+        """解決範囲ごとの辺の数"""
+        counts = [0] * len(SCOPES)
+        for scope in self.edge_scope:
+            counts[scope] += 1
+        return dict(zip(SCOPES, counts))
+    
+    def iter_rows(self):
+        """辺をCSVの行として1件ずつ返す（文字列への変換は出力時にのみ行う）"""
+        symbols = self.symbols
+        for caller, callee, name_id, line, kind, scope, candidates in zip(
+                self.edge_caller, self.edge_callee, self.edge_name,
+                self.edge_line, self.edge_kind, self.edge_scope, self.edge_candidates):
+            if callee >= 0:
+                callee_file = symbols[self.func_file[callee]]
+                callee_line = self.func_line[callee]
+            else:
+                callee_file = ''
+                callee_line = ''
+            yield [
+                symbols[self.func_file[caller]],
+                self.func_line[caller],
+                symbols[self.func_name[caller]],
+                line,
+                CALL_KINDS[kind],
+                symbols[name_id],
+                callee_file,
+                callee_line,
+                SCOPES[scope],
+                candidates
+            ]
+
+
+def _get_syntax(language: str):
+    """言語ごとの文字列リテラル・コメントのパターンと、呼び出しとみなさない語の集合"""
+    cached = _syntax_cache.get(language)
+    if cached is None:
+        module = importlib.import_module(LANGUAGES[language][0])
+        keywords = getattr(module, _KEYWORD_SETS.get(language, ''), frozenset())
+        cached = (module.LITERAL_PATTERN, frozenset(keywords) | _NON_CALL_WORDS)
+        _syntax_cache[language] = cached
+    return cached
+
+
+def _find_name(masked: str, name: str, start: int) -> int:
+    """start 以降（_NAME_SEARCH_LIMIT 文字以内）で単語として現れる name の位置（見つからなければ -1）"""
+    end = start + _NAME_SEARCH_LIMIT
+    pos = masked.find(name, start, end)
+    while pos != -1:
+        before = masked[pos - 1] if pos > 0 else ' '
+        after_pos = pos + len(name)
+        after = masked[after_pos] if after_pos < len(masked) else ' '
+        if not (before.isalnum() or before in '_$') and not (after.isalnum() or after in '_$'):
+            return pos
+        pos = masked.find(name, after_pos, end)
+    return -1
+
+
+def scan_file(file_path: str, content: str, language: Optional[str] = None,
+              **options) -> Tuple[List[Tuple[str, int, str]], List[Tuple[int, str, int, int]]]:
+    """
+    1ファイルの関数定義と呼び出し箇所を抽出する（ワーカープロセスでも実行できる純粋な関数）
+    
+    戻り値は (関数のリスト, 呼び出し箇所のリスト)。
+    関数は (関数名, 行番号, クラス名)、呼び出し箇所は (呼び出し元の関数の番号, 名前, 行番号, 呼び出し形式)。
+    呼び出し箇所は、それを含む最も内側の関数本体に割り当てる（どの関数にも含まれないものは除外）。
+    """
+    if language is None:
+        language = detect_language(file_path)
+    records = extract_source(content, file_path, language, **options)
+    if not records:
+        return [], []
+    
+    literal_pattern, non_call_words = _get_syntax(language)
+    masked = mask_literals(content, literal_pattern)
+    braces = match_braces(masked)
+    line_index = LineIndex(masked)
+    
+    functions = []
+    # (本体の開始位置, 本体の終了位置, 関数の番号)
+    bodies = []
+    definition_positions = set()
+    for record in records:
+        name = record['name']
+        line = record['line']
+        functions.append((name, line, record.get('class_name') or record.get('struct_or_trait') or ''))
+        start = line_index.line_start(line)
+        if record.get('column'):
+            start += record['column'] - 1
+        name_pos = _find_name(masked, name, start)
+        if name_pos == -1:
+            continue
+        definition_positions.add(name_pos)
+        body = find_body(masked, name_pos + len(name), braces)
+        if body is not None:
+            bodies.append((body[0], body[1], len(functions) - 1))
+    
+    if not bodies:
+        return functions, []
+    bodies.sort()
+    
+    calls = []
+    # 呼び出し位置の昇順に走査し、開いている関数本体をスタックで管理する
+    stack = []
+    next_body = 0
+    for match in _CALL_SITE.finditer(masked, bodies[0][0]):
+        pos = match.start()
+        name = match.group(1)
+        if name in non_call_words or pos in definition_positions:
+            continue
+        while next_body < len(bodies) and bodies[next_body][0] <= pos:
+            stack.append(bodies[next_body])
+            next_body += 1
+        while stack and stack[-1][1] < pos:
+            stack.pop()
+        if not stack:
+            continue
+        
+        before = pos - 1
+        while before >= 0 and masked[before] in ' \t\r\n':
+            before -= 1
+        if before >= 0 and masked[before] == '.':
+            kind = _KIND_MEMBER
+        elif before >= 1 and masked[before] == ':' and masked[before - 1] == ':':
+            kind = _KIND_PATH
+        else:
+            kind = _KIND_DIRECT
+        calls.append((stack[-1][2], name, line_index.line(pos), kind))
+    
+    return functions, calls
+
+
+def _scan_data(file_path: str, language: str, data: bytes, options: Dict[str, any]):
+    """読み込んだバイト列を復号して scan_file() を実行する（ワーカープロセスで実行される）"""
+    return scan_file(file_path, decode_source(data, file_path), language, **options)
+
+
+def build_call_graph(file_paths: List[str], workers: int = 1, quiet: bool = False,
+                     error_log: Optional[ErrorLog] = None,
+                     language_options: Optional[Dict[str, Dict[str, any]]] = None,
+                     include_unresolved: bool = False,
+                     max_candidates: int = DEFAULT_MAX_CANDIDATES,
+                     executor_kind: str = 'auto') -> CallGraph:
+    """
+    ファイルのリストからコールグラフを構築する
+    
+    内容が同一のファイルは一度だけ解析し、結果を再利用する。
+    workers が2以上の場合、解析はワーカーのプール（executor_kind に従いプロセスまたはスレッド。
+    search_batch.make_executor()）で並列に行う（結果は入力順に追加する）。
+    """
+    graph = CallGraph(max_candidates)
+    reporter = ProgressReporter(len(file_paths), quiet=quiet)
+    if error_log is None:
+        error_log = ErrorLog(None)
+    language_options = language_options or {}
+    # (言語, ファイル内容のキー) -> 解析結果の Future
+    parsed_contents = {}
+    # 解析中・解析済みで追加待ちのファイル（ファイルパス, 言語, サイズ, Future）
+    pending = deque()
+    executor = make_executor(workers, executor_kind)
+    
+    def report_error(level: str, file_path: str, message: str, error_type: str, size: int = 0) -> None:
+        reporter.message(f"{'警告' if level == 'warning' else 'エラー'}: {message}")
+        error_log.record(level, file_path, message, error_type)
+        reporter.advance(size, error=True)
+    
+    def collect(file_path: str, language: str, size: int, future: Future) -> None:
+        """解析結果を入力順にコールグラフへ追加する"""
+        try:
+            functions, calls = future.result()
+        except Exception as e:
+            report_error('error', file_path, f"{file_path} の処理に失敗しました: {e}", type(e).__name__, size)
+            return
+        graph.add_file(file_path, language, functions, calls)
+        reporter.advance(size)
+    
+    try:
+        for file_path in file_paths:
+            try:
+                language = detect_language(file_path)
+            except UnsupportedLanguageError as e:
+                report_error('warning', file_path, str(e), type(e).__name__)
+                continue
+            try:
+                with open(file_path, 'rb') as f:
+                    data = f.read()
+            except OSError as e:
+                report_error('warning', file_path, f"ファイルを読み込めません: {file_path}: {e}",
+                             type(e).__name__)
+                continue
+            
+            key = (language, content_key(data))
+            future = parsed_contents.get(key)
+            if future is None:
+                options = language_options.get(language, {})
+                if executor is not None:
+                    future = executor.submit(_scan_data, file_path, language, data, options)
+                else:
+                    future = Future()
+                    try:
+                        future.set_result(_scan_data(file_path, language, data, options))
+                    except Exception as e:
+                        future.set_exception(e)
+                parsed_contents[key] = future
+            
+            pending.append((file_path, language, len(data), future))
+            while pending and (len(pending) > workers * 4 or pending[0][3].done()):
+                collect(*pending.popleft())
+        
+        while pending:
+            collect(*pending.popleft())
+    finally:
+        if executor is not None:
+            executor.shutdown(wait=True, cancel_futures=True)
+        reporter.finish()
+    
+    graph.resolve(include_unresolved)
+    return graph
+
+
+def process_multiple_files(list_csv_path: str, output_file: str = None,
+                           quiet: bool = False, error_log: str = None,
+                           workers: int = 1, include_unresolved: bool = False,
+                           max_candidates: int = DEFAULT_MAX_CANDIDATES,
+                           language_options: Optional[Dict[str, Dict[str, any]]] = None,
+                           executor_kind: str = 'auto') -> None:
+    """一覧CSVファイルに記載されたファイルのコールグラフをCSVに出力"""
+    file_paths = read_file_list(list_csv_path)
+    
+    if not file_paths:
+        print("一覧CSVファイルにファイルパスが記載されていません。")
+        return
+    
+    if output_file is None:
+        output_file = str(Path(list_csv_path).with_suffix('')) + '_callgraph.csv'
+    if error_log is None:
+        error_log = default_error_log_path(output_file)
+    
+    if not quiet:
+        print(f"処理対象ファイル数: {len(file_paths)}")
+    start_time = time.monotonic()
+    log = ErrorLog(error_log)
+    try:
+        graph = build_call_graph(file_paths, workers=workers, quiet=quiet, error_log=log,
+                                 language_options=language_options,
+                                 include_unresolved=include_unresolved,
+                                 max_candidates=max_candidates, executor_kind=executor_kind)
+    finally:
+        log.close()
+    write_csv(output_file, CSV_HEADER, graph.iter_rows())
+    elapsed = time.monotonic() - start_time
+    
+    scope_counts = graph.scope_counts()
+    print(f"\n関数/メソッド: {graph.function_count()}個, 呼び出し箇所: {graph.call_count}箇所")
+    print(f"辺: {graph.edge_count()}本 "
+          f"(同じファイル内 {scope_counts['file']}, 他のファイル {scope_counts['global']}, "
+          f"候補が複数 {scope_counts['ambiguous']}"
+          + (f", 未解決 {scope_counts['unresolved']}" if include_unresolved else '') + ")")
+    print(f"処理時間: {format_duration(elapsed)}")
+    print(f"結果をCSVファイルに出力しました: {output_file}")
+    if log.count:
+        print(f"警告・エラーをログに出力しました: {log.path} ({log.count}件)")
+
+
+def main():
+    """メイン関数"""
+    if len(sys.argv) < 3 or sys.argv[1] != '--list':
+        print("使用方法:")
+        print("  python search_callgraph.py --list <一覧CSVファイルのパス> [出力ファイル名] [--workers <ワーカー数>]")
+        print("                             [--unresolved] [--max-candidates <候補数>]")
+        print("                             [--quiet] [--error-log <ログファイル>] [--executor auto|process|thread]")
+        print("")
+        print("対応する拡張子: .js .mjs .cjs（JavaScript）, .java（Java）, .rs（Rust）")
+        print("")
+        print("例:")
+        print("  python search_callgraph.py --list file_list.csv")
+        print("  python search_callgraph.py --list file_list.csv callgraph.csv --workers 8")
+        print("  python search_callgraph.py --list file_list.csv callgraph.csv --unresolved")
+        sys.exit(1)
+    
+    try:
+        run(sys.argv[1:])
+    except ExtractionError as e:
+        print(f"エラー: {e}")
+        sys.exit(1)
+
+
+def run(args: List[str]) -> None:
+    """コマンドライン引数に従って処理を実行（エラーは ExtractionError で通知）"""
+    # --workers: 解析に使うワーカー数（省略時は1）
+    workers = parse_workers(pop_option(args, '--workers'), 1)
+    # --executor: ワーカーの種類（auto は GIL のない CPython ではスレッド、それ以外ではプロセス）
+    executor_kind = pop_option(args, '--executor') or 'auto'
+    resolve_executor(executor_kind)
+    # --unresolved: 定義が見つからない呼び出し（ライブラリの関数など）も出力する
+    include_unresolved = pop_flag(args, '--unresolved')
+    # --max-candidates: 候補ごとの辺を出力する候補数の上限
+    max_candidates = pop_option(args, '--max-candidates')
+    try:
+        max_candidates = int(max_candidates) if max_candidates is not None else DEFAULT_MAX_CANDIDATES
+    except ValueError:
+        raise UsageError(f"--max-candidates には候補数を指定してください: {max_candidates}") from None
+    quiet = pop_flag(args, '--quiet')
+    error_log = pop_option(args, '--error-log')
+    if len(args) < 2 or args[0] != '--list':
+        raise UsageError("一覧CSVファイルのパスを指定してください（--list <一覧CSVファイルのパス>）。")
+    
+    list_csv_path = args[1]
+    output_file = args[2] if len(args) > 2 else None
+    process_multiple_files(list_csv_path, output_file, quiet=quiet, error_log=error_log,
+                           workers=workers, include_unresolved=include_unresolved,
+                           max_candidates=max_candidates, executor_kind=executor_kind)
+
+
+if __name__ == '__main__':
+    main()
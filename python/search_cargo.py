@@ -0,0 +1,216 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Cargo ワークスペース単位の抽出（search_rust.py --cargo）
+
+ワークスペースの Cargo.toml の [workspace] members（glob 可）と exclude からメンバーのクレートを求め、
+各クレートのルート（[lib] / [[bin]] の path、src/lib.rs、src/main.rs、src/bin/ の下）から
+search_crate と同じく mod 宣言をたどってファイルを集める。target/ の下のファイルは対象にしない。
+抽出はクレート単位でワーカープロセスに渡し、結果CSVの先頭にクレート名の列を付ける。
+
+クレートの結果は、構成ファイルのパス・モジュールパス・内容から求めたハッシュとともにキャッシュ
+ディレクトリに保存し、次回はハッシュが一致するクレートを抽出せずに再利用する（更新日時は使わないため、
+CI で取り直したチェックアウトでも内容が同じクレートは再利用される）。
+"""
+
+import os
+import glob
+from functools import partial
+from typing import List, Dict, Optional, Tuple
+from pathlib import Path
+
+try:
+    import tomllib
+except ImportError:  # Python 3.10 以前
+    try:
+        import tomli as tomllib
+    except ImportError:
+        tomllib = None
+
+from search_common import ExtractionError, UsageError
+from search_batch import BatchResult, SourceGroup, extract_group_files, run_groups
+from search_regex import DEFAULT_REGEX_BACKEND
+from search_crate import (
+    CSV_HEADER as CRATE_CSV_HEADER, ModuleTreeCache, walk_crate, extract_crate_file, to_csv_row, default_cache_path
+)
+
+
+# CSV出力の列（search_crate の列の先頭にクレート名を加える）
+CSV_HEADER = ['クレート'] + CRATE_CSV_HEADER
+# ビルド成果物のディレクトリ（#[path] などでたどった場合も対象にしない）
+TARGET_DIR = 'target'
+
+
+class CargoManifestError(ExtractionError):
+    """Cargo.toml を読み込めない、またはワークスペースのメンバーが見つからない"""
+
+
+class WorkspaceCrate(SourceGroup):
+    """ワークスペースの1クレート（パッケージ）とそのルートファイル"""
+    
+    def __init__(self, name: str, crate_dir: str, roots: List[str]):
+        super().__init__(name, crate_dir)
+        self.roots = roots
+        # walk_crate でたどったファイル（file_paths と同じ順）
+        self.files = []
+    
+    def file_details(self) -> List:
+        # 同じ内容のファイルでもモジュールパスが変わると完全修飾名が変わる
+        return [[crate_file.module_path, crate_file.inline_modules] for crate_file in self.files]
+
+
+def read_manifest(manifest_path: str) -> Dict[str, any]:
+    """Cargo.toml を読み込む"""
+    if tomllib is None:
+        raise UsageError("Cargo.toml の読み込みには Python 3.11 以降か tomli が必要です（pip install tomli）。")
+    try:
+        with open(manifest_path, 'rb') as f:
+            return tomllib.load(f)
+    except FileNotFoundError:
+        raise CargoManifestError(f"Cargo.toml が見つかりません: {manifest_path}", manifest_path) from None
+    except OSError as e:
+        raise CargoManifestError(f"Cargo.toml を読み込めません: {manifest_path}: {e}", manifest_path) from e
+    except tomllib.TOMLDecodeError as e:
+        raise CargoManifestError(f"Cargo.toml の形式が正しくありません: {manifest_path}: {e}", manifest_path) from e
+
+
+def _in_target(path: str, workspace_dir: str) -> bool:
+    """path がワークスペースまたはクレートの target/ の下にあるか"""
+    relative = os.path.relpath(os.path.abspath(path), workspace_dir)
+    return TARGET_DIR in Path(relative).parts
+
+
+def member_dirs(manifest: Dict[str, any], workspace_dir: str) -> List[str]:
+    """ワークスペースのメンバーのディレクトリ（ルートの [package] を含む。members の記載順）"""
+    workspace = manifest.get('workspace') or {}
+    excluded = set()
+    for pattern in workspace.get('exclude', []):
+        excluded.update(os.path.normpath(path) for path in glob.glob(os.path.join(workspace_dir, pattern)))
+    
+    dirs = [workspace_dir] if 'package' in manifest else []
+    for pattern in workspace.get('members', []):
+        matches = sorted(glob.glob(os.path.join(workspace_dir, pattern)))
+        if not matches and not glob.has_magic(pattern):
+            raise CargoManifestError(f"ワークスペースのメンバーが見つかりません: {pattern}",
+                                     os.path.join(workspace_dir, 'Cargo.toml'))
+        for match in matches:
+            crate_dir = os.path.normpath(match)
+            if crate_dir in excluded or crate_dir in dirs or _in_target(crate_dir, workspace_dir):
+                continue
+            # glob に一致したディレクトリのうち Cargo.toml があるものだけをクレートとする
+            if os.path.isfile(os.path.join(crate_dir, 'Cargo.toml')):
+                dirs.append(crate_dir)
+    return dirs
+
+
+def crate_roots(crate_dir: str, manifest: Dict[str, any]) -> List[str]:
+    """
+    クレートのルートファイルのリスト（ライブラリ、バイナリの順）
+    
+    [lib] / [[bin]] の path を優先し、ない場合は Cargo の既定の配置（src/lib.rs、src/main.rs、
+    src/bin/*.rs、src/bin/*/main.rs）から探す。package.autobins = false の場合は src/bin/ を探さない。
+    """
+    package = manifest.get('package') or {}
+    lib = manifest.get('lib') or {}
+    candidates = [lib.get('path', 'src/lib.rs')]
+    for binary in manifest.get('bin', []):
+        if 'path' in binary:
+            candidates.append(binary['path'])
+        elif binary.get('name') == package.get('name'):
+            candidates.append('src/main.rs')
+        elif 'name' in binary:
+            candidates.append(f"src/bin/{binary['name']}.rs")
+    candidates.append('src/main.rs')
+    if package.get('autobins', True):
+        bin_dir = os.path.join(crate_dir, 'src', 'bin')
+        candidates.extend(os.path.relpath(path, crate_dir)
+                          for path in sorted(glob.glob(os.path.join(bin_dir, '*.rs')) +
+                                             glob.glob(os.path.join(bin_dir, '*', 'main.rs'))))
+    
+    roots = []
+    for candidate in candidates:
+        root = os.path.normpath(os.path.join(crate_dir, candidate))
+        if root not in roots and os.path.isfile(root):
+            roots.append(root)
+    return roots
+
+
+def read_workspace(manifest_path: str) -> List[WorkspaceCrate]:
+    """ワークスペースの Cargo.toml（またはそのディレクトリ）からメンバーのクレートを求める"""
+    if os.path.isdir(manifest_path):
+        manifest_path = os.path.join(manifest_path, 'Cargo.toml')
+    workspace_dir = os.path.dirname(os.path.abspath(manifest_path))
+    manifest = read_manifest(manifest_path)
+    
+    crates = []
+    names = set()
+    for crate_dir in member_dirs(manifest, workspace_dir):
+        crate_manifest_path = os.path.join(crate_dir, 'Cargo.toml')
+        crate_manifest = manifest if crate_dir == workspace_dir else read_manifest(crate_manifest_path)
+        name = (crate_manifest.get('package') or {}).get('name')
+        if not name:
+            raise CargoManifestError(f"[package] の name がありません: {crate_manifest_path}", crate_manifest_path)
+        if name in names:
+            raise CargoManifestError(f"パッケージ名が重複しています: {name}", crate_manifest_path)
+        names.add(name)
+        crates.append(WorkspaceCrate(name, crate_dir, crate_roots(crate_dir, crate_manifest)))
+    if not crates:
+        raise CargoManifestError(f"ワークスペースのメンバーがありません: {manifest_path}", manifest_path)
+    return crates
+
+
+def extract_crate(crate: WorkspaceCrate,
+                  regex_backend: str = DEFAULT_REGEX_BACKEND) -> Tuple[List[List], List[list]]:
+    """1クレートの全ファイルを抽出し、(CSVの行, 警告・エラー) を返す（ワーカープロセスで実行）"""
+    files_by_path = {crate_file.file_path: crate_file for crate_file in crate.files}
+    extract = partial(extract_crate_file, crate_files=files_by_path, regex_backend=regex_backend)
+    rows, errors = extract_group_files(crate, extract, to_csv_row)
+    if not crate.roots:
+        errors.insert(0, ['warning', crate.base_dir,
+                          f"クレートのルート（src/lib.rs または src/main.rs）が見つかりません: {crate.name}",
+                          'CrateRootError'])
+    return rows, errors
+
+
+def default_crate_cache_dir(output_file: str) -> str:
+    """結果CSVのパスからクレートのキャッシュのディレクトリを決める（result.csv -> result_crates）"""
+    root, _ = os.path.splitext(output_file)
+    return root + '_crates'
+
+
+def process_workspace(manifest_path: str, output_file: str = None, workers: int = 1,
+                      cache_dir: Optional[str] = None, use_cache: bool = True, quiet: bool = False,
+                      error_log: str = None, regex_backend: str = DEFAULT_REGEX_BACKEND,
+                      executor_kind: str = 'auto') -> BatchResult:
+    """
+    ワークスペースの全クレートを処理し、結果をクレートの記載順にCSVへ出力する
+    
+    ハッシュがキャッシュと一致しないクレートだけを抽出する。workers が2以上の場合は
+    クレート単位でワーカーのプールに渡す（大きいクレートから順に渡し、最後に大きなクレートが残らないようにする）。
+    """
+    crates = read_workspace(manifest_path)
+    workspace_dir = os.path.dirname(os.path.abspath(
+        manifest_path if not os.path.isdir(manifest_path) else os.path.join(manifest_path, 'Cargo.toml')))
+    if output_file is None:
+        output_file = workspace_dir + '_result.csv'
+    if use_cache and cache_dir is None:
+        cache_dir = default_crate_cache_dir(output_file)
+    module_cache = ModuleTreeCache(default_cache_path(output_file) if use_cache else None)
+    
+    for crate in crates:
+        seen = set()
+        for root in crate.roots:
+            for crate_file in walk_crate(root, module_cache):
+                if crate_file.file_path in seen or _in_target(crate_file.file_path, workspace_dir):
+                    continue
+                seen.add(crate_file.file_path)
+                crate.file_paths.append(crate_file.file_path)
+                crate.files.append(crate_file)
+        crate.compute_hash(CSV_HEADER)
+    module_cache.save()
+    
+    if not quiet:
+        print(f"ワークスペース: {workspace_dir}")
+    return run_groups(crates, partial(extract_crate, regex_backend=regex_backend), CSV_HEADER, output_file,
+                      '関数', 'クレート', workers=workers, cache_dir=cache_dir if use_cache else None,
+                      quiet=quiet, error_log_path=error_log, executor_kind=executor_kind)
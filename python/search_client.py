@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+常駐プロセス（search_daemon.py）のクライアント
+
+エディタの保存時フックなどから呼び出すことを想定し、標準ライブラリの socket と json と、
+引数の解析に search_common だけを読み込む（抽出モジュールは読み込まない）。応答は1行のJSONのまま標準出力に書き出す。
+
+使用方法:
+    python search_client.py extract <ファイルのパス> [--text]
+    python search_client.py find <関数名> [--prefix] [--limit <件数>] [--text]
+    python search_client.py status
+    python search_client.py stop
+    共通オプション: [--socket <ソケットのパス>]
+"""
+
+import os
+import sys
+import json
+import socket
+import tempfile
+
+from search_common import UsageError, pop_flag, pop_option
+
+
+def default_socket_path() -> str:
+    """既定のソケットのパス（$XDG_RUNTIME_DIR、なければ一時ディレクトリにユーザーごとに作る）"""
+    runtime_dir = os.environ.get('XDG_RUNTIME_DIR') or tempfile.gettempdir()
+    user = os.getuid() if hasattr(os, 'getuid') else os.environ.get('USERNAME', 'user')
+    return os.path.join(runtime_dir, f'search_daemon-{user}.sock')
+
+
+def request(message: dict, socket_path: str = None, timeout: float = 30.0) -> bytes:
+    """1件の要求を送り、応答の1行（JSON、改行を除く）を返す（接続できない場合は OSError）"""
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+        sock.settimeout(timeout)
+        sock.connect(socket_path or default_socket_path())
+        sock.sendall(json.dumps(message, ensure_ascii=False).encode('utf-8') + b'\n')
+        chunks = []
+        while True:
+            chunk = sock.recv(65536)
+            if not chunk:
+                break
+            chunks.append(chunk)
+            if chunk.endswith(b'\n'):
+                break
+    return b''.join(chunks).rstrip(b'\n')
+
+
+def print_text(response: dict) -> None:
+    """応答の関数/メソッドを「ファイル:行番号: 型 名前(引数)」の形式で表示（エディタの出力解析用）"""
+    for record in response.get('result', []):
+        params = ', '.join(record.get('parameters') or [])
+        print(f"{record['file']}:{record['line']}: {record['type']} {record['name']}({params})")
+
+
+def main():
+    """メイン関数"""
+    args = sys.argv[1:]
+    try:
+        socket_path = pop_option(args, '--socket')
+        text = pop_flag(args, '--text')
+        prefix = pop_flag(args, '--prefix')
+        limit = pop_option(args, '--limit')
+        try:
+            limit = int(limit) if limit is not None else None
+        except ValueError:
+            raise UsageError(f"--limit には件数を指定してください: {limit}") from None
+    except UsageError as e:
+        print(f"エラー: {e}", file=sys.stderr)
+        sys.exit(2)
+    
+    if not args or args[0] not in ('extract', 'find', 'status', 'stop') or \
+            (args[0] in ('extract', 'find') and len(args) < 2):
+        print(__doc__.strip())
+        sys.exit(2)
+    
+    command = args[0]
+    if command == 'extract':
+        message = {'op': 'extract', 'file': os.path.abspath(args[1])}
+    elif command == 'find':
+        message = {'op': 'find', 'name': args[1], 'prefix': prefix}
+        if limit is not None:
+            message['limit'] = limit
+    else:
+        message = {'op': command}
+    
+    try:
+        line = request(message, socket_path)
+    except OSError as e:
+        print(f"エラー: 常駐プロセスに接続できません（python search_daemon.py で起動してください）: {e}",
+              file=sys.stderr)
+        sys.exit(1)
+    
+    response = json.loads(line)
+    if text and response.get('ok') and isinstance(response.get('result'), list):
+        print_text(response)
+    else:
+        sys.stdout.buffer.write(line + b'\n')
+    if not response.get('ok'):
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
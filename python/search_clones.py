@@ -0,0 +1,324 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+関数本体の指紋から重複コード（コピー＆ペーストされた関数/メソッド）を検出するスクリプト
+
+既存の抽出クラス（search_api の言語プラグイン）に fingerprint オプションを指定して、
+関数定義とともに各関数本体の指紋（search_common.body_fingerprint）を求める。
+指紋が同じ関数を1つのグループにまとめ、2つ以上の関数を含むグループをCSVに出力する。
+関数どうしを総当たりで比較せず、指紋ごとの出現回数を数えてから2回以上現れた指紋の関数だけを
+集めるため、処理時間は関数の数にほぼ比例する。
+"""
+
+import sys
+import time
+from array import array
+from collections import deque
+from concurrent.futures import Future
+from typing import List, Dict, Optional, Tuple
+from pathlib import Path
+
+from search_common import (
+    ExtractionError, UsageError, UnsupportedLanguageError, FINGERPRINT_MODES, read_file_list, write_csv,
+    decode_source, content_key, pop_flag, pop_option
+)
+from search_batch import (
+    ProgressReporter, ErrorLog, default_error_log_path, format_duration, make_executor, parse_workers, resolve_executor
+)
+from search_api import detect_language, extract_source
+from search_callgraph import SymbolTable
+
+
+# 対象にする関数本体の字句数の下限（return x; のような短い関数はどこにでも現れるため除く）
+DEFAULT_MIN_TOKENS = 30
+
+CSV_HEADER = ['グループ', '指紋', '字句数', '関数の数', '言語', 'ファイル', '行番号', '終了行', '関数名']
+
+
+class CloneIndex:
+    """
+    関数の指紋と位置を array の整数列で保持し、指紋が同じ関数をグループにまとめるクラス
+    
+    関数は追加順の番号で参照し、ファイル・関数名・言語は SymbolTable のIDで保持する。
+    """
+    
+    def __init__(self):
+        self.symbols = SymbolTable()
+        # 関数の番号 -> 指紋（64ビット整数）、字句数、ファイル / 関数名 / 言語（SymbolTable のID）、行番号、終了行
+        self.func_hash = array('Q')
+        self.func_tokens = array('i')
+        self.func_file = array('i')
+        self.func_name = array('i')
+        self.func_language = array('i')
+        self.func_line = array('i')
+        self.func_end_line = array('i')
+        # 指紋 -> 出現回数
+        self._counts = {}
+    
+    def add_file(self, file_path: str, language: str, functions: List[Tuple[int, int, int, int, str]]) -> None:
+        """
+        1ファイル分の関数 (指紋, 字句数, 行番号, 終了行, 関数名) を追加する
+        
+        同じ本体が複数の定義パターンで抽出された関数（Java の method と interface_method など。
+        開始行は異なることがあるが終了行・名前・指紋は同じ）は、行番号の最も小さいものだけを追加する
+        （自分自身との重複として報告しないため、出現回数を数える前に除く）。
+        終了行と名前が同じでも指紋が異なる（本体が異なる）関数は、別の関数として残す。
+        """
+        file_id = self.symbols.intern(file_path)
+        language_id = self.symbols.intern(language)
+        counts = self._counts
+        unique = {}
+        for function in functions:
+            key = (function[3], function[4], function[0])
+            if key not in unique or function[2] < unique[key][2]:
+                unique[key] = function
+        for fingerprint, tokens, line, end_line, name in sorted(unique.values(), key=lambda function: function[2]):
+            self.func_hash.append(fingerprint)
+            self.func_tokens.append(tokens)
+            self.func_file.append(file_id)
+            self.func_name.append(self.symbols.intern(name))
+            self.func_language.append(language_id)
+            self.func_line.append(line)
+            self.func_end_line.append(end_line)
+            counts[fingerprint] = counts.get(fingerprint, 0) + 1
+    
+    def function_count(self) -> int:
+        return len(self.func_hash)
+    
+    def groups(self, cross_file: bool = False) -> List[List[int]]:
+        """
+        指紋が同じ2つ以上の関数のグループ（関数の番号のリスト）を返す
+        
+        グループは関数の数・字句数の多い順、グループ内は (ファイル, 行番号) 順に並べる。
+        cross_file=True の場合、1つのファイルの中だけで重複しているグループは除く。
+        """
+        duplicated = {fingerprint for fingerprint, count in self._counts.items() if count > 1}
+        members = {}
+        for index, fingerprint in enumerate(self.func_hash):
+            if fingerprint in duplicated:
+                members.setdefault(fingerprint, []).append(index)
+        
+        symbols = self.symbols
+        groups = []
+        for indexes in members.values():
+            if cross_file and len({self.func_file[index] for index in indexes}) < 2:
+                continue
+            indexes.sort(key=lambda index: (symbols[self.func_file[index]], self.func_line[index]))
+            groups.append(indexes)
+        groups.sort(key=lambda indexes: (-len(indexes), -self.func_tokens[indexes[0]], self.func_hash[indexes[0]]))
+        return groups
+    
+    def iter_rows(self, groups: List[List[int]]):
+        """CSVの行を順に生成（1行に1つの関数）"""
+        symbols = self.symbols
+        for number, indexes in enumerate(groups, 1):
+            for index in indexes:
+                yield [
+                    number,
+                    f'{self.func_hash[index]:016x}',
+                    self.func_tokens[index],
+                    len(indexes),
+                    symbols[self.func_language[index]],
+                    symbols[self.func_file[index]],
+                    self.func_line[index],
+                    self.func_end_line[index],
+                    symbols[self.func_name[index]]
+                ]
+
+
+def scan_file(file_path: str, content: str, language: Optional[str] = None,
+              fingerprint: str = 'exact', min_tokens: int = DEFAULT_MIN_TOKENS,
+              **options) -> List[Tuple[int, int, int, int, str]]:
+    """
+    1ファイルの関数の (指紋, 字句数, 行番号, 終了行, 関数名) のリストを返す（ワーカープロセスでも実行できる純粋な関数）
+    
+    本体のない関数と、本体の字句数が min_tokens 未満の関数は除く。
+    """
+    if language is None:
+        language = detect_language(file_path)
+    records = extract_source(content, file_path, language, fingerprint=fingerprint, **options)
+    return [(int(record['body_hash'], 16), record['body_tokens'], record['line'], record['end_line'], record['name'])
+            for record in records
+            if record.get('body_hash') is not None and record['body_tokens'] >= min_tokens]
+
+
+def _scan_data(file_path: str, language: str, data: bytes, options: Dict[str, any]):
+    """読み込んだバイト列を復号して scan_file() を実行する（ワーカープロセスで実行される）"""
+    return scan_file(file_path, decode_source(data, file_path), language, **options)
+
+
+def build_clone_index(file_paths: List[str], workers: int = 1, quiet: bool = False,
+                      error_log: Optional[ErrorLog] = None, fingerprint: str = 'exact',
+                      min_tokens: int = DEFAULT_MIN_TOKENS,
+                      language_options: Optional[Dict[str, Dict[str, any]]] = None,
+                      executor_kind: str = 'auto') -> CloneIndex:
+    """
+    ファイルのリストから関数の指紋の索引を作成する
+    
+    内容が同一のファイルは一度だけ解析し、結果を再利用する（コピーされたファイルの関数は重複として数える）。
+    workers が2以上の場合、解析はワーカーのプール（executor_kind に従いプロセスまたはスレッド。
+    search_batch.make_executor()）で並列に行う（結果は入力順に追加する）。
+    """
+    index = CloneIndex()
+    reporter = ProgressReporter(len(file_paths), quiet=quiet)
+    if error_log is None:
+        error_log = ErrorLog(None)
+    language_options = language_options or {}
+    # (言語, ファイル内容のキー) -> 解析結果の Future
+    parsed_contents = {}
+    # 解析中・解析済みで追加待ちのファイル（ファイルパス, 言語, サイズ, Future）
+    pending = deque()
+    executor = make_executor(workers, executor_kind)
+    
+    def report_error(level: str, file_path: str, message: str, error_type: str, size: int = 0) -> None:
+        reporter.message(f"{'警告' if level == 'warning' else 'エラー'}: {message}")
+        error_log.record(level, file_path, message, error_type)
+        reporter.advance(size, error=True)
+    
+    def collect(file_path: str, language: str, size: int, future: Future) -> None:
+        """解析結果を入力順に索引へ追加する"""
+        try:
+            functions = future.result()
+        except Exception as e:
+            report_error('error', file_path, f"{file_path} の処理に失敗しました: {e}", type(e).__name__, size)
+            return
+        index.add_file(file_path, language, functions)
+        reporter.advance(size)
+    
+    try:
+        for file_path in file_paths:
+            try:
+                language = detect_language(file_path)
+            except UnsupportedLanguageError as e:
+                report_error('warning', file_path, str(e), type(e).__name__)
+                continue
+            try:
+                with open(file_path, 'rb') as f:
+                    data = f.read()
+            except OSError as e:
+                report_error('warning', file_path, f"ファイルを読み込めません: {file_path}: {e}",
+                             type(e).__name__)
+                continue
+            
+            key = (language, content_key(data))
+            future = parsed_contents.get(key)
+            if future is None:
+                options = dict(language_options.get(language, {}), fingerprint=fingerprint, min_tokens=min_tokens)
+                if executor is not None:
+                    future = executor.submit(_scan_data, file_path, language, data, options)
+                else:
+                    future = Future()
+                    try:
+                        future.set_result(_scan_data(file_path, language, data, options))
+                    except Exception as e:
+                        future.set_exception(e)
+                parsed_contents[key] = future
+            
+            pending.append((file_path, language, len(data), future))
+            while pending and (len(pending) > workers * 4 or pending[0][3].done()):
+                collect(*pending.popleft())
+        
+        while pending:
+            collect(*pending.popleft())
+    finally:
+        if executor is not None:
+            executor.shutdown(wait=True, cancel_futures=True)
+        reporter.finish()
+    
+    return index
+
+
+def process_multiple_files(list_csv_path: str, output_file: str = None,
+                           quiet: bool = False, error_log: str = None,
+                           workers: int = 1, fingerprint: str = 'exact',
+                           min_tokens: int = DEFAULT_MIN_TOKENS, cross_file: bool = False,
+                           language_options: Optional[Dict[str, Dict[str, any]]] = None,
+                           executor_kind: str = 'auto') -> None:
+    """一覧CSVファイルに記載されたファイルの重複した関数のグループをCSVに出力"""
+    file_paths = read_file_list(list_csv_path)
+    
+    if not file_paths:
+        print("一覧CSVファイルにファイルパスが記載されていません。")
+        return
+    
+    if output_file is None:
+        output_file = str(Path(list_csv_path).with_suffix('')) + '_clones.csv'
+    if error_log is None:
+        error_log = default_error_log_path(output_file)
+    
+    if not quiet:
+        print(f"処理対象ファイル数: {len(file_paths)}")
+    start_time = time.monotonic()
+    log = ErrorLog(error_log)
+    try:
+        index = build_clone_index(file_paths, workers=workers, quiet=quiet, error_log=log,
+                                  fingerprint=fingerprint, min_tokens=min_tokens,
+                                  language_options=language_options, executor_kind=executor_kind)
+    finally:
+        log.close()
+    groups = index.groups(cross_file=cross_file)
+    write_csv(output_file, CSV_HEADER, index.iter_rows(groups))
+    elapsed = time.monotonic() - start_time
+    
+    print(f"\n対象の関数/メソッド: {index.function_count()}個（本体の字句数 {min_tokens} 以上）")
+    print(f"重複: {len(groups)}グループ, {sum(len(indexes) for indexes in groups)}個の関数/メソッド")
+    print(f"処理時間: {format_duration(elapsed)}")
+    print(f"結果をCSVファイルに出力しました: {output_file}")
+    if log.count:
+        print(f"警告・エラーをログに出力しました: {log.path} ({log.count}件)")
+
+
+def main():
+    """メイン関数"""
+    if len(sys.argv) < 3 or sys.argv[1] != '--list':
+        print("使用方法:")
+        print("  python search_clones.py --list <一覧CSVファイルのパス> [出力ファイル名] [--workers <ワーカー数>]")
+        print("                          [--renamed] [--min-tokens <字句数>] [--cross-file]")
+        print("                          [--quiet] [--error-log <ログファイル>] [--executor auto|process|thread]")
+        print("")
+        print("対応する拡張子: .js .mjs .cjs（JavaScript）, .java（Java）, .rs（Rust）")
+        print("")
+        print("例:")
+        print("  python search_clones.py --list file_list.csv")
+        print("  python search_clones.py --list file_list.csv clones.csv --workers 8")
+        print("  python search_clones.py --list file_list.csv clones.csv --renamed --min-tokens 50")
+        sys.exit(1)
+    
+    try:
+        run(sys.argv[1:])
+    except ExtractionError as e:
+        print(f"エラー: {e}")
+        sys.exit(1)
+
+
+def run(args: List[str]) -> None:
+    """コマンドライン引数に従って処理を実行（エラーは ExtractionError で通知）"""
+    # --workers: 解析に使うワーカー数（省略時は1）
+    workers = parse_workers(pop_option(args, '--workers'), 1)
+    # --executor: ワーカーの種類（auto は GIL のない CPython ではスレッド、それ以外ではプロセス）
+    executor_kind = pop_option(args, '--executor') or 'auto'
+    resolve_executor(executor_kind)
+    # --renamed: 識別子の名前だけが異なる関数も重複とみなす
+    fingerprint = FINGERPRINT_MODES[1] if pop_flag(args, '--renamed') else FINGERPRINT_MODES[0]
+    # --min-tokens: 対象にする関数本体の字句数の下限
+    min_tokens = pop_option(args, '--min-tokens')
+    try:
+        min_tokens = int(min_tokens) if min_tokens is not None else DEFAULT_MIN_TOKENS
+    except ValueError:
+        raise UsageError(f"--min-tokens には字句数を指定してください: {min_tokens}") from None
+    # --cross-file: 複数のファイルにまたがる重複のみ出力する
+    cross_file = pop_flag(args, '--cross-file')
+    quiet = pop_flag(args, '--quiet')
+    error_log = pop_option(args, '--error-log')
+    if len(args) < 2 or args[0] != '--list':
+        raise UsageError("一覧CSVファイルのパスを指定してください（--list <一覧CSVファイルのパス>）。")
+    
+    list_csv_path = args[1]
+    output_file = args[2] if len(args) > 2 else None
+    process_multiple_files(list_csv_path, output_file, quiet=quiet, error_log=error_log,
+                           workers=workers, fingerprint=fingerprint, min_tokens=min_tokens,
+                           cross_file=cross_file, executor_kind=executor_kind)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,574 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+関数/メソッド抽出スクリプト（search.py / search_rust.py / search_java.py）の共通処理
+
+コンソール出力や sys.exit() は行わず、エラーはすべて型付きの例外で通知する。
+コマンドラインでのメッセージ表示と終了コードの制御は各スクリプトの main() が担当する。
+"""
+
+import io
+import os
+import re
+import csv
+import gzip
+import json
+import lzma
+import hashlib
+from bisect import bisect_right
+from typing import List, Optional, Tuple
+from pathlib import Path
+
+
+class ExtractionError(Exception):
+    """抽出処理で発生するエラーの基底クラス（path にはエラーの対象ファイルを保持）"""
+    
+    def __init__(self, message: str, path=None):
+        super().__init__(message)
+        self.path = str(path) if path is not None else None
+
+
+class SourceNotFoundError(ExtractionError, FileNotFoundError):
+    """抽出対象のファイルが見つからない"""
+
+
+class SourceReadError(ExtractionError):
+    """抽出対象のファイルを読み込めない（文字コード不正など）"""
+
+
+class FileListError(ExtractionError):
+    """一覧CSVファイルを読み込めない"""
+
+
+class OutputError(ExtractionError):
+    """結果ファイルを出力できない"""
+
+
+class UnsupportedLanguageError(ExtractionError):
+    """対応していない言語・拡張子が指定された"""
+
+
+class UsageError(ExtractionError):
+    """コマンドライン引数が不正"""
+
+
+# 一覧CSVの1行目をヘッダー行とみなすキーワード
+HEADER_KEYWORDS = {'ファイル', 'ファイルパス', 'file', 'filepath', 'path', 'ファイル名'}
+
+
+def read_source(file_path) -> str:
+    """ソースファイルをUTF-8で読み込む（アーカイブ内のファイル「アーカイブ!/エントリー」も読み込める）"""
+    # search_archive は例外クラスをこのモジュールから読み込むため、使う場合にだけ読み込む
+    from search_archive import is_archive, is_entry_path, read_entry
+    if is_entry_path(file_path):
+        return decode_source(read_entry(file_path), file_path)
+    if is_archive(file_path):
+        raise SourceReadError(f"アーカイブは一覧CSVに記載するか --list に指定して処理してください: {file_path}",
+                              file_path)
+    try:
+        with open(file_path, 'r', encoding='utf-8') as f:
+            return f.read()
+    except FileNotFoundError:
+        raise SourceNotFoundError(f"ファイル '{file_path}' が見つかりません。", file_path) from None
+    except (OSError, UnicodeDecodeError) as e:
+        raise SourceReadError(f"ファイルの読み込みに失敗しました: {file_path}: {e}", file_path) from e
+
+
+def decode_source(data: bytes, file_path=None) -> str:
+    """
+    バイト列をUTF-8のソースコードとして復号する
+    
+    テキストモードの open() と同じく改行コード（\r\n, \r）は \n に統一する。
+    """
+    try:
+        text = data.decode('utf-8')
+    except UnicodeDecodeError as e:
+        raise SourceReadError(f"ファイルの読み込みに失敗しました: {file_path}: {e}", file_path) from e
+    if '\r' in text:
+        text = text.replace('\r\n', '\n').replace('\r', '\n')
+    return text
+
+
+def content_key(data: bytes) -> tuple:
+    """ファイル内容を識別するキー（サイズ + BLAKE2bハッシュ）"""
+    return (len(data), hashlib.blake2b(data, digest_size=16).digest())
+
+
+class LineIndex:
+    """
+    文字位置から行番号・列番号を求めるクラス
+    
+    改行位置を一度だけ走査して保持し、二分探索で行を求める。
+    マッチごとに content[:pos].count('\n') を計算すると大きなファイルで
+    処理時間がマッチ数 × ファイルサイズに比例してしまうため、その代わりに使用する。
+    """
+    
+    def __init__(self, text: str):
+        starts = [0]
+        find = text.find
+        pos = find('\n')
+        while pos != -1:
+            starts.append(pos + 1)
+            pos = find('\n', pos + 1)
+        self._starts = starts
+    
+    def line(self, pos: int) -> int:
+        """文字位置 pos の行番号（1始まり）"""
+        return bisect_right(self._starts, pos)
+    
+    def column(self, pos: int) -> int:
+        """文字位置 pos の列番号（1始まり）"""
+        return pos - self._starts[bisect_right(self._starts, pos) - 1] + 1
+    
+    def line_start(self, line: int) -> int:
+        """行番号 line（1始まり）の先頭の文字位置"""
+        return self._starts[line - 1]
+    
+    def line_count(self) -> int:
+        return len(self._starts)
+
+
+# 引数の分割で意味を持つ字句（-> と => は閉じ山括弧と区別するため1つの字句として扱う）
+_PARAM_TOKENS = re.compile(r'->|=>|[()\[\]{}<>,]')
+# 文字列リテラルを含む場合の走査用
+_PARAM_DELIMITERS = re.compile(r'[()\[\]{}<>,"\'`]')
+_OPEN_BRACKETS = frozenset('([{')
+_CLOSE_BRACKETS = frozenset(')]}')
+
+
+def split_params(params_str: str, angle_brackets: bool = True, quotes: str = '"') -> List[str]:
+    """
+    引数リストの文字列をトップレベルのカンマで分割する（各要素は前後の空白を除去、空要素は除外）
+    
+    ()、[]、{} と（angle_brackets=True の場合）<> の入れ子の内側にあるカンマでは分割しない。
+    -> と => の > は閉じ括弧として扱わない。quotes に含まれる文字で囲まれた文字列リテラル内の
+    カンマも無視する（Rustではライフタイム 'a と区別できないため ' を含めないこと）。
+    
+    括弧とカンマの字句だけを正規表現で一度に取り出して深さを追跡し、
+    各引数は元の文字列からスライスで切り出す（1文字ずつの連結は行わない）。
+    
+    例:
+        split_params('f: impl Fn(A, B) -> C, (x, y): (u8, u8)')
+        -> ['f: impl Fn(A, B) -> C', '(x, y): (u8, u8)']
+    """
+    if ',' not in params_str:
+        param = params_str.strip()
+        return [param] if param else []
+    for quote in quotes:
+        if quote in params_str:
+            return _split_params_quoted(params_str, angle_brackets, quotes)
+    
+    params = []
+    depth = 0
+    angle_depth = 0
+    start = 0
+    comma = -1
+    find = params_str.find
+    for token in _PARAM_TOKENS.findall(params_str):
+        if token == ',':
+            # 字句の出現順とカンマの出現順は一致するので、位置は find で順に求める
+            comma = find(',', comma + 1)
+            if depth == 0 and angle_depth == 0:
+                param = params_str[start:comma].strip()
+                if param:
+                    params.append(param)
+                start = comma + 1
+        elif token == '<':
+            if angle_brackets:
+                angle_depth += 1
+        elif token == '>':
+            if angle_depth:
+                angle_depth -= 1
+        elif token in _OPEN_BRACKETS:
+            depth += 1
+        elif token in _CLOSE_BRACKETS:
+            if depth:
+                depth -= 1
+    
+    param = params_str[start:].strip()
+    if param:
+        params.append(param)
+    return params
+
+
+def _split_params_quoted(params_str: str, angle_brackets: bool, quotes: str) -> List[str]:
+    """文字列リテラルを含む引数リストの分割（区切り文字の位置を一度だけ走査する）"""
+    params = []
+    depth = 0
+    angle_depth = 0
+    start = 0
+    skip_until = 0
+    for match in _PARAM_DELIMITERS.finditer(params_str):
+        pos = match.start()
+        if pos < skip_until:
+            # 文字列リテラルの内側
+            continue
+        char = params_str[pos]
+        if char == ',':
+            if depth == 0 and angle_depth == 0:
+                param = params_str[start:pos].strip()
+                if param:
+                    params.append(param)
+                start = pos + 1
+        elif char in _OPEN_BRACKETS:
+            depth += 1
+        elif char in _CLOSE_BRACKETS:
+            if depth:
+                depth -= 1
+        elif char == '<':
+            if angle_brackets:
+                angle_depth += 1
+        elif char == '>':
+            if angle_depth and params_str[pos - 1] not in '-=':
+                angle_depth -= 1
+        elif char in quotes:
+            skip_until = _find_closing_quote(params_str, pos)
+    
+    param = params_str[start:].strip()
+    if param:
+        params.append(param)
+    return params
+
+
+# 既定値の区切りの走査用（== / === / => は代入の = ではない）
+_DEFAULT_DELIMITERS = re.compile(r'={2,}|=>|[=()\[\]{}"\'`]')
+
+
+def strip_default(param: str, quotes: str = '"') -> str:
+    """
+    引数から既定値（トップレベルの = 以降）を除いて返す（前後の空白も除去）
+    
+    ()、[]、{} の入れ子の内側と quotes の文字列リテラル内の = 、== / === / => は区切りとみなさない。
+    
+    例:
+        strip_default('{ a = 1, b } = {}') -> '{ a = 1, b }'
+        strip_default('f = (x) => x == 1') -> 'f'
+    """
+    if '=' not in param:
+        return param.strip()
+    depth = 0
+    skip_until = 0
+    for match in _DEFAULT_DELIMITERS.finditer(param):
+        pos = match.start()
+        if pos < skip_until:
+            # 文字列リテラルの内側
+            continue
+        token = match.group()
+        if token == '=':
+            if depth == 0:
+                return param[:pos].strip()
+        elif token in _OPEN_BRACKETS:
+            depth += 1
+        elif token in _CLOSE_BRACKETS:
+            if depth:
+                depth -= 1
+        elif token in quotes:
+            skip_until = _find_closing_quote(param, pos)
+    return param.strip()
+
+
+def _find_closing_quote(text: str, open_pos: int) -> int:
+    """open_pos の引用符に対応する閉じ引用符の直後の位置（閉じていなければ文字列の末尾）"""
+    quote = text[open_pos]
+    pos = text.find(quote, open_pos + 1)
+    while pos != -1:
+        # 直前のバックスラッシュが奇数個ならエスケープされた引用符
+        backslashes = 0
+        while text[pos - 1 - backslashes] == '\\':
+            backslashes += 1
+        if backslashes % 2 == 0:
+            return pos + 1
+        pos = text.find(quote, pos + 1)
+    return len(text)
+
+
+# 文字列リテラル・コメントの検出パターン（言語ごとの LITERAL_PATTERN の部品）
+# 大きなファイルでも速く走査できるよう、繰り返しは [^...]*(?:\\.[^...]*)* の形に展開して書く
+C_COMMENTS = r'//[^\n]*|/\*[^*]*\*+(?:[^/*][^*]*\*+)*/'
+_NON_NEWLINE = re.compile(r'[^\n]+')
+_BRACES = re.compile(r'[{}]')
+_PARENS = re.compile(r'[()]')
+# 引数リストの後の本体の開始（配列型 [T; N] の ; は本体のない宣言の終わりとみなさない）
+_BODY_OPEN = re.compile(r'\[[^\]\n]*\]|[{;]')
+_ARROW = re.compile(r'\s*=>\s*')
+
+
+def mask_literals(content: str, literal_pattern) -> str:
+    """
+    文字列リテラルとコメントを空白に置き換えた文字列を返す
+    
+    文字位置と改行はそのまま保つため、置き換え後の文字列での位置・行番号は元の文字列と一致する。
+    括弧の対応付けや呼び出し箇所の検出で、リテラル・コメント内の括弧や識別子を無視するために使用する。
+    """
+    return literal_pattern.sub(_blank_literal, content)
+
+
+def _blank_literal(match) -> str:
+    text = match.group()
+    if '\n' not in text:
+        return ' ' * len(text)
+    return _NON_NEWLINE.sub(lambda m: ' ' * len(m.group()), text)
+
+
+def match_braces(masked: str) -> dict:
+    """波括弧の対応（開き括弧の位置 -> 閉じ括弧の位置）を1回の走査で求める（mask_literals 適用後の文字列を渡す）"""
+    pairs = {}
+    stack = []
+    for match in _BRACES.finditer(masked):
+        pos = match.start()
+        if masked[pos] == '{':
+            stack.append(pos)
+        elif stack:
+            pairs[stack.pop()] = pos
+    return pairs
+
+
+def find_body(masked: str, pos: int, braces: dict) -> Optional[tuple]:
+    """
+    pos（関数名の位置）より後の引数リストに続く関数本体の範囲 (開始位置, 終了位置) を返す
+    
+    本体が { } の場合は波括弧の位置、アロー関数の式本体（=> expr）の場合は式の範囲を返す。
+    本体のない宣言（; で終わる）や括弧が閉じていない場合は None。
+    """
+    open_paren = masked.find('(', pos)
+    if open_paren == -1:
+        return None
+    depth = 0
+    close_paren = -1
+    for match in _PARENS.finditer(masked, open_paren):
+        if masked[match.start()] == '(':
+            depth += 1
+        else:
+            depth -= 1
+            if depth == 0:
+                close_paren = match.start()
+                break
+    if close_paren == -1:
+        return None
+    
+    arrow = _ARROW.match(masked, close_paren + 1)
+    if arrow:
+        start = arrow.end()
+        if start < len(masked) and masked[start] != '{':
+            # 式本体: 行末または ; まで
+            end = len(masked)
+            for terminator in ('\n', ';'):
+                found = masked.find(terminator, start)
+                if found != -1 and found < end:
+                    end = found
+            return (start, end)
+    
+    for match in _BODY_OPEN.finditer(masked, close_paren + 1):
+        char = masked[match.start()]
+        if char == '{':
+            end = braces.get(match.start())
+            return (match.start(), end) if end is not None else None
+        if char == ';':
+            return None
+    return None
+
+
+# 関数本体の指紋の種類（exact: 空白とコメントのみ無視、renamed: さらに識別子の名前を無視）
+FINGERPRINT_MODES = ('exact', 'renamed')
+# 文字列リテラル・コメントのパターンごとの字句（トークン）のパターン
+_token_patterns = {}
+
+
+def body_fingerprint(content: str, start: int, end: int, literal_pattern,
+                     keywords=frozenset(), rename: bool = False) -> tuple:
+    """
+    content[start:end] の字句の並びから関数本体の指紋を求め、(指紋, 字句数) を返す
+    
+    空白とコメントは無視し、文字列リテラルは1つの字句として内容ごと比較する。
+    rename=True の場合、キーワード以外の識別子を出現順の番号に置き換える
+    （変数名・関数名だけを変えたコピーも同じ指紋になる）。指紋は16桁の16進数。
+    """
+    token_pattern = _token_patterns.get(literal_pattern.pattern)
+    if token_pattern is None:
+        token_pattern = re.compile(literal_pattern.pattern + r'|[A-Za-z_$][\w$]*|\w+|\S', literal_pattern.flags)
+        _token_patterns[literal_pattern.pattern] = token_pattern
+    tokens = []
+    names = {}
+    for match in token_pattern.finditer(content, start, end):
+        token = match.group()
+        if token.startswith(('//', '/*')):
+            continue
+        if rename and (token[0].isalpha() or token[0] in '_$') and token not in keywords:
+            token = names.setdefault(token, f'${len(names)}')
+        tokens.append(token)
+    digest = hashlib.blake2b('\x1f'.join(tokens).encode('utf-8'), digest_size=8).hexdigest()
+    return digest, len(tokens)
+
+
+class BodySpans:
+    """
+    関数本体の終了行と行数を求めるクラス
+    
+    文字列リテラル・コメントの除去と波括弧の対応付けは、最初に必要になった時点で
+    ファイルごとに1回だけ行う（関数ごとに本体を走査し直さない）。
+    fingerprint（FINGERPRINT_MODES）を指定した場合は fingerprint() で本体の指紋も求める。
+    """
+    
+    def __init__(self, content: str, literal_pattern, line_index: LineIndex,
+                 fingerprint: Optional[str] = None, keywords=frozenset()):
+        self.content = content
+        self.literal_pattern = literal_pattern
+        self.line_index = line_index
+        self.fingerprint_mode = fingerprint
+        self.keywords = keywords
+        self._masked = None
+        self._braces = None
+        # 関数名の直後の位置 -> 本体の範囲（span() と fingerprint() で本体を探し直さない）
+        self._bodies = {}
+    
+    def body(self, name_end: int) -> Optional[tuple]:
+        """関数名の直後の位置 name_end から本体を探し、(開始位置, 終了位置) を返す（見つからない場合は None）"""
+        if name_end in self._bodies:
+            return self._bodies[name_end]
+        if self._masked is None:
+            self._masked = mask_literals(self.content, self.literal_pattern)
+            self._braces = match_braces(self._masked)
+        body = self._bodies[name_end] = find_body(self._masked, name_end, self._braces)
+        return body
+    
+    def span(self, name_end: int, start_line: int) -> tuple:
+        """
+        関数名の直後の位置 name_end から本体を探し、(終了行, 行数) を返す
+        
+        本体が見つからない場合（コメント内の定義など）は (None, None)。
+        """
+        body = self.body(name_end)
+        if body is None:
+            return None, None
+        end_line = self.line_index.line(body[1])
+        return end_line, end_line - start_line + 1
+    
+    def fingerprint(self, name_end: int) -> tuple:
+        """本体の (指紋, 字句数) を返す（本体が見つからない場合は (None, None)）"""
+        body = self.body(name_end)
+        if body is None:
+            return None, None
+        start, end = body
+        if self.content[start] == '{':
+            # 波括弧の本体は括弧の内側（式本体のアロー関数は式の範囲）
+            start += 1
+        return body_fingerprint(self.content, start, end, self.literal_pattern, self.keywords,
+                                rename=self.fingerprint_mode == 'renamed')
+
+
+# 出力先・入力のパスがこの拡張子で終わる場合は、ストリーミングで圧縮・展開しながら読み書きする
+COMPRESSION_SUFFIXES = ('.gz', '.xz')
+# 圧縮の水準（結果CSVの書き出しの速度を優先し、gzip は gzip コマンドの既定、xz は preset 3）
+GZIP_LEVEL = 6
+XZ_PRESET = 3
+# 展開時に OSError 以外で送出される例外（xz の形式の不正、途中で切れたファイル）
+DECOMPRESSION_ERRORS = (lzma.LZMAError, EOFError)
+
+
+def split_compression(path: str) -> Tuple[str, str]:
+    """パスを (圧縮の拡張子を除いたパス, 圧縮の拡張子) に分ける（result.csv.gz -> ('result.csv', '.gz')）"""
+    root, ext = os.path.splitext(path)
+    if ext.lower() in COMPRESSION_SUFFIXES:
+        return root, ext
+    return path, ''
+
+
+def open_text(path: str, mode: str = 'r', encoding: str = 'utf-8', newline: Optional[str] = None):
+    """
+    テキストファイルを開く（mode は 'r' / 'w' / 'a'）
+    
+    パスが .gz / .xz で終わる場合は圧縮・展開しながら読み書きする（ファイル全体をメモリに置かない）。
+    gzip のヘッダーには更新日時を書き込まないため、同じ内容からは同じバイト列になる。
+    """
+    compression = split_compression(path)[1].lower()
+    if compression == '.gz':
+        binary = gzip.GzipFile(path, mode + 'b', compresslevel=GZIP_LEVEL, mtime=0)
+    elif compression == '.xz':
+        binary = lzma.LZMAFile(path, mode + 'b', preset=XZ_PRESET if mode != 'r' else None)
+    else:
+        return open(path, mode, encoding=encoding, newline=newline)
+    return io.TextIOWrapper(binary, encoding=encoding, newline=newline)
+
+
+def read_file_list(list_csv_path: str) -> List[str]:
+    """
+    一覧CSVファイルからファイルパスのリストを読み込む（絶対パス対応。.gz / .xz は展開して読む）
+    
+    アーカイブ（.jar / .war / .ear / .zip）を指定した場合は、そのアーカイブだけの一覧とする。
+    """
+    from search_archive import is_archive
+    if is_archive(list_csv_path):
+        return [str(list_csv_path)]
+    file_paths = []
+    base_dir = Path(list_csv_path).parent
+    try:
+        with open_text(list_csv_path, 'r', encoding='utf-8-sig') as f:
+            reader = csv.reader(f)
+            first_row = True
+            for row in reader:
+                if not row or not row[0].strip():
+                    continue
+                
+                file_path = row[0].strip()
+                
+                # 最初の行がヘッダー行の可能性をチェック
+                if first_row:
+                    first_row = False
+                    if file_path.lower() in HEADER_KEYWORDS:
+                        continue
+                
+                # 相対パスの場合は一覧CSVファイルのディレクトリ基準で解決
+                if not Path(file_path).is_absolute():
+                    file_path = str(base_dir / file_path)
+                file_paths.append(file_path)
+    except FileNotFoundError:
+        raise FileListError(f"一覧CSVファイル '{list_csv_path}' が見つかりません。", list_csv_path) from None
+    except (OSError, UnicodeDecodeError, csv.Error) + DECOMPRESSION_ERRORS as e:
+        raise FileListError(f"一覧CSVファイルの読み込みに失敗しました: {e}", list_csv_path) from e
+    
+    return file_paths
+
+
+def write_csv(output_file: str, header: List[str], rows) -> None:
+    """
+    ヘッダー行とデータ行をCSVファイルに出力する（Excelで開けるようBOM付きUTF-8）
+    
+    output_file が .gz / .xz で終わる場合は行を書き出しながら圧縮する（展開するとBOM付きのCSVになる）。
+    """
+    try:
+        with open_text(output_file, 'w', newline='', encoding='utf-8-sig') as f:
+            writer = csv.writer(f)
+            writer.writerow(header)
+            writer.writerows(rows)
+    except OSError as e:
+        raise OutputError(f"CSVファイルの出力に失敗しました: {e}", output_file) from e
+
+
+def write_json(output_file: str, data) -> None:
+    """データを整形したJSONファイルに出力する（.gz / .xz で終わる場合は圧縮する）"""
+    try:
+        with open_text(output_file, 'w', encoding='utf-8') as f:
+            json.dump(data, f, ensure_ascii=False, indent=2)
+            f.write('\n')
+    except OSError as e:
+        raise OutputError(f"JSONファイルの出力に失敗しました: {e}", output_file) from e
+
+
+def pop_flag(args: List[str], flag: str) -> bool:
+    """引数リストからフラグ（例: --quiet）を取り除き、指定されていたかどうかを返す"""
+    if flag in args:
+        args.remove(flag)
+        return True
+    return False
+
+
+def pop_option(args: List[str], option: str) -> Optional[str]:
+    """引数リストから値付きオプション（例: --error-log PATH）を取り除き、値を返す"""
+    if option not in args:
+        return None
+    index = args.index(option)
+    if index + 1 >= len(args):
+        raise UsageError(f"{option} の値を指定してください。")
+    value = args[index + 1]
+    del args[index:index + 2]
+    return value
@@ -0,0 +1,383 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Rustのクレート単位の抽出（search_rust.py --crate）
+
+クレートのルート（src/lib.rs / src/main.rs）から mod 宣言をたどってモジュールツリーを作り、
+各ファイル・インラインモジュール（mod name { ... }）のモジュールパスを求める。
+抽出した関数には モジュールパス（crate::net::http）と完全修飾名（crate::net::http::Client::send）を付ける。
+
+mod 宣言の解析結果はキャッシュファイル（JSON）にファイルごとに保存し、
+次回は更新日時とサイズが変わったファイルだけを読み直してモジュールツリーを作り直す。
+"""
+
+import os
+import re
+import json
+from collections import deque
+from functools import partial
+from typing import List, Dict, Optional, Tuple
+from pathlib import Path
+
+from search_common import (
+    ExtractionError, OutputError, LineIndex, read_source, mask_literals, match_braces
+)
+from search_batch import run_batch
+from search_regex import DEFAULT_REGEX_BACKEND
+from search_rust import LITERAL_PATTERN, extract_file as extract_rust_file
+
+
+# mod 宣言（mod name; / mod name { ... }）。r#mod などの識別子の一部は除く
+_MOD_DECL = re.compile(r'(?<![\w#])mod\s+(?:r#)?(\w+)\s*([;{])')
+# mod 宣言に付いた #[path = "..."] 属性（文字列の中身は mask_literals で空白になっているため元の内容から読む）
+_PATH_ATTR = re.compile(r'#\[\s*path\s*=')
+_STRING_LITERAL = re.compile(r'"((?:[^"\\]|\\.)*)"')
+# mod 宣言の前の属性・可視性の範囲の始まり（直前の文・ブロックの区切り）
+_DECL_BOUNDARY = re.compile(r'[;{}][^;{}]*$')
+# アイテムとしての impl / trait ブロック（戻り値の型の -> impl Trait などは除くため、
+# ファイルの先頭・文やブロックの区切り・属性の直後にあるものに限る）
+_OWNER_DECL = re.compile(
+    r'(?:(?<=[;{}\]])|\A)\s*(?:(?:pub(?:\s*\([^)]*\))?|unsafe|default|auto)\s+)*(?:impl\b|trait\s+(\w+))'
+)
+_BLOCK_OPEN = re.compile(r'[{;]')
+_WHERE_CLAUSE = re.compile(r'\bwhere\b')
+_FOR_KEYWORD = re.compile(r'\bfor\b')
+_IMPL_SELF_TYPE = re.compile(r"(?:&\s*(?:'\w+\s+)?(?:mut\s+)?)?(?:dyn\s+)?((?:\w+::)*\w+)")
+
+# クレートのルートファイルの候補（ディレクトリを指定した場合に探す順）
+CRATE_ROOTS = ['src/lib.rs', 'src/main.rs', 'lib.rs', 'main.rs']
+CACHE_FORMAT = 1
+
+# CSV出力の列（search_rust.py の列にモジュールパスと完全修飾名を加える）
+CSV_HEADER = ['ファイル', '行番号', '終了行', '行数', 'モジュールパス', '構造体/トレイト', '型', '可視性',
+              '戻り値の型', '関数名', '完全修飾名', '引数']
+# 正規化形式（--normalized）で辞書符号化する列
+DICTIONARY_COLUMNS = ['モジュールパス', '構造体/トレイト', '型', '可視性', '戻り値の型']
+
+
+class CrateRootError(ExtractionError):
+    """クレートのルートファイル（lib.rs / main.rs）が見つからない"""
+
+
+def to_csv_row(func: Dict[str, any]) -> List:
+    """関数情報をCSVの1行に変換"""
+    params_str = ', '.join(func['parameters']) if func['parameters'] else ''
+    return [
+        func['file'],
+        func['line'],
+        func['end_line'],
+        func['line_count'],
+        func['module_path'],
+        func['struct_or_trait'],
+        func['type'],
+        func['visibility'],
+        func['return_type'],
+        func['name'],
+        func['qualified_name'],
+        params_str
+    ]
+
+
+def scan_modules(content: str) -> List[list]:
+    """
+    ファイル内の mod 宣言を出現順に返す
+    
+    各要素は [モジュール名, インラインか, #[path] の値, 開始行, 終了行, 親の要素番号] のリスト
+    （キャッシュにそのまま保存できる形）。終了行はインラインモジュールの閉じ括弧の行で、
+    mod name; の場合は None。親の要素番号は外側のインラインモジュール（なければ -1）。
+    """
+    masked = mask_literals(content, LITERAL_PATTERN)
+    braces = match_braces(masked)
+    line_index = LineIndex(content)
+    modules = []
+    # 外側のインラインモジュール（閉じ括弧の位置, 要素番号）
+    enclosing = []
+    
+    for match in _MOD_DECL.finditer(masked):
+        pos = match.start()
+        while enclosing and enclosing[-1][0] < pos:
+            enclosing.pop()
+        parent = enclosing[-1][1] if enclosing else -1
+        path = _path_attribute(content, masked, pos)
+        
+        if match.group(2) == '{':
+            open_pos = match.end(2) - 1
+            close_pos = braces.get(open_pos, len(masked))
+            enclosing.append((close_pos, len(modules)))
+            modules.append([match.group(1), True, path, line_index.line(open_pos),
+                            line_index.line(close_pos), parent])
+        else:
+            modules.append([match.group(1), False, path, line_index.line(pos), None, parent])
+    return modules
+
+
+def _path_attribute(content: str, masked: str, pos: int) -> Optional[str]:
+    """位置 pos の mod 宣言に付いた #[path = "..."] の値（なければ None）"""
+    boundary = _DECL_BOUNDARY.search(masked, max(0, pos - 1000), pos)
+    start = boundary.start() + 1 if boundary else max(0, pos - 1000)
+    attr = _PATH_ATTR.search(masked, start, pos)
+    if attr is None:
+        return None
+    literal = _STRING_LITERAL.search(content, attr.end(), pos)
+    return literal.group(1) if literal else None
+
+
+def owner_blocks(content: str) -> List[Tuple[int, int, str]]:
+    """
+    impl / trait ブロックの (開始行, 終了行, 型名またはトレイト名) のリストを出現順に返す
+    
+    impl Trait for Type の場合は Type、ジェネリクスは除く（impl<T> Vec<T> -> Vec）。
+    """
+    masked = mask_literals(content, LITERAL_PATTERN)
+    braces = match_braces(masked)
+    line_index = LineIndex(content)
+    blocks = []
+    for match in _OWNER_DECL.finditer(masked):
+        block_open = _BLOCK_OPEN.search(masked, match.end())
+        if block_open is None or block_open.group() != '{':
+            continue
+        open_pos = block_open.start()
+        close_pos = braces.get(open_pos)
+        if close_pos is None:
+            continue
+        name = match.group(1) or _impl_self_type(masked[match.end():open_pos])
+        if name:
+            blocks.append((line_index.line(open_pos), line_index.line(close_pos), name))
+    return blocks
+
+
+def _impl_self_type(header: str) -> Optional[str]:
+    """impl の後からブロックの開始までの部分から対象の型名を取り出す"""
+    header = header.strip()
+    if header.startswith('<'):
+        # impl<T: Trait<U>> のジェネリクス引数を読み飛ばす
+        depth = 0
+        for i, char in enumerate(header):
+            if char == '<':
+                depth += 1
+            elif char == '>':
+                depth -= 1
+                if depth == 0:
+                    header = header[i + 1:]
+                    break
+    header = _WHERE_CLAUSE.split(header, 1)[0]
+    target = _FOR_KEYWORD.split(header)[-1].strip()
+    match = _IMPL_SELF_TYPE.match(target)
+    return match.group(1) if match else None
+
+
+class CrateFile:
+    """クレートを構成する1ファイルと、ファイル内のインラインモジュールのモジュールパス"""
+    
+    def __init__(self, file_path: str, module_path: str):
+        self.file_path = file_path
+        self.module_path = module_path
+        # インラインモジュール（開始行, 終了行, モジュールパス）。外側のモジュールが先に並ぶ
+        self.inline_modules = []
+    
+    def module_path_at(self, line: int) -> str:
+        """行 line を含む最も内側のモジュールのパス"""
+        module_path = self.module_path
+        for start_line, end_line, inline_path in self.inline_modules:
+            if start_line <= line <= end_line:
+                module_path = inline_path
+        return module_path
+
+
+class ModuleTreeCache:
+    """
+    ファイルごとの mod 宣言の解析結果のキャッシュ
+    
+    キーはファイルの絶対パス。更新日時（ナノ秒）とサイズが一致する場合は読み込まずに再利用する。
+    save() では今回のモジュールツリーに含まれたファイルのみを保存する。
+    """
+    
+    def __init__(self, path: Optional[str]):
+        self.path = path
+        self.entries = {}
+        self.used = {}
+        self.hits = 0
+        self.misses = 0
+        if path is not None:
+            self.entries = self._load(path)
+    
+    @staticmethod
+    def _load(path: str) -> dict:
+        """キャッシュファイルを読み込む（ない・壊れている・形式が違う場合は空のキャッシュ）"""
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return {}
+        if not isinstance(data, dict) or data.get('format') != CACHE_FORMAT:
+            return {}
+        files = data.get('files')
+        return files if isinstance(files, dict) else {}
+    
+    def modules(self, file_path: str) -> List[list]:
+        """file_path の mod 宣言（scan_modules の形式）。読み込めないファイルは空のリスト"""
+        key = os.path.abspath(file_path)
+        try:
+            st = os.stat(file_path)
+        except OSError:
+            return []
+        entry = self.entries.get(key)
+        if entry is not None and entry.get('mtime_ns') == st.st_mtime_ns and entry.get('size') == st.st_size:
+            self.hits += 1
+            self.used[key] = entry
+            return entry['modules']
+        
+        try:
+            content = read_source(file_path)
+        except ExtractionError:
+            # 読み込みの失敗は抽出時にエラーログへ記録される
+            return []
+        modules = scan_modules(content)
+        self.misses += 1
+        self.used[key] = {'mtime_ns': st.st_mtime_ns, 'size': st.st_size, 'modules': modules}
+        return modules
+    
+    def save(self) -> None:
+        if self.path is None:
+            return
+        try:
+            with open(self.path, 'w', encoding='utf-8') as f:
+                json.dump({'format': CACHE_FORMAT, 'files': self.used}, f, ensure_ascii=False)
+        except OSError as e:
+            raise OutputError(f"モジュールツリーのキャッシュを出力できません: {e}", self.path) from e
+
+
+def find_crate_roots(crate_path: str) -> List[str]:
+    """クレートのルートファイルのリスト（ファイルを指定した場合はそのファイルのみ）"""
+    if os.path.isfile(crate_path):
+        return [crate_path]
+    if not os.path.isdir(crate_path):
+        raise CrateRootError(f"クレートが見つかりません: {crate_path}", crate_path)
+    
+    roots = [os.path.join(crate_path, *root.split('/')) for root in CRATE_ROOTS]
+    roots = [root for root in roots if os.path.isfile(root)]
+    # src/ があればその中のルートのみ（src/lib.rs と src/main.rs の両方がある場合は両方）
+    src_roots = [root for root in roots if os.path.basename(os.path.dirname(root)) == 'src']
+    roots = src_roots or roots
+    if not roots:
+        raise CrateRootError(f"クレートのルート（src/lib.rs または src/main.rs）が見つかりません: {crate_path}", crate_path)
+    return roots
+
+
+def walk_crate(root_file: str, cache: ModuleTreeCache) -> List[CrateFile]:
+    """
+    ルートファイルから mod 宣言をたどり、クレートを構成するファイルを幅優先の順に返す
+    
+    mod name; のファイルは name.rs、name/mod.rs の順に探す（どちらもない場合は name.rs を
+    返し、抽出時に「ファイルが見つかりません」の警告になる）。#[path] 属性にも対応する。
+    """
+    crate_files = []
+    visited = set()
+    # (ファイルパス, モジュールパス, mod.rs と同じ扱いか（子モジュールを同じディレクトリに置く）)
+    queue = deque([(root_file, 'crate', True)])
+    
+    while queue:
+        file_path, module_path, owns_directory = queue.popleft()
+        key = os.path.abspath(file_path)
+        if key in visited:
+            continue
+        visited.add(key)
+        crate_file = CrateFile(file_path, module_path)
+        crate_files.append(crate_file)
+        
+        file_dir = os.path.dirname(file_path)
+        if owns_directory:
+            base_dir = file_dir
+        else:
+            base_dir = os.path.join(file_dir, Path(file_path).stem)
+        # 要素番号 -> (モジュールパス, 子モジュールのディレクトリ)
+        resolved = []
+        
+        for name, inline, path, start_line, end_line, parent in cache.modules(file_path):
+            parent_path, parent_dir = resolved[parent] if parent >= 0 else (module_path, base_dir)
+            child_path = f"{parent_path}::{name}"
+            if inline:
+                resolved.append((child_path, os.path.join(parent_dir, path or name)))
+                crate_file.inline_modules.append((start_line, end_line, child_path))
+                continue
+            resolved.append((child_path, parent_dir))
+            
+            if path is not None:
+                # インラインモジュールの外の #[path] はファイルのディレクトリ基準
+                child_file = os.path.join(file_dir if parent < 0 else parent_dir, path)
+                queue.append((os.path.normpath(child_file), child_path, True))
+                continue
+            named_file = os.path.join(parent_dir, name + '.rs')
+            mod_file = os.path.join(parent_dir, name, 'mod.rs')
+            if not os.path.isfile(named_file) and os.path.isfile(mod_file):
+                queue.append((mod_file, child_path, True))
+            else:
+                queue.append((named_file, child_path, False))
+    return crate_files
+
+
+def extract_crate_file(file_path: str, content: Optional[str] = None,
+                       crate_files: Optional[Dict[str, CrateFile]] = None,
+                       regex_backend: str = DEFAULT_REGEX_BACKEND) -> List[Dict[str, any]]:
+    """
+    1ファイルから関数情報を抽出し、モジュールパスと完全修飾名を付ける（一括処理用）
+    
+    構造体/トレイトの列は、関数を含む最も内側の impl / trait ブロックの型名・トレイト名にする。
+    """
+    crate_file = crate_files[file_path]
+    if content is None:
+        content = read_source(file_path)
+    functions = extract_rust_file(file_path, content=content, regex_backend=regex_backend)
+    blocks = owner_blocks(content) if functions else []
+    for func in functions:
+        for start_line, end_line, owner in blocks:
+            if start_line <= func['line'] <= end_line:
+                func['struct_or_trait'] = owner
+        module_path = crate_file.module_path_at(func['line'])
+        func['module_path'] = module_path
+        func['qualified_name'] = '::'.join(
+            part for part in (module_path, func['struct_or_trait'], func['name']) if part
+        )
+    return functions
+
+
+def default_cache_path(output_file: str) -> str:
+    """結果CSVのパスからキャッシュのパスを決める（result.csv -> result_modules.json）"""
+    root, _ = os.path.splitext(output_file)
+    return root + '_modules.json'
+
+
+def process_crate(crate_path: str, output_file: str = None, cache_path: Optional[str] = None,
+                  use_cache: bool = True, quiet: bool = False, error_log: str = None,
+                  normalized_dir: str = None,
+                  regex_backend: str = DEFAULT_REGEX_BACKEND) -> Tuple[int, int]:
+    """
+    クレートのモジュールツリーをたどって全ファイルを処理し、(キャッシュを再利用したファイル数,
+    読み直したファイル数) を返す
+    """
+    roots = find_crate_roots(crate_path)
+    if output_file is None:
+        output_file = str(Path(os.path.abspath(crate_path)).with_suffix('')) + '_result.csv'
+    if use_cache and cache_path is None:
+        cache_path = default_cache_path(output_file)
+    cache = ModuleTreeCache(cache_path if use_cache else None)
+    
+    crate_files = {}
+    file_paths = []
+    for root in roots:
+        for crate_file in walk_crate(root, cache):
+            if crate_file.file_path not in crate_files:
+                file_paths.append(crate_file.file_path)
+            crate_files[crate_file.file_path] = crate_file
+    cache.save()
+    
+    if not quiet:
+        print(f"モジュールツリー: {len(file_paths)}ファイル"
+              f"（キャッシュを再利用: {cache.hits}, 解析: {cache.misses}）")
+    
+    # 同じ内容のファイルでもモジュールパスが異なるため、内容による重複除去は行わない
+    extract = partial(extract_crate_file, crate_files=crate_files, regex_backend=regex_backend)
+    run_batch(file_paths, extract, CSV_HEADER, to_csv_row, output_file, '関数',
+              quiet=quiet, error_log_path=error_log, dedup=False,
+              normalized_dir=normalized_dir, dictionary_columns=DICTIONARY_COLUMNS)
+    return cache.hits, cache.misses
@@ -0,0 +1,317 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+関数/メソッド抽出の常駐プロセス（エディタ・IDEとの連携用）
+
+Unixドメインソケットで待ち受け、1行1件のJSON（JSON Lines）で要求を受け付けて1行のJSONで応答する。
+抽出モジュールの読み込みと正規表現のコンパイルは起動時に1回だけ行い、
+ファイルごとの抽出結果は更新日時とサイズが変わるまで保持する。
+
+要求:
+    {"op": "extract", "file": "<ファイルのパス>"}            1ファイルの関数/メソッド（変更がなければ保持している結果）
+    {"op": "find", "name": "<関数名>", "prefix": false, "limit": 100}
+                                                            抽出済みのファイルから関数名で検索
+    {"op": "forget", "file": "<ファイルのパス>"}             保持している結果を破棄
+    {"op": "status"}                                        保持しているファイル数・要求数
+    {"op": "stop"}                                          常駐プロセスを終了
+
+応答:
+    {"ok": true, "result": ..., "cached": true}
+    {"ok": false, "error": "<メッセージ>", "error_type": "<例外クラス名>"}
+
+クライアントは search_client.py を使う。
+"""
+
+import os
+import sys
+import json
+import stat
+import time
+import socket
+import threading
+import socketserver
+from typing import List, Dict, Optional
+
+from search_common import (
+    ExtractionError, SourceNotFoundError, UsageError, read_source, read_file_list, pop_flag, pop_option
+)
+from search_api import LANGUAGES, detect_language, extract_source
+from search_regex import resolve_backend
+from search_client import default_socket_path, request
+
+
+# find の既定の最大件数
+DEFAULT_FIND_LIMIT = 100
+
+
+class SymbolCache:
+    """
+    ファイルごとの抽出結果と、関数名からファイルへの索引を保持するクラス
+    
+    結果はファイルの絶対パスをキーに (更新日時, サイズ) とともに保持し、
+    どちらかが変わった場合のみ抽出し直す。
+    """
+    
+    def __init__(self, extract_options: Optional[Dict[str, any]] = None):
+        self.extract_options = extract_options or {}
+        # 絶対パス -> (更新日時(ナノ秒), サイズ, 抽出結果)
+        self.files = {}
+        # 関数名 -> その名前の関数を含むファイルの絶対パスの集合
+        self.names = {}
+        self.hits = 0
+        self.misses = 0
+    
+    def extract(self, file_path: str) -> tuple:
+        """(抽出結果, 保持していた結果か) を返す（失敗時は ExtractionError）"""
+        key = os.path.abspath(file_path)
+        try:
+            st = os.stat(key)
+        except OSError:
+            self.forget(key)
+            raise SourceNotFoundError(f"ファイル '{file_path}' が見つかりません。", file_path) from None
+        entry = self.files.get(key)
+        if entry is not None and entry[0] == st.st_mtime_ns and entry[1] == st.st_size:
+            self.hits += 1
+            return entry[2], True
+        
+        language = detect_language(key)
+        records = extract_source(read_source(key), key, language, **self.extract_options.get(language, {}))
+        for record in records:
+            record['language'] = language
+        self.misses += 1
+        self._unindex(key)
+        self.files[key] = (st.st_mtime_ns, st.st_size, records)
+        for record in records:
+            self.names.setdefault(record['name'], set()).add(key)
+        return records, False
+    
+    def find(self, name: str, prefix: bool = False, limit: int = DEFAULT_FIND_LIMIT) -> List[Dict[str, any]]:
+        """関数名が一致する（prefix=True の場合は前方一致する）関数をファイル・行番号順に返す"""
+        if prefix:
+            keys = set()
+            for candidate, files in self.names.items():
+                if candidate.startswith(name):
+                    keys.update(files)
+            match = lambda record: record['name'].startswith(name)
+        else:
+            keys = self.names.get(name, ())
+            match = lambda record: record['name'] == name
+        results = []
+        for key in sorted(keys):
+            results.extend(record for record in self.files[key][2] if match(record))
+            if len(results) >= limit:
+                break
+        return results[:limit]
+    
+    def forget(self, file_path: str) -> bool:
+        key = os.path.abspath(file_path)
+        self._unindex(key)
+        return self.files.pop(key, None) is not None
+    
+    def _unindex(self, key: str) -> None:
+        entry = self.files.get(key)
+        if entry is None:
+            return
+        for record in entry[2]:
+            files = self.names.get(record['name'])
+            if files is not None:
+                files.discard(key)
+                if not files:
+                    del self.names[record['name']]
+
+
+class DaemonHandler(socketserver.StreamRequestHandler):
+    """1接続分の要求を処理する（1接続で複数行の要求を送ってもよい）"""
+    
+    def handle(self):
+        try:
+            for line in self.rfile:
+                if not line.strip():
+                    continue
+                response = self.server.dispatch(line)
+                self.wfile.write(json.dumps(response, ensure_ascii=False).encode('utf-8') + b'\n')
+                self.wfile.flush()
+                if self.server.stopping:
+                    break
+        except (BrokenPipeError, ConnectionResetError):
+            # 応答の前にクライアントが切断した
+            pass
+
+
+class SearchDaemon(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    """
+    抽出結果を保持する常駐サーバー
+    
+    接続ごとにスレッドで処理する（エディタが接続を開いたままにしても他のクライアント・stop を待たせない）。
+    要求は lock で1件ずつ順に処理する（SymbolCache はスレッドセーフではない）。
+    """
+    
+    # 終了時に接続中のクライアントを待たない
+    daemon_threads = True
+    
+    def __init__(self, socket_path: str, cache: SymbolCache):
+        self.socket_path = socket_path
+        self.cache = cache
+        self.lock = threading.Lock()
+        self.requests = 0
+        self.started = time.time()
+        self.stopping = False
+        super().__init__(socket_path, DaemonHandler)
+    
+    def server_bind(self):
+        # ソケットは起動したユーザーのみが読み書きできるようにする
+        old_umask = os.umask(0o177)
+        try:
+            super().server_bind()
+        finally:
+            os.umask(old_umask)
+    
+    def dispatch(self, line: bytes) -> Dict[str, any]:
+        """1件の要求を処理して応答の辞書を返す（複数の接続から呼ばれるため lock の中で処理する）"""
+        with self.lock:
+            return self._dispatch(line)
+    
+    def _dispatch(self, line: bytes) -> Dict[str, any]:
+        self.requests += 1
+        try:
+            message = json.loads(line)
+            op = message.get('op')
+            if op == 'extract':
+                records, cached = self.cache.extract(message['file'])
+                return {'ok': True, 'result': records, 'cached': cached}
+            if op == 'find':
+                limit = int(message.get('limit', DEFAULT_FIND_LIMIT))
+                return {'ok': True, 'result': self.cache.find(message['name'], bool(message.get('prefix')), limit)}
+            if op == 'forget':
+                return {'ok': True, 'result': self.cache.forget(message['file'])}
+            if op == 'status':
+                return {'ok': True, 'result': self.status()}
+            if op == 'stop':
+                # shutdown() は serve_forever() のループの終了を待つため、別スレッドから呼ぶ
+                self.stopping = True
+                threading.Thread(target=self.shutdown, daemon=True).start()
+                return {'ok': True, 'result': 'stopping'}
+            raise UsageError(f"不明な要求です: {op}")
+        except ExtractionError as e:
+            return {'ok': False, 'error': str(e), 'error_type': type(e).__name__}
+        except (ValueError, KeyError, TypeError, AttributeError) as e:
+            return {'ok': False, 'error': f"要求の形式が不正です: {e}", 'error_type': 'RequestError'}
+    
+    def status(self) -> Dict[str, any]:
+        return {
+            'pid': os.getpid(),
+            'socket': self.socket_path,
+            'uptime': round(time.time() - self.started, 1),
+            'requests': self.requests,
+            'files': len(self.cache.files),
+            'names': len(self.cache.names),
+            'cache_hits': self.cache.hits,
+            'cache_misses': self.cache.misses,
+        }
+
+
+def warm_up(extract_options: Dict[str, Dict[str, any]]) -> None:
+    """全言語の抽出モジュールを読み込み、定義パターンをコンパイルしておく"""
+    samples = {'javascript': 'a.js', 'java': 'A.java', 'rust': 'a.rs'}
+    for language in LANGUAGES:
+        extract_source('', samples.get(language, 'a'), language, **extract_options.get(language, {}))
+
+
+def prepare_socket(socket_path: str) -> None:
+    """
+    既存のソケットが応答する場合はエラー、接続を拒否する（前回の異常終了で残った）場合は削除する
+    
+    ソケット以外のファイルは削除せずエラーにする。応答が遅い（タイムアウトした）場合は
+    処理中の常駐プロセスがあるものとしてエラーにする。
+    """
+    try:
+        mode = os.lstat(socket_path).st_mode
+    except FileNotFoundError:
+        return
+    except OSError as e:
+        raise UsageError(f"ソケットのパスを確認できません: {socket_path}: {e}") from None
+    if not stat.S_ISSOCK(mode):
+        raise UsageError(f"ソケットではないファイルがあります（削除しません）: {socket_path}")
+    try:
+        request({'op': 'status'}, socket_path, timeout=1.0)
+    except (ConnectionRefusedError, FileNotFoundError):
+        os.unlink(socket_path)
+        return
+    except socket.timeout:
+        raise UsageError(f"常駐プロセスはすでに起動しています（応答待ち）: {socket_path}") from None
+    except OSError as e:
+        raise UsageError(f"既存のソケットに接続できません: {socket_path}: {e}") from None
+    raise UsageError(f"常駐プロセスはすでに起動しています: {socket_path}")
+
+
+def serve(socket_path: str, file_list: Optional[str] = None, quiet: bool = False,
+          extract_options: Optional[Dict[str, Dict[str, any]]] = None) -> None:
+    """常駐プロセスを起動し、stop の要求を受けるまで待ち受ける"""
+    if not hasattr(socket, 'AF_UNIX'):
+        raise UsageError("この環境ではUnixドメインソケットを利用できません。")
+    extract_options = extract_options or {}
+    cache = SymbolCache(extract_options)
+    warm_up(extract_options)
+    
+    # 一覧CSVのファイルを先に抽出しておく（find の対象になる）
+    if file_list is not None:
+        loaded = 0
+        for file_path in read_file_list(file_list):
+            try:
+                cache.extract(file_path)
+                loaded += 1
+            except ExtractionError as e:
+                if not quiet:
+                    print(f"警告: {e}", file=sys.stderr)
+        if not quiet:
+            print(f"{loaded}ファイルを読み込みました（{len(cache.names)}個の名前）")
+    
+    prepare_socket(socket_path)
+    server = SearchDaemon(socket_path, cache)
+    if not quiet:
+        print(f"待ち受けを開始しました: {socket_path} (pid {os.getpid()})")
+    try:
+        server.serve_forever(poll_interval=0.2)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        try:
+            os.unlink(socket_path)
+        except OSError:
+            pass
+    if not quiet:
+        print("常駐プロセスを終了しました。")
+
+
+def main():
+    """メイン関数"""
+    args = sys.argv[1:]
+    if '--help' in args or '-h' in args:
+        print("使用方法:")
+        print("  python search_daemon.py [--socket <ソケットのパス>] [--list <一覧CSVファイルのパス>]")
+        print("                          [--regex-backend re|regex|re2|auto] [--minified skip|cap|full] [--quiet]")
+        print("")
+        print(f"ソケットの既定のパス: {default_socket_path()}")
+        print("クライアント: python search_client.py extract <ファイル> / find <関数名> / status / stop")
+        sys.exit(1)
+    
+    try:
+        socket_path = pop_option(args, '--socket') or default_socket_path()
+        file_list = pop_option(args, '--list')
+        quiet = pop_flag(args, '--quiet')
+        regex_backend = resolve_backend(pop_option(args, '--regex-backend'))
+        extract_options = {language: {'regex_backend': regex_backend} for language in ('javascript', 'java', 'rust')}
+        minified_policy = pop_option(args, '--minified')
+        if minified_policy is not None:
+            extract_options['javascript']['minified_policy'] = minified_policy
+        if args:
+            raise UsageError(f"不明な引数です: {' '.join(args)}")
+        serve(socket_path, file_list, quiet=quiet, extract_options=extract_options)
+    except ExtractionError as e:
+        print(f"エラー: {e}")
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
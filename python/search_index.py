@@ -0,0 +1,662 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+結果CSVの関数名/メソッド名のトライグラム索引（--build-index / --search / --list ... --index）
+
+名前の一部（「…ValidateOrder…」など）から関数/メソッドを探すため、結果CSVの名前の列を
+3文字ずつの組（トライグラム）に分け、トライグラムごとにそれを含む名前の一覧（ポスティングリスト）を持つ。
+検索ではパターンのトライグラムのポスティングリストの積集合を候補とし、候補の名前だけを照合する。
+
+索引は1つのバイナリファイルで、mmap で読み込む（全体をメモリに展開しない）。
+
+    先頭       マジック（SYMIDX01）、メタデータ（JSON）の長さ（4バイト）、メタデータ
+    本体       メタデータの sections に記録した配列（8バイト境界から。ネイティブのバイト順）
+        name_blob / name_offsets       名前（UTF-8。末尾に改行）を連結したものと、各名前の開始位置
+        file_blob / file_offsets       ファイルパス
+        row_name / row_file / row_line / row_language / row_type
+                                       結果CSVの各行の名前ID・ファイルID・行番号・言語・型
+        name_row_offsets / name_rows   名前IDごとの行（結果CSVの順）
+        trigram_keys / trigram_offsets / postings
+                                       小文字にした名前のトライグラム（昇順）と、それを含む名前IDの一覧
+
+トライグラムは小文字にした名前から作るため、大文字・小文字を区別する検索でも同じ索引を使う。
+"""
+
+import os
+import re
+import csv
+import sys
+import json
+import mmap
+import time
+import difflib
+from array import array
+from bisect import bisect_left
+from collections import Counter
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from search_common import (
+    ExtractionError, OutputError, UsageError, DECOMPRESSION_ERRORS, open_text, split_compression,
+    pop_flag, pop_option
+)
+from search_api import EXTENSIONS
+
+
+MAGIC = b'SYMIDX01'
+FORMAT_VERSION = 1
+# 名前の列（結果CSVの種類によって列名が異なる）
+NAME_COLUMNS = ('関数名', 'メソッド名')
+# 検索の種類（substring: 部分一致（* ? ^ $ を使える）、regex: 正規表現、fuzzy: あいまい検索）
+SEARCH_MODES = ('substring', 'regex', 'fuzzy')
+# --search の既定の最大件数
+DEFAULT_SEARCH_LIMIT = 100
+# あいまい検索で、パターンのトライグラムのうち名前に含まれる割合の下限
+FUZZY_MIN_SCORE = 0.5
+# 積集合を求めるポスティングリストの数（短い順。残りのトライグラムは候補の照合で確かめる）
+MAX_INTERSECTED_POSTINGS = 3
+# 最も短いポスティングリストが名前の 1/FULL_SCAN_RATIO 以上を含む場合は絞り込まずに全ての名前を照合する
+FULL_SCAN_RATIO = 16
+# 配列の型（名前ID・行番号などは 'I'、トライグラムは3文字のコードポイントを21ビットずつ並べた 'Q'）
+ID_TYPECODE = 'I'
+KEY_TYPECODE = 'Q'
+
+
+class IndexFormatError(ExtractionError):
+    """索引ファイルを読み込めない（形式の不一致や破損）"""
+
+
+def default_index_path(output_file: str) -> str:
+    """結果CSVのパスから索引のパスを決める（result.csv / result.csv.gz -> result_index.bin）"""
+    root, _ = os.path.splitext(split_compression(output_file)[0])
+    return root + '_index.bin'
+
+
+def trigram_keys(text: str) -> Set[int]:
+    """文字列のトライグラムの集合（各トライグラムは3文字のコードポイントを並べた整数）"""
+    codes = [ord(char) for char in text]
+    return {(codes[i] << 42) | (codes[i + 1] << 21) | codes[i + 2] for i in range(len(codes) - 2)}
+
+
+def _language_of(file_path: str) -> str:
+    """言語の列がない結果CSV（search.py など）での言語（拡張子から判定。不明な場合は空欄）"""
+    return EXTENSIONS.get(os.path.splitext(file_path)[1].lower(), '')
+
+
+def build_index(csv_path: str, index_path: Optional[str] = None) -> Dict[str, int]:
+    """
+    結果CSVから索引を作成し、件数（rows / names / files / trigrams）を返す（省略時は default_index_path()）
+    
+    名前の列（関数名またはメソッド名）、ファイル、行番号、型の列を使う。言語の列がない場合は
+    ファイルの拡張子から言語を決める。索引は一時ファイルに出力してから置き換える。
+    """
+    if index_path is None:
+        index_path = default_index_path(csv_path)
+    names = {}
+    files = {}
+    languages = {}
+    types = {}
+    rows = {column: array(ID_TYPECODE) for column in ('row_name', 'row_file', 'row_line', 'row_language', 'row_type')}
+    try:
+        with open_text(csv_path, 'r', encoding='utf-8-sig', newline='') as f:
+            reader = csv.reader(f)
+            header = next(reader, None) or []
+            name_index = next((header.index(column) for column in NAME_COLUMNS if column in header), None)
+            if name_index is None or 'ファイル' not in header or '行番号' not in header:
+                raise UsageError(f"結果CSVに関数名（メソッド名）・ファイル・行番号の列がありません: {csv_path}")
+            file_index = header.index('ファイル')
+            line_index = header.index('行番号')
+            language_index = header.index('言語') if '言語' in header else None
+            type_index = header.index('型') if '型' in header else None
+            for row in reader:
+                if len(row) != len(header):
+                    continue
+                file_path = row[file_index]
+                file_id = files.setdefault(file_path, len(files))
+                language = row[language_index] if language_index is not None else _language_of(file_path)
+                rows['row_name'].append(names.setdefault(row[name_index], len(names)))
+                rows['row_file'].append(file_id)
+                rows['row_line'].append(int(row[line_index]) if row[line_index].isdigit() else 0)
+                rows['row_language'].append(languages.setdefault(language, len(languages)))
+                rows['row_type'].append(types.setdefault(row[type_index] if type_index is not None else '', len(types)))
+            source = os.stat(csv_path)
+    except FileNotFoundError:
+        raise ExtractionError(f"結果CSVが見つかりません: {csv_path}", csv_path) from None
+    except (OSError, UnicodeDecodeError, csv.Error) + DECOMPRESSION_ERRORS as e:
+        raise ExtractionError(f"結果CSVを読み込めません: {csv_path}: {e}", csv_path) from e
+    
+    # 名前ごとの行（行IDの昇順）
+    row_counts = [0] * (len(names) + 1)
+    for name_id in rows['row_name']:
+        row_counts[name_id + 1] += 1
+    name_row_offsets = array(ID_TYPECODE, row_counts)
+    for name_id in range(len(names)):
+        name_row_offsets[name_id + 1] += name_row_offsets[name_id]
+    name_rows = array(ID_TYPECODE, bytes(name_row_offsets[-1] * name_row_offsets.itemsize))
+    positions = name_row_offsets[:-1]
+    for row_id, name_id in enumerate(rows['row_name']):
+        name_rows[positions[name_id]] = row_id
+        positions[name_id] += 1
+    
+    # トライグラム -> 名前IDの一覧（名前IDの順に追加するため昇順になる）
+    postings_by_key = {}
+    for name_id, name in enumerate(names):
+        for key in trigram_keys(name.lower()):
+            posting = postings_by_key.get(key)
+            if posting is None:
+                posting = postings_by_key[key] = array(ID_TYPECODE)
+            posting.append(name_id)
+    keys = array(KEY_TYPECODE, sorted(postings_by_key))
+    trigram_offsets = array(ID_TYPECODE, [0])
+    postings = array(ID_TYPECODE)
+    for key in keys:
+        postings.extend(postings_by_key[key])
+        trigram_offsets.append(len(postings))
+    del postings_by_key
+    
+    name_blob, name_offsets = _pack_strings(names)
+    file_blob, file_offsets = _pack_strings(files)
+    sections = dict(rows, name_blob=name_blob, name_offsets=name_offsets, file_blob=file_blob,
+                    file_offsets=file_offsets, name_row_offsets=name_row_offsets, name_rows=name_rows,
+                    trigram_keys=keys, trigram_offsets=trigram_offsets, postings=postings)
+    counts = {'rows': len(rows['row_name']), 'names': len(names), 'files': len(files), 'trigrams': len(keys)}
+    metadata = {
+        'format': FORMAT_VERSION,
+        'byteorder': sys.byteorder,
+        'source': {'path': os.path.abspath(csv_path), 'size': source.st_size, 'mtime_ns': source.st_mtime_ns},
+        'languages': list(languages),
+        'types': list(types),
+        'counts': counts,
+        'sections': {},
+    }
+    _write_index(index_path, metadata, sections)
+    return counts
+
+
+def _pack_strings(values: Iterable[str]) -> Tuple[bytes, array]:
+    """
+    文字列を UTF-8 で連結したものと、各文字列の開始位置（末尾に全体の長さ）
+    
+    各文字列の後には改行を置く（全ての名前を照合する場合に、全体を一度に復号して分割できる）。
+    """
+    encoded = [value.encode('utf-8') + b'\n' for value in values]
+    offsets = array(ID_TYPECODE, [0])
+    total = 0
+    for data in encoded:
+        total += len(data)
+        offsets.append(total)
+    return b''.join(encoded), offsets
+
+
+def _align(offset: int) -> int:
+    return (offset + 7) // 8 * 8
+
+
+def _write_index(index_path: str, metadata: Dict[str, any], sections: Dict[str, any]) -> None:
+    """配列を8バイト境界に並べ、位置をメタデータに記録して出力する"""
+    offset = 0
+    for name, values in sections.items():
+        typecode = values.typecode if isinstance(values, array) else 'B'
+        metadata['sections'][name] = [offset, len(values), typecode]
+        offset = _align(offset + len(values) * (values.itemsize if isinstance(values, array) else 1))
+    encoded = json.dumps(metadata, ensure_ascii=False).encode('utf-8')
+    head = MAGIC + len(encoded).to_bytes(4, 'little') + encoded
+    temp_path = index_path + '.tmp'
+    try:
+        with open(temp_path, 'wb') as f:
+            f.write(head + bytes(_align(len(head)) - len(head)))
+            position = 0
+            for name, values in sections.items():
+                start = metadata['sections'][name][0]
+                f.write(bytes(start - position))
+                data = values.tobytes() if isinstance(values, array) else values
+                f.write(data)
+                position = start + len(data)
+        os.replace(temp_path, index_path)
+    except OSError as e:
+        raise OutputError(f"索引の出力に失敗しました: {index_path}: {e}", index_path) from e
+
+
+class SymbolIndex:
+    """
+    mmap で読み込んだ索引（search() で検索する）
+    
+    with 文で使うか、使い終わったら close() を呼ぶこと。
+    """
+    
+    def __init__(self, index_path: str):
+        self.path = index_path
+        try:
+            with open(index_path, 'rb') as f:
+                self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except FileNotFoundError:
+            raise IndexFormatError(f"索引が見つかりません: {index_path}", index_path) from None
+        except (OSError, ValueError) as e:
+            raise IndexFormatError(f"索引を読み込めません: {index_path}: {e}", index_path) from e
+        self._views = []
+        try:
+            self._load()
+        except (ValueError, KeyError, TypeError, IndexError) as e:
+            self.close()
+            raise IndexFormatError(f"索引の形式が正しくありません: {index_path}: {e}", index_path) from e
+        except IndexFormatError:
+            self.close()
+            raise
+    
+    def _load(self) -> None:
+        data = memoryview(self._mmap)
+        self._views.append(data)
+        if bytes(data[:len(MAGIC)]) != MAGIC:
+            raise IndexFormatError(f"索引ファイルではありません: {self.path}", self.path)
+        length = int.from_bytes(data[len(MAGIC):len(MAGIC) + 4], 'little')
+        head_end = len(MAGIC) + 4 + length
+        self.metadata = json.loads(bytes(data[len(MAGIC) + 4:head_end]).decode('utf-8'))
+        if self.metadata.get('format') != FORMAT_VERSION:
+            raise IndexFormatError(f"対応していない形式の索引です: {self.path}", self.path)
+        if self.metadata['byteorder'] != sys.byteorder:
+            raise IndexFormatError(f"バイト順の異なる環境で作成された索引です（作り直してください）: {self.path}", self.path)
+        base = _align(head_end)
+        for name, (offset, count, typecode) in self.metadata['sections'].items():
+            itemsize = array(typecode).itemsize
+            view = data[base + offset:base + offset + count * itemsize]
+            if len(view) != count * itemsize:
+                raise ValueError(f"{name} が途中で切れています")
+            if typecode != 'B':
+                view = view.cast(typecode)
+            self._views.append(view)
+            setattr(self, name, view)
+        self.languages = self.metadata['languages']
+        self.types = self.metadata['types']
+    
+    def close(self) -> None:
+        for view in reversed(self._views):
+            view.release()
+        self._views = []
+        try:
+            self._mmap.close()
+        except BufferError:
+            # 呼び出し側が posting() の結果を保持している（参照がなくなった時点で解放される）
+            pass
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, *exc_info):
+        self.close()
+    
+    def is_stale(self) -> bool:
+        """索引の作成後に元の結果CSVが更新・削除されたか"""
+        source = self.metadata['source']
+        try:
+            stat = os.stat(source['path'])
+        except OSError:
+            return True
+        return stat.st_size != source['size'] or stat.st_mtime_ns != source['mtime_ns']
+    
+    def name(self, name_id: int) -> str:
+        return bytes(self.name_blob[self.name_offsets[name_id]:self.name_offsets[name_id + 1] - 1]).decode('utf-8')
+    
+    def file(self, file_id: int) -> str:
+        return bytes(self.file_blob[self.file_offsets[file_id]:self.file_offsets[file_id + 1] - 1]).decode('utf-8')
+    
+    def all_names(self, lowercase: bool = False) -> List[str]:
+        """名前IDの順の全ての名前（lowercase=True の場合は小文字にしたもの）"""
+        return self._name_text(lowercase).split('\n')[:-1]
+    
+    def _name_text(self, lowercase: bool) -> str:
+        text = bytes(self.name_blob).decode('utf-8')
+        return text.lower() if lowercase else text
+    
+    def scan_names(self, name_pattern: 'NamePattern') -> List[int]:
+        """
+        全ての名前を照合し、一致する名前IDの一覧を返す（3文字未満のパターンなど、候補を絞り込めない場合）
+        
+        パターンに line_regex がある場合は、改行で区切った名前の全体を一度に検索する（名前ごとに照合しない）。
+        """
+        if name_pattern.line_regex is None:
+            return [name_id for name_id, name in enumerate(self.all_names(name_pattern.lowercase))
+                    if name_pattern.match(name)]
+        text = self._name_text(name_pattern.lowercase)
+        name_ids = []
+        name_id = 0
+        position = 0
+        for match in name_pattern.line_regex.finditer(text):
+            name_id += text.count('\n', position, match.start())
+            position = match.start()
+            if not name_ids or name_ids[-1] != name_id:
+                name_ids.append(name_id)
+        return name_ids
+    
+    def posting(self, key: int) -> Optional[memoryview]:
+        """トライグラムを含む名前IDの一覧（昇順。トライグラムが索引にない場合は None）"""
+        position = bisect_left(self.trigram_keys, key)
+        if position == len(self.trigram_keys) or self.trigram_keys[position] != key:
+            return None
+        return self.postings[self.trigram_offsets[position]:self.trigram_offsets[position + 1]]
+    
+    def candidates(self, literals: Iterable[str]) -> Optional[List[int]]:
+        """
+        literals（小文字にした、名前に必ず含まれる文字列）の全トライグラムを含む名前IDの一覧
+        
+        トライグラムが1つもない（3文字未満の）場合や、絞り込めない場合は None（全ての名前が候補）。
+        """
+        keys = set()
+        for literal in literals:
+            keys |= trigram_keys(literal)
+        if not keys:
+            return None
+        postings = []
+        for key in keys:
+            posting = self.posting(key)
+            if posting is None:
+                return []
+            postings.append(posting)
+        # 短いポスティングリストから順に絞り込む（残りのリストは二分探索で調べる）。
+        # 長いリストでの絞り込みは候補の照合より遅いため、MAX_INTERSECTED_POSTINGS 個までにする
+        postings.sort(key=len)
+        if len(postings[0]) * FULL_SCAN_RATIO > len(self.name_offsets) - 1:
+            # 最も短いリストでも名前の多くを含む場合は、全ての名前を照合する方が速い
+            return None
+        result = postings[0].tolist()
+        for posting in postings[1:MAX_INTERSECTED_POSTINGS]:
+            result = [name_id for name_id in result if _contains(posting, name_id)]
+            if not result:
+                break
+        return result
+    
+    def search(self, pattern: str, mode: str = 'substring', case_sensitive: bool = False,
+               language: Optional[str] = None, symbol_type: Optional[str] = None,
+               file_prefix: Optional[str] = None, limit: int = DEFAULT_SEARCH_LIMIT) -> Tuple[List[Dict[str, any]], int]:
+        """
+        名前がパターンに一致する関数/メソッドを探し、(結果の辞書のリスト, 一致した件数) を返す
+        
+        mode が substring の場合は部分一致（* は任意の文字列、? は任意の1文字、先頭の ^ / 末尾の $ は
+        名前の先頭・末尾に一致）、regex の場合は正規表現、fuzzy の場合はパターンのトライグラムを多く含む順。
+        結果は結果CSVの順（fuzzy の場合は一致度の高い順）に最大 limit 件で、辞書は
+        name / file / line / language / type（fuzzy の場合は score も）を持つ。
+        language / symbol_type / file_prefix を指定した場合はその言語・型・ファイルパスの前方一致に絞る。
+        """
+        if mode not in SEARCH_MODES:
+            raise UsageError(f"検索の種類は {' / '.join(SEARCH_MODES)} のいずれかです: {mode}")
+        if not pattern:
+            raise UsageError("検索するパターンを指定してください。")
+        if mode == 'fuzzy':
+            scores = self._fuzzy_scores(pattern, case_sensitive)
+        else:
+            name_pattern = compile_pattern(pattern, mode, case_sensitive)
+            name_ids = self.candidates(name_pattern.literals)
+            if name_ids is None:
+                name_ids = self.scan_names(name_pattern)
+            else:
+                convert = str.lower if name_pattern.lowercase else str
+                name_ids = [name_id for name_id in name_ids if name_pattern.match(convert(self.name(name_id)))]
+            scores = dict.fromkeys(name_ids)
+        
+        accept = self._row_filter(language, symbol_type, file_prefix)
+        matched = []
+        for name_id in scores:
+            row_ids = self.name_rows[self.name_row_offsets[name_id]:self.name_row_offsets[name_id + 1]]
+            matched.extend(row_ids if accept is None else filter(accept, row_ids))
+        if mode == 'fuzzy':
+            matched.sort(key=lambda row_id: (-scores[self.row_name[row_id]], row_id))
+        else:
+            matched.sort()
+        
+        results = []
+        for row_id in matched[:limit]:
+            name_id = self.row_name[row_id]
+            result = {
+                'name': self.name(name_id),
+                'file': self.file(self.row_file[row_id]),
+                'line': self.row_line[row_id],
+                'language': self.languages[self.row_language[row_id]],
+                'type': self.types[self.row_type[row_id]],
+            }
+            if mode == 'fuzzy':
+                result['score'] = round(scores[name_id], 3)
+            results.append(result)
+        return results, len(matched)
+    
+    def _fuzzy_scores(self, pattern: str, case_sensitive: bool) -> Dict[int, float]:
+        """パターンのトライグラムのうち FUZZY_MIN_SCORE 以上を含む名前ID -> 一致度"""
+        query = pattern if case_sensitive else pattern.lower()
+        keys = trigram_keys(pattern.lower())
+        if not keys:
+            # 3文字未満のパターンは部分一致で探す
+            return {name_id: 1.0 for name_id, name in enumerate(self.all_names(not case_sensitive)) if query in name}
+        shared = Counter()
+        for key in keys:
+            posting = self.posting(key)
+            if posting is not None:
+                shared.update(posting)
+        scores = {}
+        for name_id, count in shared.items():
+            if count / len(keys) < FUZZY_MIN_SCORE:
+                continue
+            name = self.name(name_id)
+            # 含むトライグラムの割合が同じ場合は、名前全体の類似度が高い方を先にする
+            similarity = difflib.SequenceMatcher(None, query, name if case_sensitive else name.lower()).ratio()
+            scores[name_id] = count / len(keys) * 0.9 + similarity * 0.1
+        return scores
+    
+    def _row_filter(self, language: Optional[str], symbol_type: Optional[str], file_prefix: Optional[str]):
+        """言語・型・ファイルパスの条件で行IDを絞り込む関数（条件がない場合は None）"""
+        conditions = []
+        if language is not None:
+            ids = {index for index, value in enumerate(self.languages) if value.lower() == language.lower()}
+            conditions.append(lambda row_id: self.row_language[row_id] in ids)
+        if symbol_type is not None:
+            ids = {index for index, value in enumerate(self.types) if value == symbol_type}
+            conditions.append(lambda row_id: self.row_type[row_id] in ids)
+        if file_prefix is not None:
+            # 相対パスは絶対パスにしても比べる（末尾の区切り文字は残す）
+            absolute = os.path.abspath(file_prefix)
+            if file_prefix.endswith(os.sep) and not absolute.endswith(os.sep):
+                absolute += os.sep
+            prefixes = (file_prefix, absolute)
+            accepted_files = {}
+            
+            def accept_file(row_id):
+                file_id = self.row_file[row_id]
+                accepted = accepted_files.get(file_id)
+                if accepted is None:
+                    accepted = accepted_files[file_id] = self.file(file_id).startswith(prefixes)
+                return accepted
+            
+            conditions.append(accept_file)
+        if not conditions:
+            return None
+        if len(conditions) == 1:
+            return conditions[0]
+        return lambda row_id: all(condition(row_id) for condition in conditions)
+
+
+def _contains(posting: memoryview, value: int) -> bool:
+    position = bisect_left(posting, value)
+    return position < len(posting) and posting[position] == value
+
+
+class NamePattern:
+    """名前の検索パターン（compile_pattern() で作る）"""
+    
+    def __init__(self, match, literals: List[str], lowercase: bool = False, line_regex=None):
+        # 名前を照合する関数（lowercase=True の場合は小文字にした名前を渡す）
+        self.match = match
+        # 一致する名前に必ず含まれる文字列（小文字。トライグラムの候補の絞り込みに使う）
+        self.literals = literals
+        self.lowercase = lowercase
+        # 改行で区切った名前の全体から一致する名前を探す正規表現（改行をまたいで一致しないもの。ない場合は None）
+        self.line_regex = line_regex
+
+
+def compile_pattern(pattern: str, mode: str = 'substring', case_sensitive: bool = False) -> NamePattern:
+    """--search のパターンを NamePattern にする（mode は substring か regex）"""
+    if mode == 'regex':
+        try:
+            regex = re.compile(pattern, 0 if case_sensitive else re.IGNORECASE)
+        except re.error as e:
+            raise UsageError(f"正規表現が正しくありません: {pattern}: {e}") from None
+        return NamePattern(regex.search, [literal.lower() for literal in required_literals(pattern)])
+    
+    body = pattern
+    anchored_start = body.startswith('^')
+    anchored_end = body.endswith('$') and len(body) > int(anchored_start)
+    body = body[int(anchored_start):len(body) - int(anchored_end)]
+    literals = [part.lower() for part in re.split(r'[*?]', body) if part]
+    if not anchored_start and not anchored_end and '*' not in body and '?' not in body:
+        query = body if case_sensitive else body.lower()
+        return NamePattern(lambda name: query in name, literals, lowercase=not case_sensitive,
+                           line_regex=re.compile(re.escape(query)))
+    # 名前に改行は含まれないため、. と .* は改行をまたがず、^ / $ は MULTILINE で名前の先頭・末尾に一致する
+    expression = ''.join('.*' if char == '*' else '.' if char == '?' else re.escape(char) for char in body)
+    regex = re.compile(('^' if anchored_start else '') + expression + ('$' if anchored_end else ''),
+                       re.MULTILINE | (0 if case_sensitive else re.IGNORECASE))
+    return NamePattern(regex.search, literals, line_regex=regex)
+
+
+# 正規表現のエスケープ（\xhh / \uhhhh / \Uhhhhhhhh / \N{名前} / 8進数・後方参照の数字 / 1文字）
+_ESCAPE = re.compile(r'\\(x[0-9a-fA-F]{2}|u[0-9a-fA-F]{4}|U[0-9a-fA-F]{8}|N\{[^}]*\}|[0-9]{1,3}|.)', re.DOTALL)
+# 1文字を表すエスケープ（\d \w \b などの文字クラス・位置のエスケープは含めない）
+_CHAR_ESCAPES = {'n': '\n', 't': '\t', 'r': '\r', 'f': '\f', 'v': '\v', 'a': '\a'}
+
+
+def required_literals(pattern: str) -> List[str]:
+    """
+    正規表現に一致する文字列が必ず含む文字列（連続した通常の文字）のリスト
+    
+    確実に必要と分かるものだけを返す（| を含むパターンでは空、グループ・文字クラスの中は調べない）。
+    直後に * ? { がある文字は省略できるため含めない。
+    """
+    if '|' in pattern.replace('\\|', ''):
+        return []
+    literals = []
+    current = []
+    depth = 0
+    index = 0
+    
+    def flush():
+        if current:
+            literals.append(''.join(current))
+            current.clear()
+    
+    while index < len(pattern):
+        char = pattern[index]
+        if char == '\\' and index + 1 < len(pattern):
+            # エスケープ全体（\x5f、\u005f、\N{...}、後方参照の数字など）をまとめて読む
+            match = _ESCAPE.match(pattern, index)
+            index = match.end()
+            escaped = match.group(1)
+            if escaped[0] in 'xuU' and len(escaped) > 1:
+                escaped = chr(int(escaped[1:], 16))
+            elif escaped in _CHAR_ESCAPES:
+                escaped = _CHAR_ESCAPES[escaped]
+            # 英数字のエスケープは、\x70 のように文字コードで書いた文字の場合のみ通常の文字とみなす
+            if depth == 0 and len(escaped) == 1 and (not escaped.isalnum() or escaped != match.group(1)):
+                current.append(escaped)
+            else:
+                flush()
+            continue
+        index += 1
+        if char in '*?{':
+            if current:
+                current.pop()
+            flush()
+            if char == '{':
+                # 繰り返しの回数（{2} / {1,3}）を読み飛ばす
+                end = pattern.find('}', index)
+                index = end + 1 if end >= 0 else len(pattern)
+        elif char == '+':
+            flush()
+        elif char == '(':
+            depth += 1
+            flush()
+        elif char == ')':
+            depth = max(0, depth - 1)
+            flush()
+        elif char == '[':
+            flush()
+            # 文字クラスの終わりまで読み飛ばす（先頭の ] と \] は文字クラスの文字）
+            if index < len(pattern) and pattern[index] == '^':
+                index += 1
+            if index < len(pattern) and pattern[index] == ']':
+                index += 1
+            while index < len(pattern) and pattern[index] != ']':
+                index += 2 if pattern[index] == '\\' else 1
+            index += 1
+        elif char in '.^$' or depth > 0:
+            flush()
+        else:
+            current.append(char)
+    flush()
+    return literals
+
+
+def print_results(results: List[Dict[str, any]], total: int, elapsed: float) -> None:
+    """検索結果を「ファイル:行番号  名前  (言語, 型)」の形式で表示する"""
+    for result in results:
+        details = ', '.join(value for value in (result['language'], result['type']) if value)
+        score = f"  一致度 {result['score']:.2f}" if 'score' in result else ''
+        print(f"{result['file']}:{result['line']}  {result['name']}" + (f"  ({details})" if details else '') + score)
+    shown = f"（うち {len(results)}件を表示）" if len(results) < total else ''
+    if results:
+        print()
+    print(f"{total}件{shown} 検索時間: {elapsed * 1000:.1f}ミリ秒")
+
+
+def run_index_command(args: List[str]) -> None:
+    """
+    --build-index / --search の処理（各スクリプトの run() から呼び出す。args[0] がモード）
+    
+    --build-index <結果CSV> [索引ファイル]
+    --search <パターン> <索引ファイルまたは結果CSV> [--regex | --fuzzy] [--case-sensitive]
+             [--language <言語>] [--type <型>] [--file-prefix <パス>] [--limit <件数>]
+    結果CSVを指定した場合は default_index_path() の索引を使う（ない場合は作成する）。
+    """
+    if args[0] == '--build-index':
+        if len(args) < 2:
+            raise UsageError("索引を作成する結果CSVを指定してください（--build-index <結果CSV> [索引ファイル]）。")
+        index_path = args[2] if len(args) > 2 else default_index_path(args[1])
+        start = time.monotonic()
+        counts = build_index(args[1], index_path)
+        print_index_summary(index_path, counts, time.monotonic() - start)
+        return
+    
+    mode = 'regex' if pop_flag(args, '--regex') else 'substring'
+    if pop_flag(args, '--fuzzy'):
+        if mode == 'regex':
+            raise UsageError("--regex と --fuzzy は同時に指定できません。")
+        mode = 'fuzzy'
+    case_sensitive = pop_flag(args, '--case-sensitive')
+    language = pop_option(args, '--language')
+    symbol_type = pop_option(args, '--type')
+    file_prefix = pop_option(args, '--file-prefix')
+    limit = pop_option(args, '--limit')
+    try:
+        limit = int(limit) if limit is not None else DEFAULT_SEARCH_LIMIT
+    except ValueError:
+        raise UsageError(f"--limit には件数を指定してください: {limit}") from None
+    if len(args) < 3:
+        raise UsageError("検索するパターンと索引ファイル（または結果CSV）を指定してください"
+                         "（--search <パターン> <索引ファイルまたは結果CSV>）。")
+    pattern, index_path = args[1], args[2]
+    if split_compression(index_path)[0].lower().endswith('.csv'):
+        csv_path, index_path = index_path, default_index_path(index_path)
+        if not os.path.exists(index_path):
+            start = time.monotonic()
+            counts = build_index(csv_path, index_path)
+            print_index_summary(index_path, counts, time.monotonic() - start)
+            print()
+    
+    with SymbolIndex(index_path) as index:
+        if index.is_stale():
+            print(f"警告: 索引の作成後に結果CSVが更新されています（--build-index で作り直してください）: "
+                  f"{index.metadata['source']['path']}")
+        start = time.perf_counter()
+        results, total = index.search(pattern, mode, case_sensitive=case_sensitive, language=language,
+                                      symbol_type=symbol_type, file_prefix=file_prefix, limit=limit)
+        print_results(results, total, time.perf_counter() - start)
+
+
+def print_index_summary(index_path: str, counts: Dict[str, int], elapsed: float) -> None:
+    print(f"索引を出力しました: {index_path} ({counts['rows']}行, 名前 {counts['names']}種類, "
+          f"トライグラム {counts['trigrams']}種類, {os.path.getsize(index_path) / (1024 * 1024):.1f}MB, "
+          f"{elapsed:.1f}秒)")
@@ -0,0 +1,159 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+一覧CSVモードの結果を正規化形式（辞書符号化）で出力・復元する処理
+
+結果CSVの各行は同じファイルの絶対パスや同じクラス名・型名を繰り返し含むため、
+正規化形式では次の表に分けて出力し、各行には整数IDだけを持たせる。
+
+    files.csv     ファイルの表（ID, ファイルパス, サイズ, ハッシュ）
+    names.csv     文字列の表（ID, 文字列）。クラス名・型などの列の値を1回ずつ保持する
+    symbols.csv   関数/メソッドの表。ファイル列は files.csv のID、
+                  辞書符号化する列は names.csv のIDに置き換える
+    manifest.json 元の結果CSVの列と、置き換えた列の情報
+
+inflate_normalized() で元の結果CSVと同じ内容に復元できる。
+"""
+
+import os
+import csv
+import json
+from typing import Iterable, List, Tuple
+
+from search_common import ExtractionError, OutputError, write_csv
+
+
+FILES_CSV = 'files.csv'
+NAMES_CSV = 'names.csv'
+SYMBOLS_CSV = 'symbols.csv'
+MANIFEST_JSON = 'manifest.json'
+FORMAT_VERSION = 1
+
+FILES_HEADER = ['ID', 'ファイルパス', 'サイズ', 'ハッシュ']
+NAMES_HEADER = ['ID', '文字列']
+
+
+class NormalizedFormatError(ExtractionError):
+    """正規化形式の出力を読み込めない（ファイルの欠落や形式の不一致）"""
+
+
+def write_normalized(output_dir: str, header: List[str], rows: Iterable[List],
+                     files: List[Tuple[str, int, str]], file_column: str = 'ファイル',
+                     dictionary_columns: Iterable[str] = ()) -> None:
+    """
+    結果CSVの行を正規化形式で output_dir に出力する
+    
+    files は処理したファイルの (ファイルパス, サイズ, ハッシュ) のリスト（並び順がファイルIDになる）。
+    rows のファイル列の値は files のファイルパスのいずれかであること。
+    dictionary_columns の列の値は names.csv に1回ずつ出力し、IDに置き換える。
+    """
+    try:
+        os.makedirs(output_dir, exist_ok=True)
+    except OSError as e:
+        raise OutputError(f"出力先のディレクトリを作成できません: {output_dir}: {e}", output_dir) from e
+    
+    file_index = header.index(file_column)
+    dictionary_columns = list(dictionary_columns)
+    dictionary_indexes = [header.index(column) for column in dictionary_columns]
+    file_ids = {path: file_id for file_id, (path, _, _) in enumerate(files)}
+    # 文字列 -> ID（挿入順がIDの順になる）
+    names = {}
+    
+    def encode(rows):
+        for row in rows:
+            row[file_index] = file_ids[row[file_index]]
+            for index in dictionary_indexes:
+                value = row[index]
+                if value is None:
+                    value = ''
+                name_id = names.get(value)
+                if name_id is None:
+                    name_id = names[value] = len(names)
+                row[index] = name_id
+            yield row
+    
+    symbols_header = list(header)
+    symbols_header[file_index] = file_column + 'ID'
+    for index in dictionary_indexes:
+        symbols_header[index] = header[index] + 'ID'
+    
+    write_csv(os.path.join(output_dir, SYMBOLS_CSV), symbols_header, encode(rows))
+    write_csv(os.path.join(output_dir, NAMES_CSV), NAMES_HEADER,
+              ((name_id, value) for value, name_id in names.items()))
+    write_csv(os.path.join(output_dir, FILES_CSV), FILES_HEADER,
+              ((file_id, path, size, digest) for file_id, (path, size, digest) in enumerate(files)))
+    
+    manifest = {
+        'format': FORMAT_VERSION,
+        'header': header,
+        'file_column': file_column,
+        'dictionary_columns': dictionary_columns,
+        'files': len(files),
+        'names': len(names),
+    }
+    manifest_path = os.path.join(output_dir, MANIFEST_JSON)
+    try:
+        with open(manifest_path, 'w', encoding='utf-8') as f:
+            json.dump(manifest, f, ensure_ascii=False, indent=2)
+    except OSError as e:
+        raise OutputError(f"manifest.json の出力に失敗しました: {e}", manifest_path) from e
+
+
+def _read_table(path: str) -> List[str]:
+    """files.csv / names.csv を読み込み、ID順の値のリストを返す（ファイルパス・文字列の列）"""
+    values = []
+    with open(path, 'r', newline='', encoding='utf-8-sig') as f:
+        reader = csv.reader(f)
+        next(reader, None)
+        for row in reader:
+            if int(row[0]) != len(values):
+                raise NormalizedFormatError(f"IDが連番ではありません: {path}: {row[0]}", path)
+            values.append(row[1])
+    return values
+
+
+def inflate_normalized(input_dir: str, output_file: str) -> int:
+    """正規化形式の出力から元の形式の結果CSVを復元し、行数を返す"""
+    manifest_path = os.path.join(input_dir, MANIFEST_JSON)
+    try:
+        with open(manifest_path, 'r', encoding='utf-8') as f:
+            manifest = json.load(f)
+        if manifest.get('format') != FORMAT_VERSION:
+            raise NormalizedFormatError(f"対応していない形式です: {manifest_path}", manifest_path)
+        header = manifest['header']
+        file_index = header.index(manifest['file_column'])
+        dictionary_indexes = [header.index(column) for column in manifest['dictionary_columns']]
+        files = _read_table(os.path.join(input_dir, FILES_CSV))
+        names = _read_table(os.path.join(input_dir, NAMES_CSV))
+        symbols = open(os.path.join(input_dir, SYMBOLS_CSV), 'r', newline='', encoding='utf-8-sig')
+    except FileNotFoundError as e:
+        raise NormalizedFormatError(f"正規化形式のファイルが見つかりません: {e.filename}", input_dir) from None
+    except (OSError, ValueError, KeyError, UnicodeDecodeError, csv.Error) as e:
+        raise NormalizedFormatError(f"正規化形式のファイルを読み込めません: {input_dir}: {e}", input_dir) from e
+    
+    count = 0
+    
+    def decode(reader):
+        nonlocal count
+        next(reader, None)
+        for row in reader:
+            row[file_index] = files[int(row[file_index])]
+            for index in dictionary_indexes:
+                row[index] = names[int(row[index])]
+            count += 1
+            yield row
+    
+    with symbols:
+        try:
+            write_csv(output_file, header, decode(csv.reader(symbols)))
+        except (ValueError, IndexError, csv.Error) as e:
+            raise NormalizedFormatError(f"symbols.csv の内容が不正です: {e}", input_dir) from e
+    return count
+
+
+def inflate_to_csv(input_dir: str, output_file: str = None) -> None:
+    """--inflate の処理: 正規化形式の出力を結果CSVに復元して結果を表示（省略時は <ディレクトリ名>.csv に出力）"""
+    if output_file is None:
+        output_file = os.path.normpath(input_dir) + '.csv'
+    count = inflate_normalized(input_dir, output_file)
+    print(f"正規化形式の出力を復元しました: {input_dir} -> {output_file} ({count}行)")
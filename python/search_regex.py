@@ -0,0 +1,226 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+関数/メソッド定義パターンの正規表現エンジン（バックエンド）の切り替え
+
+各抽出クラスの定義パターン（FUNCTION_PATTERNS / METHOD_PATTERNS）は標準の re でコンパイルしてあり、
+re 以外のバックエンドを指定した場合はそのパターン文字列を指定のエンジンでコンパイルし直して使う。
+
+    re     標準ライブラリ（バックトラック型。既定）
+    regex  サードパーティの regex モジュール
+    re2    RE2（google-re2。入力長に対して線形時間で照合する）
+    auto   re2、regex、re の順にインストールされているものを使う
+
+どのバックエンドでも抽出結果が re と同じになるよう、次のように扱う。
+- \\w \\s \\d は re（Unicode）と同じ文字の集合を明示した文字クラスに置き換える
+  （regex / RE2 ではこれらの文字クラスの定義が re と異なるため）。
+- \\b \\B や後方参照など、置き換えで同じ意味にできない構文を含むパターン、
+  およびバックエンドがコンパイルできないパターンは re のまま使う。
+"""
+
+import re
+import sys
+from functools import lru_cache
+from typing import Dict, List, Optional, Tuple, Union
+
+from search_common import UsageError
+
+
+REGEX_BACKENDS = ('re', 'regex', 're2', 'auto')
+DEFAULT_REGEX_BACKEND = 're'
+# auto の場合に試す順（線形時間のエンジンを優先）
+_AUTO_ORDER = ('re2', 'regex')
+
+# 置き換えで同じ意味にできないエスケープ（単語境界、文字列末尾、後方参照）
+_UNSUPPORTED_ESCAPES = frozenset('bBZ123456789')
+# 先頭の \b が結果に影響しないパターン（\b\w+ で始まり、単語以外の文字のエスケープで終わる）
+_REDUNDANT_LEADING_BOUNDARY = re.compile(r'\\b\(?\\w\+.*\\[^\w\\]$', re.DOTALL)
+_INLINE_FLAGS = ((re.IGNORECASE, 'i'), (re.MULTILINE, 'm'), (re.DOTALL, 's'))
+
+
+def _import_backend(name: str):
+    """バックエンドのモジュールを読み込む（インストールされていない場合は None）"""
+    try:
+        if name == 'regex':
+            import regex
+            return regex
+        if name == 're2':
+            import re2
+            return re2
+    except ImportError:
+        return None
+    return re
+
+
+def available_backends() -> List[str]:
+    """インストールされているバックエンド（re は常に含む）"""
+    return ['re'] + [name for name in ('regex', 're2') if _import_backend(name) is not None]
+
+
+def resolve_backend(name: Optional[str]) -> str:
+    """バックエンド名を検証し、auto をインストールされているバックエンドに置き換える"""
+    if name is None:
+        return DEFAULT_REGEX_BACKEND
+    if name not in REGEX_BACKENDS:
+        raise UsageError(f"正規表現のバックエンドは {' / '.join(REGEX_BACKENDS)} のいずれかです: {name}")
+    if name == 'auto':
+        for candidate in _AUTO_ORDER:
+            if _import_backend(candidate) is not None:
+                return candidate
+        return 're'
+    if _import_backend(name) is None:
+        raise UsageError(f"正規表現のバックエンド '{name}' はインストールされていません"
+                         f"（pip install {'google-re2' if name == 're2' else name}）。")
+    return name
+
+
+@lru_cache(maxsize=None)
+def _class_ranges(escape: str, backend: str) -> str:
+    """
+    re の \\w / \\s / \\d と同じ文字の集合を、文字クラスの中身（範囲の並び）として返す
+    
+    実行中の Python の Unicode データベースから求める（re の定義: \\w は str.isalnum() と '_'、
+    \\s は str.isspace()、\\d は str.isdecimal()）。
+    """
+    if escape == 'w':
+        test = _is_word_char
+    elif escape == 's':
+        test = str.isspace
+    else:
+        test = str.isdecimal
+    parts = []
+    start = None
+    for code in range(sys.maxunicode + 2):
+        if code <= sys.maxunicode and not 0xD800 <= code <= 0xDFFF and test(chr(code)):
+            if start is None:
+                start = code
+            continue
+        if start is not None:
+            parts.append(_class_char(start, backend) if start == code - 1
+                         else _class_char(start, backend) + '-' + _class_char(code - 1, backend))
+            start = None
+    return ''.join(parts)
+
+
+def _is_word_char(char: str) -> bool:
+    return char.isalnum() or char == '_'
+
+
+def _class_char(code: int, backend: str) -> str:
+    """文字クラスの中に置く1文字（記号・制御文字はバックエンドの書式でエスケープする）"""
+    char = chr(code)
+    if char.isalnum() or char == '_':
+        return char
+    if backend == 're2':
+        return f'\\x{{{code:x}}}'
+    return f'\\U{code:08x}'
+
+
+def translate(pattern: str, backend: str) -> Optional[str]:
+    """
+    re のパターンを regex / RE2 で同じ意味になるパターンに書き換える
+    
+    \\w \\s \\d（と否定形）を明示した文字クラスに置き換える。同じ意味にできない構文を含む場合は None。
+    """
+    out = []
+    in_class = False
+    i = 0
+    if _REDUNDANT_LEADING_BOUNDARY.match(pattern):
+        # 先頭の \b の直後が \w+ で始まり、末尾が単語以外の文字の場合、\b を除いても
+        # 最も左のマッチ（search / finditer の結果）は変わらない
+        # （単語の途中から始まるマッチがあれば、その単語の先頭から始まるマッチもある）
+        i = 2
+    while i < len(pattern):
+        char = pattern[i]
+        if char == '\\' and i + 1 < len(pattern):
+            escape = pattern[i + 1]
+            i += 2
+            if escape in _UNSUPPORTED_ESCAPES:
+                return None
+            if escape in 'wsd':
+                ranges = _class_ranges(escape, backend)
+                out.append(ranges if in_class else f'[{ranges}]')
+            elif escape in 'WSD':
+                if in_class:
+                    return None
+                out.append(f'[^{_class_ranges(escape.lower(), backend)}]')
+            else:
+                out.append('\\' + escape)
+            continue
+        if in_class:
+            if char == ']' and pattern[i - 1] != '[' and pattern[i - 2:i] != '[^':
+                in_class = False
+        elif char == '[':
+            in_class = True
+        elif pattern.startswith('(?P=', i) or pattern.startswith('(?<', i) and not pattern.startswith('(?<P', i):
+            # 名前付き後方参照・後読み
+            return None
+        out.append(char)
+        i += 1
+    return ''.join(out)
+
+
+@lru_cache(maxsize=None)
+def _compile(pattern: str, flags: int, backend: str):
+    """pattern を backend でコンパイルする（できない場合は re でコンパイルしたものを返す）"""
+    if backend != 're':
+        translated = translate(pattern, backend)
+        if translated is not None:
+            prefix = ''.join(letter for flag, letter in _INLINE_FLAGS if flags & flag)
+            if prefix:
+                translated = f'(?{prefix})' + translated
+            module = _import_backend(backend)
+            try:
+                if backend == 're2':
+                    options = module.Options()
+                    # 大きな Unicode の文字クラスで DFA のメモリが不足しないようにする
+                    options.max_mem = 64 << 20
+                    return module.compile(translated, options)
+                return module.compile(translated)
+            except Exception:
+                pass
+    return re.compile(pattern, flags)
+
+
+def compile_patterns(patterns: List[Tuple[re.Pattern, str]], backend: str) -> List[Tuple[object, str]]:
+    """
+    (re でコンパイルしたパターン, 種別) のリストを backend でコンパイルし直したリストを返す
+    
+    コンパイル結果はパターンとバックエンドごとに保持し、ファイルごとにコンパイルし直さない。
+    """
+    if backend == 're':
+        return patterns
+    return [(_compile(pattern.pattern, pattern.flags, backend), kind) for pattern, kind in patterns]
+
+
+def filter_patterns(patterns: List[Tuple[object, str]], anchors: Dict[str, Tuple[Union[str, Tuple[str, ...]], ...]],
+                    content: str) -> List[Tuple[object, str]]:
+    """
+    content にマッチし得るパターンだけを返す（順序は変えない）
+    
+    anchors は 種別 -> そのパターンのマッチに必ず含まれる文字列（アンカー）の並び。
+    アンカーがタプルの場合はそのいずれかが含まれればよい。アンカーが1つでも content に含まれない
+    パターンはマッチし得ないため、正規表現を実行せずに除く。各アンカーの有無は1回だけ調べる。
+    """
+    present = {}
+    
+    def contains(literal: str) -> bool:
+        found = present.get(literal)
+        if found is None:
+            found = present[literal] = literal in content
+        return found
+    
+    selected = []
+    for pattern, kind in patterns:
+        if all(any(contains(literal) for literal in ((anchor,) if isinstance(anchor, str) else anchor))
+               for anchor in anchors.get(kind, ())):
+            selected.append((pattern, kind))
+    return selected
+
+
+def backend_of(compiled) -> str:
+    """コンパイル済みパターンのバックエンド名（re にフォールバックしたパターンの確認用）"""
+    module = type(compiled).__module__.split('.')[0]
+    if module in ('re', '_sre'):
+        return 're'
+    return module.lstrip('_')
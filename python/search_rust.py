@@ -4,112 +4,150 @@
 Rustファイルから関数の名称、引数、ファイル名、行番号を取得するスクリプト
 """
 
+import os
 import re
 import sys
-import csv
-from typing import List, Dict
+from functools import partial
+from typing import List, Dict, Optional, Tuple
 from pathlib import Path
 
+from search_common import (
+    ExtractionError, UsageError, LineIndex, BodySpans, FINGERPRINT_MODES, C_COMMENTS, read_source, read_file_list, write_csv, write_json, split_params, pop_flag, pop_option
+)
+from search_batch import run_batch, parse_shard, parse_workers, resolve_executor
+from search_api import language_extensions
+from search_normalized import inflate_to_csv
+from search_index import run_index_command, default_index_path
+from search_regex import DEFAULT_REGEX_BACKEND, resolve_backend, compile_patterns, filter_patterns
+
+
+# Rustの予約語・キーワード（関数名として誤検出しないように）
+RUST_KEYWORDS = frozenset({
+    'if', 'else', 'for', 'while', 'loop', 'match', 'if let', 'while let',
+    'let', 'mut', 'const', 'static', 'fn', 'struct', 'enum', 'impl',
+    'trait', 'mod', 'use', 'pub', 'self', 'Self', 'super', 'crate',
+    'return', 'break', 'continue', 'async', 'await', 'move', 'ref',
+    'true', 'false', 'Some', 'None', 'Ok', 'Err', 'Box', 'Vec', 'String'
+})
+
+# 関数定義パターン（モジュール読み込み時に一度だけコンパイルし、全ファイルで共有する）
+# パターン2（implブロック内のメソッド）とパターン3（トレイトメソッド）は同じ正規表現で、
+# 判定は前後の文脈で行う
+# 引数リストはタプルやクロージャの型など1段階までの括弧の入れ子を含む
+# 戻り値の型は配列型 [T; N] 以外の ; をまたがない（本体のない宣言 fn f(); が後続の関数を巻き込まないように）
+_FN_SIGNATURE = r'fn\s+(\w+)\s*\(([^()]*(?:\([^()]*\)[^()]*)*)\)\s*(?:->\s*((?:[^{;\[]|\[[^\]]*\])+?))?\s*\{'
+_METHOD_PATTERN = re.compile(_FN_SIGNATURE, re.MULTILINE)
+FUNCTION_PATTERNS = [
+    # パターン4: 非同期関数
+    (re.compile(r'(?:pub\s+(?:\([^)]+\)\s+)?)?async\s+' + _FN_SIGNATURE, re.MULTILINE), 'async_function'),
+    # パターン5: 不変関数
+    (re.compile(r'(?:pub\s+(?:\([^)]+\)\s+)?)?const\s+' + _FN_SIGNATURE, re.MULTILINE), 'const_function'),
+    # パターン6: 外部関数
+    (re.compile(r'extern\s+"[^"]+"\s+' + _FN_SIGNATURE, re.MULTILINE), 'extern_function'),
+    # パターン1: 通常の関数（pub fn または fn）
+    (re.compile(r'(?:pub\s+(?:\([^)]+\)\s+)?)?' + _FN_SIGNATURE, re.MULTILINE), 'function'),
+    # パターン2: implブロック内のメソッド
+    (_METHOD_PATTERN, 'method'),
+    # パターン3: トレイトメソッド（デフォルト実装あり）
+    (_METHOD_PATTERN, 'trait_method'),
+]
+
+# 各パターンのマッチに必ず含まれる文字列（search_regex.filter_patterns）
+# 含まれないパターンは実行せず、fn を含まないファイルは解析自体を省く
+# （const と fn、extern と ABI 文字列の間には任意の空白を置けるため、別々に調べる）
+PATTERN_ANCHORS = {
+    'async_function': ('async', 'fn'),
+    'const_function': ('const', 'fn'),
+    'extern_function': ('extern', '"', 'fn'),
+    'function': ('fn',),
+    'method': ('fn',),
+    'trait_method': ('fn',),
+}
+
+_STRUCT_NAME = re.compile(r'struct\s+(\w+)')
+_TRAIT_NAME = re.compile(r'trait\s+(\w+)')
+_IMPL_TARGET = re.compile(r'impl\s+(?:([\w<>:]+)\s+for\s+)?([\w<>:]+)')
+_PRECEDED_BY_MEMBER_ACCESS = re.compile(r'[a-zA-Z_]\w*\.\s*$')
+_PRECEDED_BY_MACRO_BANG = re.compile(r'!\s*$')
+_PUB_FN = re.compile(r'\bpub\s+(?:\([^)]+\)\s+)?fn\b')
+_PUB_RESTRICTED = re.compile(r'pub\s*\(([^)]+)\)')
+
+# 文字列リテラル（raw文字列・バイト文字列を含む）・文字リテラルとコメント（関数本体の範囲の検出で除外する）
+# 文字リテラルは1文字分のみとし、ライフタイム 'a とは区別する（ブロックコメントの入れ子には未対応）
+LITERAL_PATTERN = re.compile(
+    C_COMMENTS + r'|b?r(#*)"[\s\S]*?"\1|b?"[^"\\]*(?:\\[\s\S][^"\\]*)*"'
+    r'|b?\'(?:\\(?:u\{[0-9a-fA-F_]*\}|x[0-9a-fA-F]{2}|[\s\S])|[^\'\\\n])\''
+)
+
+# CSV出力の列
+CSV_HEADER = ['ファイル', '行番号', '終了行', '行数', '構造体/トレイト', '型', '可視性', '戻り値の型', '関数名', '引数']
+# 正規化形式（--normalized）で辞書符号化する列（値の種類が少なく繰り返しの多い列）
+DICTIONARY_COLUMNS = ['構造体/トレイト', '型', '可視性', '戻り値の型']
+
+
+def to_csv_row(func: Dict[str, any]) -> List:
+    """関数情報をCSVの1行に変換"""
+    params_str = ', '.join(func['parameters']) if func['parameters'] else ''
+    return [
+        func['file'],
+        func['line'],
+        func['end_line'],
+        func['line_count'],
+        func['struct_or_trait'],
+        func['type'],
+        func['visibility'],
+        func['return_type'],
+        func['name'],
+        params_str
+    ]
+
 
 class RustFunctionExtractor:
     """Rustファイルから関数情報を抽出するクラス"""
     
-    def __init__(self, file_path: str):
+    def __init__(self, file_path: str, content: Optional[str] = None,
+                 regex_backend: str = DEFAULT_REGEX_BACKEND, fingerprint: Optional[str] = None):
         self.file_path = Path(file_path)
-        self.content = ""
-        
-    def read_file(self, raise_on_error: bool = True) -> None:
-        """ファイルを読み込む"""
-        try:
-            with open(self.file_path, 'r', encoding='utf-8') as f:
-                self.content = f.read()
-        except FileNotFoundError:
-            error_msg = f"エラー: ファイル '{self.file_path}' が見つかりません。"
-            if raise_on_error:
-                print(error_msg)
-                sys.exit(1)
-            else:
-                raise FileNotFoundError(error_msg)
-        except Exception as e:
-            error_msg = f"エラー: ファイルの読み込みに失敗しました: {e}"
-            if raise_on_error:
-                print(error_msg)
-                sys.exit(1)
-            else:
-                raise
+        # content を指定した場合はファイルを読み込まずにその内容を解析する
+        self.content = content if content is not None else ""
+        self._loaded = content is not None
+        # 関数定義パターンの正規表現エンジン（search_regex）
+        self.regex_backend = resolve_backend(regex_backend)
+        if fingerprint is not None and fingerprint not in FINGERPRINT_MODES:
+            raise UsageError(f"関数本体の指紋の種類は {' / '.join(FINGERPRINT_MODES)} のいずれかです: {fingerprint}")
+        # 関数本体の指紋（search_common.body_fingerprint）の種類。None の場合は求めない
+        self.fingerprint = fingerprint
+    
+    def read_file(self) -> None:
+        """ファイルを読み込む（失敗時は SourceNotFoundError / SourceReadError を送出）"""
+        self.content = read_source(self.file_path)
+        self._loaded = True
     
     def extract_functions(self) -> List[Dict[str, any]]:
         """関数定義を抽出"""
+        patterns = filter_patterns(compile_patterns(FUNCTION_PATTERNS, self.regex_backend), PATTERN_ANCHORS,
+                                   self.content)
+        if not patterns:
+            return []
         functions = []
         
-        # Rustの予約語・キーワード（関数名として誤検出しないように）
-        rust_keywords = {
-            'if', 'else', 'for', 'while', 'loop', 'match', 'if let', 'while let',
-            'let', 'mut', 'const', 'static', 'fn', 'struct', 'enum', 'impl',
-            'trait', 'mod', 'use', 'pub', 'self', 'Self', 'super', 'crate',
-            'return', 'break', 'continue', 'async', 'await', 'move', 'ref',
-            'true', 'false', 'Some', 'None', 'Ok', 'Err', 'Box', 'Vec', 'String'
-        }
-        
         # 構造体名、トレイト名、impl対象の型名を抽出
-        struct_match = re.search(r'struct\s+(\w+)', self.content)
+        struct_match = _STRUCT_NAME.search(self.content)
         struct_name = struct_match.group(1) if struct_match else None
         
-        trait_match = re.search(r'trait\s+(\w+)', self.content)
+        trait_match = _TRAIT_NAME.search(self.content)
         trait_name = trait_match.group(1) if trait_match else None
         
         # implブロックの対象型を抽出（簡易版）
-        impl_matches = re.finditer(r'impl\s+(?:([\w<>:]+)\s+for\s+)?([\w<>:]+)', self.content)
+        impl_matches = _IMPL_TARGET.finditer(self.content)
         impl_types = []
         for match in impl_matches:
             impl_type = match.group(2) if match.group(2) else match.group(1)
             if impl_type:
                 impl_types.append(impl_type.split('<')[0])  # ジェネリクス除去
         
-        # パターン1: 通常の関数（pub fn または fn）
-        pattern1 = re.compile(
-            r'(?:pub\s+(?:\([^)]+\)\s+)?)?fn\s+(\w+)\s*\(([^)]*)\)\s*(?:->\s*([^{]+?))?\s*\{',
-            re.MULTILINE
-        )
-        
-        # パターン2: implブロック内のメソッド
-        pattern2 = re.compile(
-            r'fn\s+(\w+)\s*\(([^)]*)\)\s*(?:->\s*([^{]+?))?\s*\{',
-            re.MULTILINE
-        )
-        
-        # パターン3: トレイトメソッド（デフォルト実装あり）
-        pattern3 = re.compile(
-            r'fn\s+(\w+)\s*\(([^)]*)\)\s*(?:->\s*([^{]+?))?\s*\{',
-            re.MULTILINE
-        )
-        
-        # パターン4: 非同期関数
-        pattern4 = re.compile(
-            r'(?:pub\s+(?:\([^)]+\)\s+)?)?async\s+fn\s+(\w+)\s*\(([^)]*)\)\s*(?:->\s*([^{]+?))?\s*\{',
-            re.MULTILINE
-        )
-        
-        # パターン5: 不変関数
-        pattern5 = re.compile(
-            r'(?:pub\s+(?:\([^)]+\)\s+)?)?const\s+fn\s+(\w+)\s*\(([^)]*)\)\s*(?:->\s*([^{]+?))?\s*\{',
-            re.MULTILINE
-        )
-        
-        # パターン6: 外部関数
-        pattern6 = re.compile(
-            r'extern\s+"[^"]+"\s+fn\s+(\w+)\s*\(([^)]*)\)\s*(?:->\s*([^{]+?))?\s*\{',
-            re.MULTILINE
-        )
-        
-        patterns = [
-            (pattern4, 'async_function'),
-            (pattern5, 'const_function'),
-            (pattern6, 'extern_function'),
-            (pattern1, 'function'),
-            (pattern2, 'method'),
-            (pattern3, 'trait_method')
-        ]
+        line_index = LineIndex(self.content)
+        spans = BodySpans(self.content, LITERAL_PATTERN, line_index, self.fingerprint, RUST_KEYWORDS)
         
         for pattern, func_type in patterns:
             for match in pattern.finditer(self.content):
@@ -118,18 +156,17 @@ class RustFunctionExtractor:
                 return_type = match.group(3).strip() if match.group(3) else None
                 
                 # キーワードチェック
-                if func_name in rust_keywords:
+                if func_name in RUST_KEYWORDS:
                     continue
                 
                 # 前後の文字列を確認して、関数定義かどうかを判定
                 start_pos = match.start()
+                # implブロック内かどうかを確認
+                is_in_impl = False
+                is_in_trait = False
                 if start_pos > 0:
                     before_text = self.content[max(0, start_pos - 100):start_pos]
                     
-                    # implブロック内かどうかを確認
-                    is_in_impl = False
-                    is_in_trait = False
-                    
                     # implブロック内のメソッドかどうか
                     if func_type == 'method':
                         # 前のimplブロックを探す
@@ -148,11 +185,11 @@ class RustFunctionExtractor:
                                 is_in_trait = True
                     
                     # 関数呼び出しの可能性をチェック
-                    if re.search(r'[a-zA-Z_]\w*\.\s*$', before_text):
+                    if _PRECEDED_BY_MEMBER_ACCESS.search(before_text):
                         continue
                     
                     # マクロ呼び出しの可能性をチェック
-                    if re.search(r'!\s*$', before_text):
+                    if _PRECEDED_BY_MACRO_BANG.search(before_text):
                         continue
                 
                 # 引数を解析
@@ -160,26 +197,8 @@ class RustFunctionExtractor:
                 if params_str:
                     # Rustの引数は "name: Type" の形式
                     # セルフ参照（&self, &mut self, self）を特別に処理
-                    param_list = []
-                    depth = 0
-                    current_param = ""
-                    
-                    for char in params_str:
-                        if char == '<':
-                            depth += 1
-                            current_param += char
-                        elif char == '>':
-                            depth -= 1
-                            current_param += char
-                        elif char == ',' and depth == 0:
-                            if current_param.strip():
-                                param_list.append(current_param.strip())
-                            current_param = ""
-                        else:
-                            current_param += char
-                    
-                    if current_param.strip():
-                        param_list.append(current_param.strip())
+                    # ジェネリクス、タプル、クロージャの型（Fn(A, B) -> C）内のカンマでは分割しない
+                    param_list = split_params(params_str)
                     
                     for param in param_list:
                         if not param:
@@ -194,8 +213,9 @@ class RustFunctionExtractor:
                             # セルフ参照など
                             params.append(param)
                 
-                # 関数定義の行番号を取得
-                line_num = self.content[:match.start()].count('\n') + 1
+                # 関数定義の行番号と、本体の終了行・行数を取得
+                line_num = line_index.line(match.start())
+                end_line, line_count = spans.span(match.end(1), line_num)
                 
                 # 可視性を抽出
                 visibility = ''
@@ -203,14 +223,11 @@ class RustFunctionExtractor:
                 func_context_start = max(0, func_start - 200)
                 func_context = self.content[func_context_start:func_start]
                 
-                if re.search(r'\bpub\s+(?:\([^)]+\)\s+)?fn\b', func_context):
-                    if re.search(r'pub\s*\([^)]+\)', func_context):
+                if _PUB_FN.search(func_context):
+                    pub_match = _PUB_RESTRICTED.search(func_context)
+                    if pub_match:
                         # pub(crate) などの形式
-                        pub_match = re.search(r'pub\s*\(([^)]+)\)', func_context)
-                        if pub_match:
-                            visibility = f"pub({pub_match.group(1)})"
-                        else:
-                            visibility = 'pub'
+                        visibility = f"pub({pub_match.group(1)})"
                     else:
                         visibility = 'pub'
                 
@@ -221,7 +238,7 @@ class RustFunctionExtractor:
                     impl_start = self.content.rfind('impl', 0, start_pos)
                     if impl_start != -1:
                         impl_text = self.content[impl_start:start_pos]
-                        impl_type_match = re.search(r'impl\s+(?:([\w<>:]+)\s+for\s+)?([\w<>:]+)', impl_text)
+                        impl_type_match = _IMPL_TARGET.search(impl_text)
                         if impl_type_match:
                             struct_or_trait = impl_type_match.group(2) or impl_type_match.group(1)
                             if struct_or_trait:
@@ -238,8 +255,12 @@ class RustFunctionExtractor:
                     'visibility': visibility,
                     'struct_or_trait': struct_or_trait or '',
                     'file': str(self.file_path),
-                    'line': line_num
+                    'line': line_num,
+                    'end_line': end_line,
+                    'line_count': line_count
                 })
+                if self.fingerprint:
+                    functions[-1]['body_hash'], functions[-1]['body_tokens'] = spans.fingerprint(match.end(1))
         
         # 重複を除去（同じ関数が複数のパターンでマッチする場合）
         seen = {}
@@ -266,9 +287,10 @@ class RustFunctionExtractor:
         
         return unique_functions
     
-    def extract(self, raise_on_error: bool = True) -> List[Dict[str, any]]:
+    def extract(self) -> List[Dict[str, any]]:
         """関数情報を抽出して返す"""
-        self.read_file(raise_on_error=raise_on_error)
+        if not self._loaded:
+            self.read_file()
         return self.extract_functions()
     
     def print_results(self, functions: List[Dict[str, any]]) -> None:
@@ -291,6 +313,8 @@ class RustFunctionExtractor:
             if func['visibility']:
                 print(f"  可視性: {func['visibility']}")
             print(f"  行番号: {func['line']}")
+            if func['end_line'] is not None:
+                print(f"  終了行: {func['end_line']}（{func['line_count']}行）")
             
             if func['parameters']:
                 print(f"  引数: {', '.join(func['parameters'])}")
@@ -299,81 +323,31 @@ class RustFunctionExtractor:
             
             print()
     
-    def export_to_csv(self, functions: List[Dict[str, any]], output_file: str = None) -> None:
-        """結果をCSV形式で出力"""
+    def export_to_csv(self, functions: List[Dict[str, any]], output_file: str = None) -> Optional[str]:
+        """結果をCSV形式で出力し、出力先のパスを返す（関数がない場合は出力せず None）"""
         if output_file is None:
             output_file = str(self.file_path.with_suffix('.csv'))
         
         if not functions:
-            print("関数が見つかりませんでした。")
-            return
+            return None
         
-        try:
-            with open(output_file, 'w', newline='', encoding='utf-8-sig') as f:
-                writer = csv.writer(f)
-                # ヘッダー行
-                writer.writerow(['ファイル', '行番号', '構造体/トレイト', '型', '可視性', '戻り値の型', '関数名', '引数'])
-                
-                # データ行
-                for func in functions:
-                    params_str = ', '.join(func['parameters']) if func['parameters'] else ''
-                    writer.writerow([
-                        func['file'],
-                        func['line'],
-                        func['struct_or_trait'],
-                        func['type'],
-                        func['visibility'],
-                        func['return_type'],
-                        func['name'],
-                        params_str
-                    ])
-            
-            print(f"CSVファイルを出力しました: {output_file}")
-        except Exception as e:
-            print(f"エラー: CSVファイルの出力に失敗しました: {e}")
-            sys.exit(1)
+        write_csv(output_file, CSV_HEADER, (to_csv_row(func) for func in functions))
+        return output_file
 
 
-def read_file_list(list_csv_path: str) -> List[str]:
-    """一覧CSVファイルからファイルパスのリストを読み込む（絶対パス対応）"""
-    file_paths = []
-    try:
-        with open(list_csv_path, 'r', encoding='utf-8-sig') as f:
-            reader = csv.reader(f)
-            first_row = True
-            for row in reader:
-                if not row or not row[0].strip():
-                    continue
-                
-                file_path = row[0].strip()
-                
-                # 最初の行がヘッダー行の可能性をチェック
-                if first_row:
-                    header_keywords = ['ファイル', 'ファイルパス', 'file', 'filepath', 'path', 'ファイル名']
-                    if file_path.lower() in [kw.lower() for kw in header_keywords]:
-                        first_row = False
-                        continue
-                    first_row = False
-                
-                # 絶対パスの場合はそのまま使用
-                if Path(file_path).is_absolute():
-                    file_paths.append(file_path)
-                else:
-                    # 相対パスの場合は一覧CSVファイルのディレクトリ基準で解決
-                    base_dir = Path(list_csv_path).parent
-                    resolved_path = str(base_dir / file_path)
-                    file_paths.append(resolved_path)
-        
-        return file_paths
-    except FileNotFoundError:
-        print(f"エラー: 一覧CSVファイル '{list_csv_path}' が見つかりません。")
-        sys.exit(1)
-    except Exception as e:
-        print(f"エラー: 一覧CSVファイルの読み込みに失敗しました: {e}")
-        sys.exit(1)
+def extract_file(file_path: str, content: Optional[str] = None,
+                 regex_backend: str = DEFAULT_REGEX_BACKEND) -> List[Dict[str, any]]:
+    """1ファイルから関数情報を抽出（一括処理用。content を指定した場合はファイルを読み込まない）"""
+    return RustFunctionExtractor(file_path, content=content, regex_backend=regex_backend).extract()
 
 
-def process_multiple_files(list_csv_path: str, output_file: str = None) -> None:
+def process_multiple_files(list_csv_path: str, output_file: str = None,
+                           quiet: bool = False, error_log: str = None,
+                           dedup: bool = True, normalized_dir: str = None,
+                           regex_backend: str = DEFAULT_REGEX_BACKEND,
+                           shard: Optional[Tuple[int, int]] = None,
+                           resume: bool = False, journal: bool = True,
+                           workers: int = 1, executor_kind: str = 'auto', index: bool = False) -> None:
     """一覧CSVファイルに記載された複数ファイルを処理"""
     file_paths = read_file_list(list_csv_path)
     
@@ -381,110 +355,179 @@ def process_multiple_files(list_csv_path: str, output_file: str = None) -> None:
         print("一覧CSVファイルにファイルパスが記載されていません。")
         return
     
-    print(f"処理対象ファイル数: {len(file_paths)}")
-    
-    all_functions = []
-    processed_count = 0
-    error_count = 0
-    
-    for file_path in file_paths:
-        file_path_obj = Path(file_path)
-        if not file_path_obj.exists():
-            print(f"警告: ファイルが見つかりません: {file_path}")
-            error_count += 1
-            continue
-        
-        if not file_path_obj.is_file():
-            print(f"警告: ファイルではありません: {file_path}")
-            error_count += 1
-            continue
-        
-        try:
-            extractor = RustFunctionExtractor(file_path)
-            functions = extractor.extract(raise_on_error=False)
-            all_functions.extend(functions)
-            processed_count += 1
-            print(f"処理完了: {file_path} ({len(functions)}個の関数を検出)")
-        except Exception as e:
-            print(f"エラー: {file_path} の処理に失敗しました: {e}")
-            error_count += 1
-            continue
-    
-    print(f"\n処理完了: {processed_count}ファイル, エラー: {error_count}ファイル")
-    print(f"合計 {len(all_functions)}個の関数を検出しました。")
-    
     # 結果をCSVに出力
     if output_file is None:
         output_file = str(Path(list_csv_path).with_suffix('')) + '_result.csv'
     
-    try:
-        with open(output_file, 'w', newline='', encoding='utf-8-sig') as f:
-            writer = csv.writer(f)
-            # ヘッダー行
-            writer.writerow(['ファイル', '行番号', '構造体/トレイト', '型', '可視性', '戻り値の型', '関数名', '引数'])
-            
-            # データ行
-            for func in all_functions:
-                params_str = ', '.join(func['parameters']) if func['parameters'] else ''
-                writer.writerow([
-                    func['file'],
-                    func['line'],
-                    func['struct_or_trait'],
-                    func['type'],
-                    func['visibility'],
-                    func['return_type'],
-                    func['name'],
-                    params_str
-                ])
-        
-        print(f"結果をCSVファイルに出力しました: {output_file}")
-    except Exception as e:
-        print(f"エラー: CSVファイルの出力に失敗しました: {e}")
-        sys.exit(1)
+    extract = partial(extract_file, regex_backend=regex_backend)
+    run_batch(file_paths, extract, CSV_HEADER, to_csv_row, output_file, '関数',
+              quiet=quiet, error_log_path=error_log, dedup=dedup,
+              normalized_dir=normalized_dir, dictionary_columns=DICTIONARY_COLUMNS,
+              shard=shard, resume=resume, journal=journal, workers=workers, executor_kind=executor_kind,
+              index_path=default_index_path(output_file) if index else None,
+              archive_extensions=language_extensions('rust'))
 
 
 def main():
     """メイン関数"""
     if len(sys.argv) < 2:
         print("使用方法:")
-        print("  単一ファイル: python search_rust.py <rustファイルのパス> [--csv [出力ファイル名]] [--json]")
-        print("  一覧CSV: python search_rust.py --list <一覧CSVファイルのパス> [出力ファイル名]")
+        print("  単一ファイル: python search_rust.py <rustファイルのパス> [--csv [出力ファイル名]] [--json [出力ファイル名]]")
+        print("  一覧CSV: python search_rust.py --list <一覧CSVファイルのパス> [出力ファイル名] [--quiet] [--error-log <ログファイル>] [--no-dedup] [--normalized <出力ディレクトリ>] [--shard i/N] [--resume] [--no-journal]")
+        print("           [--workers <ワーカー数>] [--executor auto|process|thread] [--index]")
+        print("  クレート: python search_rust.py --crate <クレートのディレクトリまたはルートファイル> [出力ファイル名] [--cache <キャッシュファイル>] [--no-cache]")
+        print("            [--quiet] [--error-log <ログファイル>] [--normalized <出力ディレクトリ>]")
+        print("  ワークスペース: python search_rust.py --cargo <Cargo.tomlまたはそのディレクトリ> [出力ファイル名] [--workers <ワーカー数>]")
+        print("            [--cache-dir <キャッシュディレクトリ>] [--no-cache] [--quiet] [--error-log <ログファイル>]")
+        print("            [--executor auto|process|thread]")
+        print("  共通オプション: [--regex-backend re|regex|re2|auto]")
+        print("  正規化形式の復元: python search_rust.py --inflate <出力ディレクトリ> [出力ファイル名]")
+        print("  索引の作成: python search_rust.py --build-index <結果CSV> [索引ファイル]")
+        print("  関数名の検索: python search_rust.py --search <パターン> <索引ファイルまたは結果CSV> [--regex | --fuzzy] [--case-sensitive]")
+        print("                [--type <型>] [--file-prefix <パス>] [--limit <件数>]")
         print("")
         print("例:")
         print("  python search_rust.py src/main.rs")
         print("  python search_rust.py src/main.rs --csv")
         print("  python search_rust.py src/main.rs --csv output.csv")
         print("  python search_rust.py src/main.rs --json")
+        print("  python search_rust.py src/main.rs --json result.json.gz")
         print("  python search_rust.py --list file_list.csv")
         print("  python search_rust.py --list file_list.csv result.csv")
+        print("  python search_rust.py --list file_list.csv result.csv --quiet --error-log errors.jsonl")
+        print("  python search_rust.py --list file_list.csv --normalized result_db")
+        print("  python search_rust.py --inflate result_db result.csv")
+        print("  python search_rust.py --list file_list.csv result.csv --index")
+        print("  python search_rust.py --search Validate result.csv")
+        print("  python search_rust.py --crate path/to/mycrate mycrate.csv")
+        print("  python search_rust.py --cargo path/to/workspace/Cargo.toml workspace.csv --workers 8")
+        sys.exit(1)
+    
+    try:
+        run(sys.argv[1:])
+    except ExtractionError as e:
+        print(f"エラー: {e}")
         sys.exit(1)
+
+
+def run(args: List[str]) -> None:
+    """コマンドライン引数に従って処理を実行（エラーは ExtractionError で通知）"""
+    # --regex-backend: 関数定義パターンの正規表現エンジン（結果はどのエンジンでも同じ）
+    regex_backend = resolve_backend(pop_option(args, '--regex-backend'))
+    extract_options = {'regex_backend': regex_backend}
+    if not args:
+        raise UsageError("Rustファイルのパスまたは --list <一覧CSVファイルのパス> を指定してください。")
+    
+    # 結果CSVの関数名/メソッド名の索引の作成と検索
+    if args[0] in ('--build-index', '--search'):
+        run_index_command(args)
+        return
+    
+    # 正規化形式の出力から結果CSVを復元
+    if args[0] == '--inflate':
+        if len(args) < 2:
+            raise UsageError("正規化形式の出力ディレクトリを指定してください（--inflate <ディレクトリ> [出力ファイル名]）。")
+        inflate_to_csv(args[1], args[2] if len(args) > 2 else None)
+        return
+    
+    # クレートモード（mod 宣言をたどってモジュールパスを付ける）
+    if args[0] == '--crate':
+        from search_crate import process_crate
+        quiet = pop_flag(args, '--quiet')
+        error_log = pop_option(args, '--error-log')
+        normalized_dir = pop_option(args, '--normalized')
+        # --cache: モジュールツリーのキャッシュ（省略時は <出力ファイル名>_modules.json）
+        # --no-cache: キャッシュを読み書きせず、全ファイルの mod 宣言を解析する
+        cache_path = pop_option(args, '--cache')
+        use_cache = not pop_flag(args, '--no-cache')
+        if len(args) < 2:
+            raise UsageError("クレートのディレクトリまたはルートファイルを指定してください（--crate <パス>）。")
+        process_crate(args[1], args[2] if len(args) > 2 else None, cache_path=cache_path,
+                      use_cache=use_cache, quiet=quiet, error_log=error_log,
+                      normalized_dir=normalized_dir, **extract_options)
+        return
+    
+    # ワークスペースモード（Cargo.toml のメンバーのクレートをクレート単位で並列に処理する）
+    if args[0] == '--cargo':
+        from search_cargo import process_workspace
+        quiet = pop_flag(args, '--quiet')
+        error_log = pop_option(args, '--error-log')
+        # --workers: 抽出に使うワーカー数（省略時はCPU数、1の場合はこのプロセスで順に処理）
+        # --executor: ワーカーの種類（auto は GIL のない CPython ではスレッド、それ以外ではプロセス）
+        workers = parse_workers(pop_option(args, '--workers'), os.cpu_count() or 1)
+        executor_kind = pop_option(args, '--executor') or 'auto'
+        resolve_executor(executor_kind)
+        # --cache-dir: クレートごとの結果のキャッシュ（省略時は <出力ファイル名>_crates）
+        # --no-cache: キャッシュを読み書きせず、全クレートを抽出する
+        cache_dir = pop_option(args, '--cache-dir')
+        use_cache = not pop_flag(args, '--no-cache')
+        if len(args) < 2:
+            raise UsageError("ワークスペースの Cargo.toml を指定してください（--cargo <パス>）。")
+        process_workspace(args[1], args[2] if len(args) > 2 else None, workers=workers, cache_dir=cache_dir,
+                          use_cache=use_cache, quiet=quiet, error_log=error_log, executor_kind=executor_kind,
+                          **extract_options)
+        return
     
     # 一覧CSVモード
-    if sys.argv[1] == '--list':
-        if len(sys.argv) < 3:
+    if args[0] == '--list':
+        # --quiet: 進捗と警告を表示せず最後の集計のみ表示
+        # --error-log: 警告・エラーの出力先（省略時は <出力ファイル名>_errors.jsonl）
+        quiet = pop_flag(args, '--quiet')
+        error_log = pop_option(args, '--error-log')
+        # --no-dedup: 内容が同一のファイルも個別に解析する
+        dedup = not pop_flag(args, '--no-dedup')
+        # --normalized: 結果CSVの代わりに正規化形式（files / names / symbols の表）でディレクトリに出力
+        normalized_dir = pop_option(args, '--normalized')
+        # --shard i/N: 一覧をサイズで N 分割したうちの i 番目だけを処理し、マニフェストを出力（複数のマシンでの分担用）
+        shard = pop_option(args, '--shard')
+        shard = parse_shard(shard) if shard is not None else None
+        # --resume: 中断した処理をジャーナルの記録の続きから再開する
+        # --no-journal: 途中経過（ジャーナルと途中の結果CSV）を記録しない
+        resume = pop_flag(args, '--resume')
+        journal = not pop_flag(args, '--no-journal')
+        # --index: 結果CSVの出力後に関数名/メソッド名の索引（<出力ファイル名>_index.bin）を出力する
+        index = pop_flag(args, '--index')
+        # --workers: 解析に使うワーカー数（省略時は1で、このプロセスで順に処理）
+        # --executor: ワーカーの種類（auto は GIL のない CPython ではスレッド、それ以外ではプロセス）
+        workers = parse_workers(pop_option(args, '--workers'), 1)
+        executor_kind = pop_option(args, '--executor') or 'auto'
+        resolve_executor(executor_kind)
+        if len(args) < 2:
             print("エラー: 一覧CSVファイルのパスを指定してください。")
             print("使用方法: python search_rust.py --list <一覧CSVファイルのパス> [出力ファイル名]")
             sys.exit(1)
         
-        list_csv_path = sys.argv[2]
-        output_file = sys.argv[3] if len(sys.argv) > 3 else None
-        process_multiple_files(list_csv_path, output_file)
+        list_csv_path = args[1]
+        output_file = args[2] if len(args) > 2 else None
+        process_multiple_files(list_csv_path, output_file, quiet=quiet, error_log=error_log,
+                               dedup=dedup, normalized_dir=normalized_dir, shard=shard, resume=resume,
+                               journal=journal, workers=workers, executor_kind=executor_kind, index=index,
+                               **extract_options)
         return
     
     # 単一ファイルモード
-    file_path = sys.argv[1]
-    extractor = RustFunctionExtractor(file_path)
+    file_path = args[0]
+    extractor = RustFunctionExtractor(file_path, **extract_options)
     functions = extractor.extract()
     
     # CSV形式で出力する場合
-    if len(sys.argv) > 2 and sys.argv[2] == '--csv':
-        output_file = sys.argv[3] if len(sys.argv) > 3 else None
-        extractor.export_to_csv(functions, output_file)
+    if len(args) > 1 and args[1] == '--csv':
+        output_file = args[2] if len(args) > 2 else None
+        written = extractor.export_to_csv(functions, output_file)
+        if written:
+            print(f"CSVファイルを出力しました: {written}")
+        else:
+            print("関数が見つかりませんでした。")
     # JSON形式で出力する場合
-    elif len(sys.argv) > 2 and sys.argv[2] == '--json':
-        import json
-        print("\n=== JSON形式 ===")
-        print(json.dumps(functions, ensure_ascii=False, indent=2))
+    elif len(args) > 1 and args[1] == '--json':
+        if len(args) > 2:
+            # 出力ファイル名が .gz / .xz で終わる場合は圧縮する
+            write_json(args[2], functions)
+            print(f"JSONファイルを出力しました: {args[2]}")
+        else:
+            import json
+            print("\n=== JSON形式 ===")
+            print(json.dumps(functions, ensure_ascii=False, indent=2))
     # 通常の表示
     else:
         extractor.print_results(functions)
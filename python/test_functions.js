@@ -222,6 +222,11 @@ function complexFunction(
     return { regularParam, destructured, withDefault, restParams };
 }
 
+// 分割代入の既定値と引数の既定値
+function destructuredDefaults({ a = 1, b } = {}, c = 2) {
+    return a + b + c;
+}
+
 // アロー関数での複雑な引数
 const processData = async (
     id,